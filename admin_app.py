@@ -16,11 +16,17 @@ sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
 try:
     # 같은 폴더에 있다면 바로 import, 없다면 경로 탐색 후 import 시도
     from collector import DataCollector
+    from point_ledger import record_point_lot, consume_point_lots
+    from scheduler import collection_next_run
+    from log_retention import log_totals_by_source
 except ImportError:
     # 만약 상위 폴더에도 없다면 현재 폴더에서 찾기 시도
     try:
         sys.path.append(os.path.dirname(os.path.abspath(__file__)))
         from collector import DataCollector
+        from point_ledger import record_point_lot, consume_point_lots
+        from scheduler import collection_next_run
+        from log_retention import log_totals_by_source
     except ImportError:
         st.error("❌ 'collector.py'를 찾을 수 없습니다. admin_app.py와 같은 폴더에 두거나 상위 폴더에 위치시켜주세요.")
         st.stop()
@@ -299,9 +305,8 @@ def admin_dashboard():
                 cfg_df = pd.read_sql("SELECT * FROM service_config", conn)
                 configs = dict(zip(cfg_df['config_key'], cfg_df['config_value']))
                 
-                # 최근 실행 로그 조회
-                logs_df = pd.read_sql("SELECT target_source, MAX(executed_at) as last_run FROM collection_logs GROUP BY target_source", conn)
-                last_runs = dict(zip(logs_df['target_source'], logs_df['last_run']))
+                # 최근 실행 시각 (일일 롤업 + 롤업 이후 원본 로그)
+                last_runs = {source: t['last_run'] for source, t in log_totals_by_source(conn).items()}
 
             if sources:
                 cols = st.columns(3)
@@ -320,19 +325,9 @@ def admin_dashboard():
                         next_run_str = "-"
                         if enabled:
                             try:
-                                freq = configs.get(src['freq_key'], 'daily')
-                                run_time = configs.get(f"COLLECTION_TIME_{src['source_key']}", '09:00')
-                                now = datetime.now()
-                                
-                                if freq == 'daily':
-                                    target_time = datetime.strptime(run_time, "%H:%M").time()
-                                    next_run = datetime.combine(now.date(), target_time)
-                                    if next_run <= now:
-                                        next_run += timedelta(days=1)
-                                    next_run_str = next_run.strftime('%m-%d %H:%M')
-                                else:
-                                    # 주간/월간 등은 복잡하므로 단순 표시 (프로토타입)
-                                    next_run_str = f"Scheduled ({freq})"
+                                # Flask 스케줄러와 같은 계산 사용 (daily/weekly/monthly/말일)
+                                next_run = collection_next_run(src['source_key'], src['freq_key'], configs, datetime.now())
+                                next_run_str = next_run.strftime('%m-%d %H:%M')
                             except Exception:
                                 next_run_str = "Calc Error"
                         else:
@@ -349,6 +344,35 @@ def admin_dashboard():
         except Exception as e:
             st.error(f"수집기 상태 조회 중 오류: {e}")
 
+        # [New] 수집 소요 시간 / 처리량 추이 (collection_logs.duration_ms 기준, 최근 30일)
+        st.subheader("수집 소요 시간 추이")
+        st.caption("수집기별 일간 p95 소요 시간과 처리량(rows/sec)입니다. 최근 7일 p95가 이전보다 크게 늘면 '느려짐'으로 표시됩니다.")
+        try:
+            timing_collector = DataCollector(engine=engine)
+            timings_df = timing_collector.load_collection_timings(days=30)
+            if timings_df.empty:
+                st.info("소요 시간이 기록된 수집 이력이 없습니다.")
+            else:
+                trend_df = timing_collector.collection_timing_trend(timings_df)
+                tcol1, tcol2 = st.columns(2)
+                with tcol1:
+                    st.markdown("**p95 소요 시간 (ms)**")
+                    st.line_chart(trend_df.pivot(index='day', columns='target_source', values='p95_ms'))
+                with tcol2:
+                    st.markdown("**처리량 (rows/sec)**")
+                    st.line_chart(trend_df.pivot(index='day', columns='target_source', values='rows_per_sec'))
+
+                summary = timing_collector.summarize_collection_timings(timings_df)
+                summary_df = pd.DataFrame([
+                    {'수집기': source, '실행 수': m['runs'], 'p50 (ms)': m['p50_ms'], 'p95 (ms)': m['p95_ms'],
+                     'rows/sec': m['rows_per_sec'], '최근 7일 p95 (ms)': m['recent_p95_ms'],
+                     '상태': '느려짐' if m['regressed'] else '정상'}
+                    for source, m in summary.items()
+                ])
+                st.dataframe(summary_df, use_container_width=True, hide_index=True)
+        except Exception as e:
+            st.error(f"수집 소요 시간 조회 중 오류: {e}")
+
         st.divider()
 
         st.subheader("최근 데이터 수집 로그")
@@ -545,10 +569,16 @@ def admin_dashboard():
                                     conn.execute(text("INSERT INTO user_points (user_id, balance, total_earned, total_spent) VALUES (:uid, 0, 0, 0)"), {'uid': target_user})
                                 
                                 # 트랜잭션 기록
-                                conn.execute(text("""
+                                tx = conn.execute(text("""
                                     INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id)
                                     VALUES (:uid, :amt, 'manual', :reason, 'admin')
                                 """), {'uid': target_user, 'amt': amount, 'reason': reason})
+
+                                # lot 원장 반영 (지급: lot 생성, 차감: 오래된 lot부터 소진)
+                                if amount > 0:
+                                    record_point_lot(conn, target_user, amount, None, tx.lastrowid)
+                                else:
+                                    consume_point_lots(conn, target_user, amount)
                                 
                                 # 잔액 업데이트
                                 if amount > 0:
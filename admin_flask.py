@@ -1,11 +1,22 @@
 from flask import Flask, render_template, request, redirect, url_for, session, flash, Response, __version__ as flask_version
 from functools import wraps
-from collector import DataCollector
+from collector import DataCollector, COLLECTION_LOG_PHASES_DDL
+from snapshot_store import SnapshotStore
+from flattener import custom_table_name, find_table_name_conflict
+from point_ledger import POINT_LOTS_DDL, backfill_point_lots, record_point_lot, consume_point_lots
+from job_queue import CollectionJobQueue, COLLECTION_JOBS_DDL
+from log_retention import COLLECTION_LOG_DAILY_DDL, log_totals_by_source
+from error_signatures import ERROR_SIGNATURES_DDL
+from dashboard_stats import DashboardStatsProvider
+from table_counters import (TABLE_COUNTERS_DDL, COUNTED_TABLES, bump_counter, read_counters, table_count,
+                            reconcile_table_counters)
+from scheduler import (HeapScheduler, ScheduledJob, LeaderElector, run_leader_loop, SCHEDULE_VERSION_KEY,
+                       SCHEDULER_LEADER_KEY, collection_next_run, bump_schedule_version)
 from recommendation_logic import recommend_products
 import pandas as pd
 import sys
 import os
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from datetime import datetime, timedelta
 import platform
 try:
@@ -13,12 +24,12 @@ try:
 except ImportError:
     psutil = None
 import threading
-import schedule
 import time
 import subprocess
 import atexit
 import uuid
 import json
+import re
 
 # Flask 앱 초기화
 # 정적 파일 경로를 절대 경로로 설정하여 실행 위치에 상관없이 찾을 수 있도록 함
@@ -135,6 +146,41 @@ def init_schema(engine):
         ('COLLECTION_FREQUENCY_FSS_LOAN', 'daily'), # 금감원 수집 주기
         ('COLLECTION_FREQUENCY_ECONOMIC', 'daily'), # 경제지표 수집 주기
         ('COLLECTION_FREQUENCY_KOSIS_INCOME', 'monthly'), # 통계청 수집 주기
+        ('COLLECTION_MAX_WORKERS', '4'), # 동시 수집 스레드 풀 크기
+        ('COLLECTION_MAX_PER_SOURCE', '1'), # 소스(API 호스트)별 동시 실행 제한
+        ('CUSTOM_FETCH_MAX_CONCURRENCY', '8'), # 커스텀 수집기 비동기 전체 동시 요청 수
+        ('CUSTOM_FETCH_PER_HOST', '2'), # 커스텀 수집기 비동기 호스트별 동시 요청 수
+        ('CUSTOM_FETCH_TIMEOUT', '30'), # 커스텀 수집기 요청 제한 시간 (초)
+        ('HTTP_POOL_MAXSIZE', '10'), # 호스트별 keep-alive 연결 풀 크기
+        ('HTTP_CONNECT_TIMEOUT', '5'), # HTTP 연결 제한 시간 (초)
+        ('HTTP_READ_TIMEOUT', '30'), # HTTP 응답 대기 제한 시간 (초)
+        ('COLLECTOR_FSS_LIVE_MODE', '0'), # 1이면 API Key로 금감원 API 실제 호출
+        ('FSS_CHUNK_SIZE', '500'), # 금감원 상품 적재 청크 크기
+        ('FSS_PAGE_WORKERS', '4'), # 금감원 API 페이지 동시 요청 수
+        ('CUSTOM_STREAM_MODE', '1'), # 커스텀 수집 응답 스트리밍 저장 (1: 사용, 0: 전체 파싱 후 저장)
+        ('CUSTOM_STREAM_MAX_BYTES', '0'), # 스트리밍 응답 최대 크기 (bytes, 0: 제한 없음)
+        ('CUSTOM_STREAM_TIMEOUT', '300'), # 스트리밍 다운로드 전체 제한 시간 (초)
+        ('SNAPSHOT_KEEP_PER_SOURCE', '30'), # 커스텀 수집기 소스별 스냅샷 보존 개수 (0: 무제한)
+        ('FLATTEN_CHUNK_SIZE', '1000'), # 커스텀 수집 데이터 테이블 적재 청크 크기
+        ('FLATTEN_SCHEMA_SAMPLE', '500'), # 컬럼 타입 추론에 사용할 레코드 수
+        ('RATE_LIMIT_DEFAULT_RPS', '5'), # 외부 API 호스트별 기본 초당 요청 수 (0: 제한 없음)
+        ('RATE_LIMIT_DEFAULT_BURST', '5'), # 토큰 버킷 최대 누적 (순간 허용 요청 수)
+        ('RATE_LIMIT_HOSTS', '{"finlife.fss.or.kr": 5, "kosis.kr": 3, "ecos.bok.or.kr": 3}'), # 호스트별 초당 요청 수 (JSON, {"rps", "burst"} 형태도 가능)
+        ('RATE_LIMIT_RELOAD_SEC', '60'), # 호출 한도 설정 재조회 주기 (초)
+        ('RETRY_MAX_ATTEMPTS', '3'), # 외부 API 호출 최대 시도 횟수 (연결 오류/타임아웃/429/5xx만 재시도)
+        ('RETRY_BASE_DELAY_MS', '500'), # 재시도 기본 대기 (ms, 시도마다 2배 + jitter)
+        ('RETRY_MAX_DELAY_MS', '10000'), # 재시도 최대 대기 (ms)
+        ('CIRCUIT_FAILURE_THRESHOLD', '5'), # 연속 실패 시 회로 차단 기준 횟수
+        ('CIRCUIT_RESET_SEC', '60'), # 회로 차단 유지 시간 (초, 이후 시험 호출 1회 허용)
+        ('POINT_LOT_LEDGER_READY', '0'), # 포인트 lot 원장 백필 완료 여부 (init_schema에서 1회 백필 후 1)
+        ('MISSION_EVAL_MODE', 'batch'), # 미션 달성 평가 방식 (batch: Python 일괄 평가, sql: DB 내 집합 연산)
+        ('MISSION_EXPIRE_INTERVAL_MIN', '60'), # 미션 기한 만료 처리 주기 (분)
+        ('MISSION_EXPIRE_BATCH_SIZE', '500'), # 미션 만료 처리 1회 UPDATE 건수 (행 잠금 범위 제한)
+        ('SCHEDULE_CONFIG_VERSION', '0'), # 수집 주기 설정 버전 (변경 시 스케줄러가 수집 작업을 다시 구성)
+        ('COLLECTION_JOB_WORKERS', '2'), # 수집 작업 큐 동시 실행 워커 수 (재시작 시 반영)
+        ('LOG_RETENTION_DAYS', '90'), # collection_logs 원본 보존 기간 (일, 지나면 월별 보관 테이블로 이동)
+        ('DASHBOARD_STATS_TTL_SEC', '5'), # 대시보드/헤더 통계 캐시 유지 시간 (초, 재시작 시 반영)
+        ('TABLE_COUNTER_RECONCILE_MIN', '60'), # 테이블 행 수 카운터 재계산 주기 (분)
     ]
     try:
         with engine.connect() as conn:
@@ -209,6 +255,21 @@ def init_schema(engine):
                 except Exception:
                     pass
 
+            # [Self-Repair] 미션 만료 처리용 (status, due_date) 복합 인덱스
+            try:
+                conn.execute(text("CREATE INDEX idx_missions_status_due ON missions (status, due_date)"))
+            except Exception:
+                pass  # 이미 존재
+
+            # [Self-Repair] SQL 푸시다운 평가에서 이번 회차 완료 건을 표시하는 completion_batch 컬럼
+            try:
+                conn.execute(text("SELECT completion_batch FROM missions LIMIT 0"))
+            except Exception:
+                try:
+                    conn.execute(text("ALTER TABLE missions ADD COLUMN completion_batch VARCHAR(32), ADD INDEX idx_missions_completion_batch (completion_batch)"))
+                except Exception:
+                    pass
+
             # missions mock 데이터 (테이블이 비어 있을 때만)
             count = conn.execute(text("SELECT COUNT(*) FROM missions")).scalar()
             if count == 0:
@@ -247,6 +308,19 @@ def init_schema(engine):
                 )
             """))
 
+            # [Self-Repair] 미션 변경분 평가용 user_stats.updated_at 컬럼/인덱스
+            try:
+                conn.execute(text("SELECT updated_at FROM user_stats LIMIT 0"))
+            except Exception:
+                try:
+                    conn.execute(text("ALTER TABLE user_stats ADD COLUMN updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"))
+                except Exception:
+                    pass
+            try:
+                conn.execute(text("CREATE INDEX idx_user_stats_updated ON user_stats (updated_at)"))
+            except Exception:
+                pass  # 이미 존재
+
             # [New] Mock data for user_stats and update missions tracking info
             if conn.execute(text("SELECT COUNT(*) FROM user_stats")).scalar() == 0:
                 mock_stats = [
@@ -344,6 +418,18 @@ def init_schema(engine):
                 except Exception:
                     pass
 
+            # [New] 조건부 요청(ETag/Last-Modified) 및 본문 해시 컬럼 추가
+            # [New] JSON → 테이블 평탄화 설정(record_path, column_mapping) 및 추론 스키마 캐시 컬럼 추가
+            for col, ddl in [('last_etag', 'VARCHAR(255)'), ('last_modified', 'VARCHAR(64)'), ('content_hash', 'CHAR(64)'),
+                             ('record_path', 'VARCHAR(255)'), ('column_mapping', 'TEXT'), ('schema_cache', 'TEXT')]:
+                try:
+                    conn.execute(text(f"SELECT {col} FROM collection_sources LIMIT 0"))
+                except Exception:
+                    try:
+                        conn.execute(text(f"ALTER TABLE collection_sources ADD COLUMN {col} {ddl}"))
+                    except Exception:
+                        pass
+
             # Feature 7: point_purchases 테이블 생성
             conn.execute(text("""
                 CREATE TABLE IF NOT EXISTS point_purchases (
@@ -482,7 +568,60 @@ def init_schema(engine):
                 except Exception:
                     pass
 
+            # [New] 포인트 lot 원장 (적립 건별 잔여액) 생성 및 기존 이력 1회 백필
+            conn.execute(text(POINT_LOTS_DDL))
+            backfilled = backfill_point_lots(conn)
+            if backfilled is not None:
+                print(f"포인트 lot 원장 백필 완료: {backfilled} lots")
+
+            # [New] 수집 작업 큐 실행 이력
+            conn.execute(text(COLLECTION_JOBS_DDL))
+            try:
+                conn.execute(text("ALTER TABLE collection_jobs ADD COLUMN worker_id VARCHAR(100)"))
+            except Exception:
+                pass  # 이미 존재
+            try:
+                # 진행 중 작업의 source_key (완료 시 NULL) — 소스별 진행 중 작업을 DB에서 하나로 제한
+                conn.execute(text("ALTER TABLE collection_jobs ADD COLUMN active_key VARCHAR(100)"))
+                conn.execute(text("CREATE UNIQUE INDEX uq_collection_jobs_active ON collection_jobs (active_key)"))
+            except Exception:
+                pass  # 이미 존재
+
+            # [New] 테이블 행 수 카운터
+            conn.execute(text(TABLE_COUNTERS_DDL))
+
+            # [New] collection_logs 추가 컬럼 (소요 시간 duration_ms/run_id, 에러 지문 error_signature) + 단계별 소요 시간
+            for col_ddl in ("duration_ms INT", "run_id VARCHAR(32)", "error_signature CHAR(40)"):
+                try:
+                    conn.execute(text(f"ALTER TABLE collection_logs ADD COLUMN {col_ddl}"))
+                except Exception:
+                    pass  # 이미 존재하거나 collection_logs가 아직 없음 (첫 로그 기록 시 생성)
+            conn.execute(text(COLLECTION_LOG_PHASES_DDL))
+
+            # [New] 수집 에러 지문 (같은 traceback은 한 번만 저장, 발생 횟수/시각만 갱신)
+            conn.execute(text(ERROR_SIGNATURES_DDL))
+
+            # [New] collection_logs 일일 롤업 테이블 + 기간 조회용 인덱스
+            conn.execute(text(COLLECTION_LOG_DAILY_DDL))
+            try:
+                conn.execute(text("CREATE INDEX idx_collection_logs_executed ON collection_logs (executed_at)"))
+            except Exception:
+                pass  # 이미 존재하거나 collection_logs가 아직 없음
+            # [New] 소스별 최근 로그 조회용 (target_source는 pandas가 TEXT로 만들 수 있어 prefix 인덱스)
+            try:
+                conn.execute(text("CREATE INDEX idx_collection_logs_source_executed ON collection_logs (target_source(100), executed_at)"))
+            except Exception:
+                pass
+
             conn.commit()
+
+        # [New] 카운터가 없는 테이블만 1회 COUNT(*)로 초기화 (이후에는 증감 + 주기적 재계산)
+        with engine.connect() as conn:
+            missing = [name for name in COUNTED_TABLES if name not in read_counters(conn)]
+        if pp_count == 0 and 'point_products' not in missing:
+            missing.append('point_products')  # mock 상품을 방금 넣은 경우
+        if missing:
+            reconcile_table_counters(engine, missing)
     except Exception as e:
         print(f"Schema init warning: {e}")
 
@@ -495,28 +634,131 @@ def get_collector():
         _collector_instance = DataCollector()
     return _collector_instance
 
+# [New] 수집 작업 큐 (수동 트리거/스케줄 실행을 워커 풀에서 처리)
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            collector = get_collector()
+            workers = max(1, collector._get_int_config('COLLECTION_JOB_WORKERS', 2))
+            _job_queue = CollectionJobQueue(collector.engine, max_workers=workers)
+            # [Self-Repair] 비정상 종료된 프로세스가 남긴 작업이 같은 소스의 트리거를 막지 않도록 정리
+            try:
+                recovered = _job_queue.recover_orphaned_jobs()
+                if recovered:
+                    print(f"[JobQueue] 중단된 수집 작업 {recovered}건을 failed로 정리")
+            except Exception as e:
+                print(f"[JobQueue] 중단된 작업 정리 실패: {e}")
+    return _job_queue
+
+# [New] 대시보드/헤더 통계 캐시 (모든 요청·스레드 공유)
+_stats_provider = None
+_stats_provider_lock = threading.Lock()
+
+def get_stats_provider():
+    global _stats_provider
+    with _stats_provider_lock:
+        if _stats_provider is None:
+            collector = get_collector()
+            ttl = max(0, collector._get_int_config('DASHBOARD_STATS_TTL_SEC', 5))
+            _stats_provider = DashboardStatsProvider(collector.engine, ttl=ttl)
+    return _stats_provider
+
+def invalidate_dashboard_stats():
+    """설정/알림 변경 직후 다음 화면에 바로 반영되도록 통계 캐시 무효화"""
+    if _stats_provider is not None:
+        _stats_provider.invalidate()
+
 # [Improvement] Background Scheduler
-def run_schedule_loop():
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+_scheduler = None
+_leader = None
+LEADER_HEARTBEAT_SEC = 15
+
+def run_collection_source(collector, job_type, source_key, endpoint):
+    """수집 소스 1건 실행 (수동 트리거와 스케줄러 공용)
+
+    수집기는 실패를 로그로 남기고 (False, 에러)를 반환하므로, 작업 큐에 실패로 기록되도록 예외로 바꾼다.
+    """
+    if job_type == 'loan':
+        result = collector.collect_fss_loan_products()
+    elif job_type == 'economy':
+        result = collector.collect_economic_indicators()
+    elif job_type == 'income':
+        result = collector.collect_kosis_income_stats()
+    else:
+        result = collector.collect_custom_source(source_key, endpoint)
+    success, error = result if isinstance(result, tuple) else (bool(result), None)
+    if not success:
+        raise RuntimeError(error or f"{source_key} 수집 실패")
+
+def load_collection_jobs():
+    """collection_sources + service_config 기준 활성 수집기의 스케줄 작업 목록"""
+    collector = get_collector()
+    configs = get_all_configs(collector.engine)
+    with collector.engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT source_key, trigger_val, config_key_enabled, freq_key, endpoint FROM collection_sources
+        """)).fetchall()
+
+    jobs = []
+    for source_key, trigger_val, config_key, freq_key, endpoint in rows:
+        if config_key and configs.get(config_key, '1') != '1':
+            continue
+        # 수동 트리거와 같은 큐를 거쳐 실행 (같은 소스가 진행 중이면 병합)
+        func = lambda t=trigger_val, k=source_key, e=endpoint: get_job_queue().submit(
+            k, lambda: run_collection_source(collector, t, k, e), triggered_by='schedule')
+        rule = lambda now, k=source_key, f=freq_key: collection_next_run(k, f, configs, now)
+        jobs.append(ScheduledJob(f"collect:{source_key}", func, rule))
+    return jobs
+
+def load_schedule_version():
+    return get_collector()._get_config(SCHEDULE_VERSION_KEY, '0')
+
+def notify_schedule_changed(conn):
+    """수집 주기/활성화 설정 변경 시 버전 갱신 (commit은 호출 측에서) 후 스케줄러 깨우기"""
+    bump_schedule_version(conn)
+    invalidate_dashboard_stats()
+    if _scheduler:
+        _scheduler.wake()
+
+def build_scheduler():
+    """스케줄 작업 등록 (리더로 선출될 때마다 새로 구성)"""
+    global _scheduler
+    collector = get_collector()
+    scheduler = HeapScheduler(job_loader=load_collection_jobs, version_loader=load_schedule_version)
+    # 매일 자정에 만료된 포인트 처리
+    scheduler.add(ScheduledJob.daily_at("process_expired_points", collector.process_expired_points, "00:00"))
+    # [New] 매분 미션 달성 여부 확인 (마지막 평가 이후 변경된 미션/스탯만)
+    scheduler.add(ScheduledJob.every("check_mission_progress", collector.check_mission_progress, 60))
+    # [New] 매일 전체 활성 미션 재평가 (변경 추적 누락 보정)
+    scheduler.add(ScheduledJob.daily_at("reconcile_mission_progress", collector.reconcile_mission_progress, "03:00"))
+    # [New] 미션 만료 처리 (MISSION_EXPIRE_INTERVAL_MIN 주기, 배치 단위)
+    expire_interval = max(1, collector._get_int_config('MISSION_EXPIRE_INTERVAL_MIN', 60))
+    scheduler.add(ScheduledJob.every("check_mission_expiration", collector.check_mission_expiration, expire_interval * 60))
+    # [New] 매일 포인트 잔액 ↔ lot 원장 정합성 점검
+    scheduler.add(ScheduledJob.daily_at("check_point_lot_consistency", collector.check_point_lot_consistency, "00:30"))
+    # [New] 매일 collection_logs 롤업 및 보존 기간 지난 로그 보관
+    scheduler.add(ScheduledJob.daily_at("compact_collection_logs", collector.compact_collection_logs, "00:10"))
+    # [New] 테이블 행 수 카운터 재계산 (TABLE_COUNTER_RECONCILE_MIN 주기)
+    reconcile_interval = max(1, collector._get_int_config('TABLE_COUNTER_RECONCILE_MIN', 60))
+    scheduler.add(ScheduledJob.every("reconcile_table_counters", collector.reconcile_table_counters, reconcile_interval * 60))
+    # [New] 수집기별 주기(COLLECTION_FREQUENCY/TIME/DAY/WEEKDAY/IS_LAST_DAY)는 job_loader가 구성
+    _scheduler = scheduler
+    return scheduler
 
 def start_scheduler():
     # 스케줄러 스레드 시작 (Daemon 스레드로 실행하여 메인 프로세스 종료 시 함께 종료)
-    # 실제 Job 등록은 collector.py 내부나 별도 설정 함수에서 수행된다고 가정
+    # [New] 여러 워커 프로세스 중 리더 1개만 작업을 실행 (MySQL GET_LOCK, 그 외 파일 잠금)
+    global _leader
     if not any(t.name == "SchedulerThread" for t in threading.enumerate()):
-        # [Self-Repair] 스케줄러 작업 등록
-        collector = get_collector()
-        # 매일 자정에 만료된 포인트 처리
-        schedule.every().day.at("00:00").do(collector.process_expired_points)
-        # [New] 매분 미션 달성 여부 확인 (테스트용)
-        schedule.every().minute.do(collector.check_mission_progress)
-        # [New] 매일 자정에 미션 만료 처리
-        schedule.every().day.at("00:00").do(collector.check_mission_expiration)
-        
-        scheduler_thread = threading.Thread(target=run_schedule_loop, daemon=True, name="SchedulerThread")
+        _leader = LeaderElector(get_collector().engine, os.path.join(basedir, 'scheduler.lock'))
+        scheduler_thread = threading.Thread(target=run_leader_loop, args=(_leader, build_scheduler, LEADER_HEARTBEAT_SEC),
+                                            daemon=True, name="SchedulerThread")
         scheduler_thread.start()
-        print("Background scheduler started.")
+        print("Background scheduler started (leader election).")
 
 # 앱 시작 시 스키마 초기화 (DB 연결 가능 시)
 print("⏳ DB 스키마 초기화 및 연결 확인 중...")
@@ -539,43 +781,9 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-def get_dashboard_stats(engine):
-    stats = {'loan_count': 0, 'economy_count': 0, 'income_count': 0, 'log_count': 0,
-             'WEIGHT_INCOME': 0.5, 'WEIGHT_JOB_STABILITY': 0.3, 'WEIGHT_ESTATE_ASSET': 0.2,
-             'COLLECTOR_FSS_LOAN_ENABLED': '1', 'COLLECTOR_KOSIS_INCOME_ENABLED': '1', 'COLLECTOR_ECONOMIC_ENABLED': '1',
-             'log_stats_24h': {}}
-    try:
-        with engine.connect() as conn:
-            try: stats['loan_count'] = conn.execute(text("SELECT COUNT(*) FROM raw_loan_products")).scalar()
-            except Exception: pass
-            try: stats['economy_count'] = conn.execute(text("SELECT COUNT(*) FROM raw_economic_indicators")).scalar()
-            except Exception: pass
-            try: stats['income_count'] = conn.execute(text("SELECT COUNT(*) FROM raw_income_stats")).scalar()
-            except Exception: pass
-            try: stats['log_count'] = conn.execute(text("SELECT COUNT(*) FROM collection_logs")).scalar()
-            except Exception: pass
-            
-            # [New] 24h Log Stats for Chart
-            try:
-                cutoff = datetime.now() - timedelta(hours=24)
-                rows = conn.execute(text("""
-                    SELECT status, COUNT(*) FROM collection_logs 
-                    WHERE executed_at >= :cutoff GROUP BY status
-                """), {'cutoff': cutoff}).fetchall()
-                stats['log_stats_24h'] = {row[0]: row[1] for row in rows}
-            except Exception: pass
-
-            try:
-                rows = conn.execute(text("SELECT config_key, config_value FROM service_config")).fetchall()
-                for row in rows:
-                    if row[0].startswith('WEIGHT_'):
-                        stats[row[0]] = float(row[1])
-                    else:
-                        stats[row[0]] = row[1]
-            except Exception: pass
-    except Exception:
-        pass
-    return stats
+def get_dashboard_stats():
+    """대시보드/헤더 통계 (한 번의 쿼리로 조회, DASHBOARD_STATS_TTL_SEC 동안 캐시)"""
+    return get_stats_provider().get()
 
 @app.context_processor
 def inject_global_vars():
@@ -583,84 +791,92 @@ def inject_global_vars():
         return {}
     
     vars = {}
-    
-    # Notifications
-    try:
-        collector = get_collector()
-        with collector.engine.connect() as conn:
-            count = conn.execute(text("SELECT COUNT(*) FROM notifications WHERE is_read = 0")).scalar()
-        vars['unread_notifications_count'] = count
-    except Exception:
-        vars['unread_notifications_count'] = 0
-
-    # System Status
-    try:
-        collector = get_collector()
-        stats = get_dashboard_stats(collector.engine)
-        
-        # Recent errors
-        recent_errors = 0
-        try:
-            with collector.engine.connect() as conn:
-                cutoff = datetime.now() - timedelta(hours=24)
-                recent_errors = conn.execute(
-                    text("SELECT COUNT(*) FROM collection_logs WHERE status = 'FAIL' AND executed_at >= :cutoff"),
-                    {'cutoff': cutoff}
-                ).scalar()
-        except Exception:
-            pass
 
-        collectors_active = 0
-        if stats.get('COLLECTOR_FSS_LOAN_ENABLED') == '1': collectors_active += 1
-        if stats.get('COLLECTOR_ECONOMIC_ENABLED') == '1': collectors_active += 1
-        if stats.get('COLLECTOR_KOSIS_INCOME_ENABLED') == '1': collectors_active += 1
-
-        vars['system_status'] = {
-            'db': True,
-            'collectors_active': collectors_active,
-            'collectors_total': 3,
-            'now': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'recent_errors': recent_errors
-        }
-    except Exception:
-        vars['system_status'] = {
-            'db': False, 'collectors_active': 0, 'collectors_total': 3, 
-            'now': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'recent_errors': 0
-        }
+    # 알림/시스템 상태는 캐시된 대시보드 통계 사용 (렌더링마다 쿼리하지 않음)
+    stats = get_dashboard_stats()
+    vars['unread_notifications_count'] = stats.get('unread_notifications', 0)
+
+    collectors_active = 0
+    if stats.get('COLLECTOR_FSS_LOAN_ENABLED') == '1': collectors_active += 1
+    if stats.get('COLLECTOR_ECONOMIC_ENABLED') == '1': collectors_active += 1
+    if stats.get('COLLECTOR_KOSIS_INCOME_ENABLED') == '1': collectors_active += 1
+
+    vars['system_status'] = {
+        'db': not stats.get('db_error'),
+        'collectors_active': collectors_active if not stats.get('db_error') else 0,
+        'collectors_total': 3,
+        'now': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'recent_errors': stats.get('recent_errors', 0)
+    }
         
     vars['auto_refresh'] = session.get('auto_refresh', True)
     
     return vars
 
-def get_recent_logs(engine, source=None, limit=50, sort_by='executed_at', order='desc', status_filter=None):
+def get_recent_logs_by_source(engine, sources, limit=50, sort_by='executed_at', order='desc', status_filter=None):
+    """소스별 최근 로그를 한 번의 쿼리로 조회 → {target_source: [dict, ...]}
+
+    ROW_NUMBER() OVER (PARTITION BY target_source ...)로 소스마다 정렬 기준 상위 limit건만 남긴다.
+    (target_source, executed_at) 인덱스 사용, DataFrame을 거치지 않고 dict로 반환
+    """
+    logs = {source: [] for source in sources}
+    if not sources:
+        return logs
+    allowed_cols = ['executed_at', 'level', 'status', 'row_count']
+    if sort_by not in allowed_cols: sort_by = 'executed_at'
+    safe_order = 'ASC' if order.lower() == 'asc' else 'DESC'
+
+    conditions = ["target_source IN :sources"]
+    params = {'sources': list(sources), 'limit': limit}
+    if status_filter:
+        conditions.append("status LIKE :status")
+        params['status'] = f"{status_filter}%"
+    query = text(f"""
+        SELECT * FROM (
+            SELECT l.*, ROW_NUMBER() OVER (
+                PARTITION BY target_source ORDER BY {sort_by} {safe_order}, executed_at DESC
+            ) AS rn
+            FROM collection_logs l
+            WHERE {' AND '.join(conditions)}
+        ) ranked
+        WHERE rn <= :limit
+        ORDER BY target_source, rn
+    """).bindparams(bindparam('sources', expanding=True))
     try:
-        params = {}
-        query = "SELECT * FROM collection_logs"
-        conditions = []
-        if source:
-            conditions.append("target_source = %(source)s")
-            params['source'] = source
-        if status_filter:
-            conditions.append("status LIKE %(status)s")
-            params['status'] = f"{status_filter}%"
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        # Sorting
-        allowed_cols = ['executed_at', 'level', 'status', 'row_count']
-        if sort_by not in allowed_cols: sort_by = 'executed_at'
-        safe_order = 'ASC' if order.lower() == 'asc' else 'DESC'
-        
-        query += f" ORDER BY {sort_by} {safe_order}"
-        
-        if limit:
-            query += " LIMIT %(limit)s"
-            params['limit'] = limit
-        df = pd.read_sql(query, engine, params=params)
-        return df.to_dict(orient='records')
-    except Exception:
-        return []
+        with engine.connect() as conn:
+            rows = conn.execute(query, params).mappings().fetchall()
+    except Exception as e:
+        print(f"최근 수집 로그 조회 실패: {e}")
+        return logs
+
+    for row in rows:
+        log = dict(row)
+        log.pop('rn', None)
+        logs[log['target_source']].append(log)
+    attach_error_details(engine, [log for source_logs in logs.values() for log in source_logs])
+    return logs
+
+def attach_error_details(engine, logs):
+    """error_signature가 있는 로그에 전체 에러 텍스트(error_detail)와 발생 횟수(error_occurrences) 추가"""
+    signatures = {log['error_signature'] for log in logs if log.get('error_signature')}
+    if not signatures:
+        return logs
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("SELECT signature, error_text, occurrences FROM error_signatures WHERE signature IN :sigs")
+                .bindparams(bindparam('sigs', expanding=True)),
+                {'sigs': list(signatures)}
+            ).fetchall()
+    except Exception as e:
+        print(f"에러 지문 조회 실패: {e}")
+        return logs
+    details = {row[0]: (row[1], row[2]) for row in rows}
+    for log in logs:
+        detail = details.get(log.get('error_signature'))
+        if detail:
+            log['error_detail'], log['error_occurrences'] = detail
+    return logs
 
 def _render_dashboard(message=None, status=None):
     """대시보드 렌더링 공통 로직 (index, trigger 공용)"""
@@ -671,10 +887,12 @@ def _render_dashboard(message=None, status=None):
         status_filter = request.args.get('status_filter')
 
         collector = get_collector()
-        stats = get_dashboard_stats(collector.engine)
-        loan_logs = get_recent_logs(collector.engine, source='FSS_LOAN_API', limit=50, sort_by=sort_by, order=order, status_filter=status_filter)
-        economy_logs = get_recent_logs(collector.engine, source='ECONOMIC_INDICATORS', limit=50, sort_by=sort_by, order=order, status_filter=status_filter)
-        income_logs = get_recent_logs(collector.engine, source='KOSIS_INCOME_API', limit=50, sort_by=sort_by, order=order, status_filter=status_filter)
+        stats = get_dashboard_stats()
+        recent_logs = get_recent_logs_by_source(collector.engine, ['FSS_LOAN_API', 'ECONOMIC_INDICATORS', 'KOSIS_INCOME_API'],
+                                                limit=50, sort_by=sort_by, order=order, status_filter=status_filter)
+        loan_logs = recent_logs['FSS_LOAN_API']
+        economy_logs = recent_logs['ECONOMIC_INDICATORS']
+        income_logs = recent_logs['KOSIS_INCOME_API']
 
         loan_last_run = loan_logs[0]['executed_at'] if loan_logs and loan_logs[0].get('executed_at') else None
         economy_last_run = economy_logs[0]['executed_at'] if economy_logs and economy_logs[0].get('executed_at') else None
@@ -690,17 +908,8 @@ def _render_dashboard(message=None, status=None):
         except Exception:
             pass
 
-        # 최근 24시간 에러 로그 확인
-        recent_errors = 0
-        try:
-            with collector.engine.connect() as conn:
-                cutoff = datetime.now() - timedelta(hours=24)
-                recent_errors = conn.execute(
-                    text("SELECT COUNT(*) FROM collection_logs WHERE status = 'FAIL' AND executed_at >= :cutoff"),
-                    {'cutoff': cutoff}
-                ).scalar()
-        except Exception:
-            pass
+        # 최근 24시간 에러 로그 수 (대시보드 통계에 포함)
+        recent_errors = stats.get('recent_errors', 0)
 
         # 시스템 상태 구성
         collectors_active = 0
@@ -831,6 +1040,14 @@ def collection_management():
         configs = get_all_configs(collector.engine)
 
         sources = []
+        circuit_states = collector.get_circuit_states()
+        # [New] 최근 30일 소요 시간 p50/p95·처리량 및 단계별 평균
+        try:
+            timings = collector.summarize_collection_timings(collector.load_collection_timings(days=30))
+        except Exception as e:
+            print(f"수집 소요 시간 집계 실패: {e}")
+            timings = {}
+        phase_breakdown = collector.get_phase_breakdown(days=30)
         with collector.engine.connect() as conn:
             # [Self-Repair] 1. 테이블 생성 (없을 경우 대비)
             conn.execute(text("""
@@ -871,11 +1088,23 @@ def collection_management():
             # DB에서 수집기 목록 조회 (명시적 컬럼 지정으로 매핑 오류 방지)
             query = """
                 SELECT source_key, label, api_desc, trigger_val, log_source, 
-                       config_key_enabled, api_key_config, period_key, freq_key, is_default, endpoint 
+                       config_key_enabled, api_key_config, period_key, freq_key, is_default, endpoint,
+                       record_path, column_mapping
                 FROM collection_sources 
                 ORDER BY is_default DESC, id ASC
             """
             rows = conn.execute(text(query)).fetchall()
+
+            # [New] 소스별 마지막 실행 로그를 한 번에 조회
+            last_logs = get_recent_logs_by_source(collector.engine, list({row[4] for row in rows}), limit=1)
+
+            # [New] 소스별 누적 집계는 롤업 테이블에서 한 번에 조회
+            try:
+                log_totals = log_totals_by_source(conn)
+            except Exception as e:
+                print(f"수집 로그 누적 집계 실패: {e}")
+                conn.rollback()
+                log_totals = {}
             
             for row in rows:
                 # 인덱스로 매핑하여 안전하게 딕셔너리 생성
@@ -890,45 +1119,30 @@ def collection_management():
                     'period_key': row[7],
                     'freq_key': row[8],
                     'is_default': row[9],
-                    'endpoint': row[10]
+                    'endpoint': row[10],
+                    'record_path': row[11],
+                    'column_mapping': row[12]
                 }
                 
-                logs = get_recent_logs(collector.engine, source=src['log_source'], limit=1)
+                logs = last_logs.get(src['log_source'])
                 last_log = logs[0] if logs else {}
             
                 # [New] Calculate Next Run Time
                 next_run_str = "-"
                 if configs.get(src['config_key_enabled'], '1') == '1':
                     try:
-                        freq = configs.get(src['freq_key'], 'daily')
-                        now = datetime.now()
-                        
-                        if freq == 'daily':
-                            run_time_str = configs.get(f"COLLECTION_TIME_{src['source_key']}", '09:00')
-                            run_time = datetime.strptime(run_time_str, "%H:%M").time()
-                            next_run = datetime.combine(now.date(), run_time)
-                            if next_run <= now:
-                                next_run += timedelta(days=1)
-                            next_run_str = next_run.strftime('%m-%d %H:%M')
-                        else:
-                            next_run_str = f"Scheduled ({freq})"
+                        # 스케줄러와 같은 계산 사용 (scheduler.collection_next_run)
+                        next_run = collection_next_run(src['source_key'], src['freq_key'], configs, datetime.now())
+                        next_run_str = next_run.strftime('%m-%d %H:%M')
                     except Exception:
                         next_run_str = "계산 오류"
                 else:
                     next_run_str = "비활성"
 
-                # 집계 데이터 조회 (최초 실행, 누적 건수)
-                try:
-                        agg = conn.execute(text("""
-                            SELECT MIN(executed_at), SUM(row_count) 
-                            FROM collection_logs 
-                            WHERE target_source = :s
-                        """), {'s': src['log_source']}).fetchone()
-                        first_run = agg[0].strftime('%Y-%m-%d %H:%M') if agg[0] else '-'
-                        total_count = int(agg[1]) if agg[1] else 0
-                except Exception:
-                    first_run = '-'
-                    total_count = 0
+                # 집계 데이터 (최초 실행, 누적 건수) — 일일 롤업 기준
+                totals = log_totals.get(src['log_source'])
+                first_run = totals['first_run'].strftime('%Y-%m-%d %H:%M') if totals and totals['first_run'] else '-'
+                total_count = totals['row_count'] if totals else 0
 
                 sources.append({
                     'key': src['source_key'],
@@ -953,7 +1167,13 @@ def collection_management():
                     'first_run': first_run,
                     'next_run': next_run_str,
                     'total_count': "{:,}".format(total_count),
-                    'is_default': src['is_default'] == 1
+                    'is_default': src['is_default'] == 1,
+                    'record_path': src['record_path'] or '',
+                    'column_mapping': src['column_mapping'] or '',
+                    'flat_table': custom_table_name(src['source_key']) if src['record_path'] else None,
+                    'circuit': circuit_states.get(src['log_source']),
+                    'timing': timings.get(src['log_source']),
+                    'phases': phase_breakdown.get(src['log_source'], {})
                 })
 
         return render_template('collection_management.html', sources=sources)
@@ -979,6 +1199,7 @@ def toggle_collector():
             current = conn.execute(text("SELECT config_value FROM service_config WHERE config_key = :k"), {'k': config_key}).scalar()
             new_val = '0' if current == '1' else '1'
             conn.execute(text("UPDATE service_config SET config_value = :v WHERE config_key = :k"), {'v': new_val, 'k': config_key})
+            notify_schedule_changed(conn)
             conn.commit()
         flash(f'{source} 수집기가 {"ON" if new_val == "1" else "OFF"}로 변경되었습니다.', 'success')
     except Exception as e:
@@ -1026,6 +1247,27 @@ def update_collection_config():
                     conn.execute(text("UPDATE collection_sources SET endpoint = :ep WHERE source_key = :k"), {'ep': request.form[ep_key], 'k': s.source_key})
                 if desc_key in request.form:
                     conn.execute(text("UPDATE collection_sources SET api_desc = :desc WHERE source_key = :k"), {'desc': request.form[desc_key], 'k': s.source_key})
+
+                # [New] 테이블 평탄화 설정 (변경 시 스키마 캐시/조건부 요청 정보 초기화 → 다음 수집 때 재적재)
+                path_key = f"record_path_{s.source_key}"
+                mapping_key = f"column_mapping_{s.source_key}"
+                if path_key in request.form:
+                    record_path = request.form[path_key].strip() or None
+                    column_mapping = request.form.get(mapping_key, '').strip() or None
+                    if column_mapping:
+                        parsed = json.loads(column_mapping)
+                        if not isinstance(parsed, dict):
+                            raise ValueError("컬럼 매핑은 {\"컬럼명\": \"경로\"} 형태의 JSON이어야 합니다.")
+                        column_mapping = json.dumps(parsed, ensure_ascii=False)
+                    current = conn.execute(text("SELECT record_path, column_mapping FROM collection_sources WHERE source_key = :k"), {'k': s.source_key}).fetchone()
+                    if current is not None and (current[0], current[1]) != (record_path, column_mapping):
+                        conn.execute(text("""
+                            UPDATE collection_sources
+                            SET record_path = :rp, column_mapping = :cm, schema_cache = NULL,
+                                last_etag = NULL, last_modified = NULL, content_hash = NULL
+                            WHERE source_key = :k
+                        """), {'rp': record_path, 'cm': column_mapping, 'k': s.source_key})
+            notify_schedule_changed(conn)
             conn.commit()
         flash("수집 설정이 저장되었습니다.", "success")
     except Exception as e:
@@ -1070,6 +1312,13 @@ def add_collection_source():
         
         collector = get_collector()
         with collector.engine.connect() as conn:
+            # [New] 평탄화 테이블명이 기존 소스와 겹치면 적재 시 서로의 테이블을 덮어쓰므로 거부
+            existing_keys = [r[0] for r in conn.execute(text("SELECT source_key FROM collection_sources")).fetchall()]
+            conflict = find_table_name_conflict(source_key, existing_keys)
+            if conflict or source_key in existing_keys:
+                flash(f"추가 실패: 수집기 키가 기존 수집기({conflict or source_key})와 충돌합니다. 다시 시도해주세요.", "error")
+                return redirect(url_for('collection_management'))
+
             conn.execute(text("""
                 INSERT INTO collection_sources (source_key, label, api_desc, trigger_val, log_source, config_key_enabled, api_key_config, period_key, freq_key, is_default, endpoint)
                 VALUES (:key, :label, :desc, :trig, :log, :conf_en, :conf_key, :per_key, :freq_key, 0, :endp)
@@ -1085,6 +1334,7 @@ def add_collection_source():
             conn.execute(text("INSERT INTO service_config (config_key, config_value) VALUES (:k, :v)"), {'k': api_key_config, 'v': api_key_val})
             conn.execute(text("INSERT INTO service_config (config_key, config_value) VALUES (:k, :v)"), {'k': period_key, 'v': period_val})
             conn.execute(text("INSERT INTO service_config (config_key, config_value) VALUES (:k, :v)"), {'k': freq_key, 'v': freq_val})
+            notify_schedule_changed(conn)
             
             conn.commit()
             
@@ -1107,6 +1357,7 @@ def delete_collection_source():
                     conn.execute(text("DELETE FROM service_config WHERE config_key = :k"), {'k': key})
             
             conn.execute(text("DELETE FROM collection_sources WHERE source_key = :k"), {'k': source_key})
+            notify_schedule_changed(conn)
             conn.commit()
             flash("수집기가 삭제되었습니다.", "success")
     except Exception as e:
@@ -1133,23 +1384,44 @@ def trigger_job():
             flash(f"'{source_key}' 수집기가 비활성화 상태입니다. 수집 관리에서 활성화해주세요.", "warning")
             return redirect(url_for('collection_management'))
 
-        if job_type == 'loan':
-            collector.collect_fss_loan_products()
-            flash("대출상품 수집 작업이 요청되었습니다. 잠시 후 로그를 확인하세요.", "success")
-        elif job_type == 'economy':
-            collector.collect_economic_indicators()
-            flash("경제 지표 수집 작업이 요청되었습니다. 잠시 후 로그를 확인하세요.", "success")
-        elif job_type == 'income':
-            collector.collect_kosis_income_stats()
-            flash("소득 통계 수집 작업이 요청되었습니다. 잠시 후 로그를 확인하세요.", "success")
+        # [New] 요청 스레드에서 직접 수집하지 않고 작업 큐에 등록 후 바로 응답
+        job_id, created = get_job_queue().submit(
+            source_key, lambda: run_collection_source(collector, job_type, source_key, endpoint))
+        if wants_json():
+            return {'job_id': job_id, 'created': created, 'status_url': url_for('job_status', job_id=job_id)}
+
+        labels = {'loan': "대출상품", 'economy': "경제 지표", 'income': "소득 통계"}
+        label = labels.get(job_type, f"'{source_key}'")
+        if created:
+            flash(f"{label} 수집 작업이 등록되었습니다. (작업 ID: {job_id[:8]}) 잠시 후 로그를 확인하세요.", "success")
         else:
-            flash(f"'{source_key}' 수집 작업이 요청되었습니다. 잠시 후 로그를 확인하세요.", "success")
-            collector.collect_custom_source(source_key, endpoint)
+            flash(f"{label} 수집 작업이 이미 진행 중입니다. (작업 ID: {job_id[:8]})", "warning")
 
     except Exception as e:
+        if wants_json():
+            return {'error': str(e)}, 500
         flash(f"실행 실패: {e}", "error")
     return redirect(url_for('index'))
 
+def wants_json():
+    """JSON 응답을 원하는 요청인지 (fetch/XHR 호출)"""
+    return request.accept_mimetypes.best == 'application/json' or request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+@app.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    """수집 작업 상태 조회 (queued/running/done/failed)"""
+    try:
+        job = get_job_queue().get(job_id)
+    except Exception as e:
+        return {'error': str(e)}, 500
+    if not job:
+        return {'error': '작업을 찾을 수 없습니다.'}, 404
+    for key in ('created_at', 'started_at', 'finished_at'):
+        if job[key] is not None:
+            job[key] = str(job[key])
+    return job
+
 # ==========================================================================
 # [라우트] F2: 신용평가 가중치 관리
 # ==========================================================================
@@ -1180,6 +1452,7 @@ def credit_weights():
                     for key, val in updates.items():
                         conn.execute(text("UPDATE service_config SET config_value = :v WHERE config_key = :k"), {'v': str(val), 'k': key})
                     conn.commit()
+                invalidate_dashboard_stats()
                 flash("신용평가 설정이 저장되었습니다.", 'success')
                 return redirect(url_for('credit_weights'))
 
@@ -1225,6 +1498,7 @@ def recommend_settings():
                 for key, val in updates.items():
                     conn.execute(text("UPDATE service_config SET config_value = :v WHERE config_key = :k"), {'v': str(val), 'k': key})
                 conn.commit()
+            invalidate_dashboard_stats()
             flash("추천 설정이 저장되었습니다.", 'success')
             return redirect(url_for('recommend_settings'))
 
@@ -1265,7 +1539,8 @@ def products():
             
         # Pagination
         with collector.engine.connect() as conn:
-            total_count = conn.execute(text(count_query), params).scalar()
+            # 검색 조건이 없으면 행 수 카운터 사용 (COUNT(*) 생략)
+            total_count = conn.execute(text(count_query), params).scalar() if search else table_count(conn, 'raw_loan_products')
             # Stats (Global)
             visible_count = conn.execute(text("SELECT COUNT(*) FROM raw_loan_products WHERE is_visible = 1")).scalar()
             hidden_count = conn.execute(text("SELECT COUNT(*) FROM raw_loan_products WHERE is_visible = 0")).scalar()
@@ -1528,7 +1803,7 @@ def mission_complete(mission_id):
                 expires_at = datetime.now() + timedelta(days=365)
                 
                 # 트랜잭션 기록 (expires_at 포함)
-                conn.execute(text("""
+                tx = conn.execute(text("""
                     INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id, reference_id, expires_at)
                     VALUES (:uid, :amt, 'mission_reward', :reason, 'system', :ref, :exp)
                 """), {
@@ -1538,6 +1813,8 @@ def mission_complete(mission_id):
                     'ref': f"mission_{mission_id}",
                     'exp': expires_at
                 })
+                # [New] 적립 lot 생성
+                record_point_lot(conn, user_id, reward, expires_at, tx.lastrowid)
                 
                 # 유저 잔액 업데이트
                 conn.execute(text("""
@@ -2043,10 +2320,15 @@ def points_adjust():
                     "INSERT INTO user_points (user_id, balance, total_earned, total_spent) VALUES (:uid, :amt, :amt, 0)"
                 ), {'uid': user_id, 'amt': amount})
 
-            conn.execute(text("""
+            tx = conn.execute(text("""
                 INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id)
                 VALUES (:uid, :amt, 'manual', :reason, :admin)
             """), {'uid': user_id, 'amt': amount, 'reason': reason, 'admin': 'admin'})
+            # [New] lot 원장 반영 (지급: lot 생성, 차감: 오래된 lot부터 소진)
+            if amount > 0:
+                record_point_lot(conn, user_id, amount, None, tx.lastrowid)
+            else:
+                consume_point_lots(conn, user_id, amount)
             conn.commit()
 
         action = "지급" if amount > 0 else "차감"
@@ -2070,7 +2352,7 @@ def point_products():
         collector = get_collector()
         
         with collector.engine.connect() as conn:
-            total_count = conn.execute(text("SELECT COUNT(*) FROM point_products")).scalar()
+            total_count = table_count(conn, 'point_products')
             # Global Stats
             active_count = conn.execute(text("SELECT COUNT(*) FROM point_products WHERE is_active = 1")).scalar()
 
@@ -2106,6 +2388,7 @@ def point_product_add():
                     'cost': int(request.form['point_cost']),
                     'stock': int(request.form['stock_quantity']),
                 })
+                bump_counter(conn, 'point_products', 1)
                 conn.commit()
             flash("상품이 추가되었습니다.", 'success')
             return redirect(url_for('point_products'))
@@ -2410,13 +2693,24 @@ def system_info():
         'memory_mb': memory_mb
     }
     db_info = {'version': 'Unknown'}
+    http_stats = {}
+    leader = None
     try:
         collector = get_collector()
         with collector.engine.connect() as conn:
             db_info['version'] = conn.execute(text("SELECT VERSION()")).scalar()
+        # [New] 외부 API 호스트별 연결 재사용 통계
+        http_stats = collector.get_http_stats()
+        # [New] 스케줄러 리더 (heartbeat가 3주기 이상 끊기면 stale 표시)
+        raw_leader = collector._get_config(SCHEDULER_LEADER_KEY)
+        if raw_leader:
+            leader = json.loads(raw_leader)
+            heartbeat = datetime.strptime(leader['heartbeat'], '%Y-%m-%d %H:%M:%S')
+            leader['stale'] = (datetime.now() - heartbeat).total_seconds() > LEADER_HEARTBEAT_SEC * 3
+            leader['is_self'] = bool(_leader and _leader.is_leader)
     except Exception:
         pass
-    return render_template('system_info.html', sys_info=sys_info, db_info=db_info)
+    return render_template('system_info.html', sys_info=sys_info, db_info=db_info, http_stats=http_stats, leader=leader)
 
 # ==========================================================================
 # [라우트] 데이터 조회, 시뮬레이터 (기존 기능 유지)
@@ -2425,8 +2719,9 @@ def system_info():
 @app.route('/data/<table_name>')
 @login_required
 def view_data(table_name):
-    allowed_tables = ['raw_loan_products', 'raw_economic_indicators', 'raw_income_stats', 'collection_logs', 'service_config', 'missions', 'user_points', 'point_transactions', 'point_products', 'point_purchases', 'users', 'notifications']
-    if table_name not in allowed_tables:
+    allowed_tables = ['raw_loan_products', 'raw_economic_indicators', 'raw_income_stats', 'collection_logs', 'collection_log_daily', 'error_signatures', 'service_config', 'missions', 'user_points', 'point_transactions', 'point_products', 'point_purchases', 'users', 'notifications']
+    # [New] 커스텀 수집기 평탄화 테이블(custom_<source_key>) 조회 허용
+    if table_name not in allowed_tables and not re.fullmatch(r'custom_[a-z0-9_]+', table_name):
         flash(f"허용되지 않은 테이블입니다: {table_name}", "error")
         return redirect(url_for('index'))
 
@@ -2448,8 +2743,13 @@ def view_data(table_name):
             where_clause = f" WHERE {search_col} LIKE %(search_val)s"
             params['search_val'] = f"%{search_val}%"
 
-        count_df = pd.read_sql(f"SELECT COUNT(*) FROM {table_name}" + where_clause, collector.engine, params=params)
-        total_count = count_df.iloc[0, 0]
+        if where_clause or table_name not in COUNTED_TABLES:
+            count_df = pd.read_sql(f"SELECT COUNT(*) FROM {table_name}" + where_clause, collector.engine, params=params)
+            total_count = count_df.iloc[0, 0]
+        else:
+            # 모든 쓰기 경로가 카운터를 갱신하는 테이블만 행 수 카운터 사용 (COUNT(*) 생략)
+            with collector.engine.connect() as conn:
+                total_count = table_count(conn, table_name)
         total_pages = max(1, (total_count + per_page - 1) // per_page)
         if page < 1: page = 1
         if page > total_pages: page = total_pages
@@ -2483,6 +2783,7 @@ def mark_notification_read(notification_id):
                 {'id': notification_id}
             )
             conn.commit()
+        invalidate_dashboard_stats()
         flash("알림이 읽음 처리되었습니다.", "success")
     except Exception as e:
         flash(f"알림 처리 실패: {e}", "error")
@@ -2494,20 +2795,22 @@ def data_file_viewer():
     data_dir = os.path.join(basedir, 'data', 'custom_sources')
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
-    
+    store = SnapshotStore(data_dir)
+
+    def _fmt_size(size):
+        return f"{size / 1024:.1f} KB" if size > 1024 else f"{size} B"
+
     files = []
     try:
-        for f in os.listdir(data_dir):
-            if f.endswith('.json'):
-                path = os.path.join(data_dir, f)
-                stats = os.stat(path)
-                size_str = f"{stats.st_size / 1024:.1f} KB" if stats.st_size > 1024 else f"{stats.st_size} B"
-                files.append({
-                    'name': f,
-                    'size': size_str,
-                    'mtime': datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M')
-                })
-        files.sort(key=lambda x: x['name'], reverse=True)
+        # [New] 스냅샷 저장소(manifest) + 이전 방식 .json 파일을 함께 조회
+        for item in store.list_snapshots():
+            files.append({
+                'name': item['name'],
+                'size': _fmt_size(item['stored_size']),
+                'raw_size': _fmt_size(item['raw_size']),
+                'compressed': not item['legacy'],
+                'mtime': item['saved_at'][:16]
+            })
     except Exception as e:
         flash(f"파일 목록 조회 실패: {e}", "error")
     
@@ -2518,13 +2821,10 @@ def data_file_viewer():
             flash("잘못된 파일명입니다.", "error")
         else:
             try:
-                path = os.path.join(data_dir, selected_file)
-                if os.path.exists(path):
-                    with open(path, 'r', encoding='utf-8') as f:
-                        content = json.load(f)
-                        file_content = json.dumps(content, indent=4, ensure_ascii=False)
-                else:
-                    flash("파일을 찾을 수 없습니다.", "error")
+                content = store.read(selected_file)
+                file_content = json.dumps(content, indent=4, ensure_ascii=False)
+            except FileNotFoundError:
+                flash("파일을 찾을 수 없습니다.", "error")
             except Exception as e:
                 flash(f"파일 읽기 실패: {e}", "error")
 
@@ -2545,9 +2845,8 @@ def delete_data_file():
         
     try:
         data_dir = os.path.join(basedir, 'data', 'custom_sources')
-        path = os.path.join(data_dir, filename)
-        if os.path.exists(path):
-            os.remove(path)
+        # [New] manifest 항목 삭제 후 참조가 없는 압축 객체도 정리
+        if SnapshotStore(data_dir).delete(filename):
             flash(f"파일 '{filename}'이(가) 삭제되었습니다.", "success")
         else:
             flash("파일을 찾을 수 없습니다.", "error")
@@ -2707,7 +3006,8 @@ def user_stats_edit(user_id):
                     updates.append(f"{col} = :{col}")
                 
                 if exists:
-                    sql = f"UPDATE user_stats SET {', '.join(updates)} WHERE user_id = :uid"
+                    # updated_at은 미션 변경분 평가(MISSION_EVAL_HWM)의 기준이므로 값이 같아도 갱신
+                    sql = f"UPDATE user_stats SET {', '.join(updates)}, updated_at = CURRENT_TIMESTAMP WHERE user_id = :uid"
                     conn.execute(text(sql), params)
                 else:
                     cols_str = ", ".join(cols)
@@ -1,19 +1,385 @@
 import pandas as pd
 import requests
+import asyncio
 import traceback
 import json
+import hashlib
+import random
+import uuid
 try:
     import schedule
 except ImportError:
     schedule = None
+try:
+    import ijson  # 스트리밍 JSON 파서 (대용량 응답 검증용)
+except ImportError:
+    ijson = None
 import time
-from datetime import datetime
+import threading
+import contextvars
+import functools
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
 import os
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
 import toml
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from snapshot_store import SnapshotStore
+from flattener import RecordFlattener, SQL_TYPES, custom_table_name
+from point_ledger import (LEDGER_READY_KEY, fifo_remaining, record_point_lots,
+                          expire_point_lots, find_point_lot_mismatches, rebuild_point_lots)
+from log_retention import compact_collection_logs
+from error_signatures import record_error_signature, error_summary
+from table_counters import bump_counter, set_counter, reconcile_table_counters
+
+# 수집 1회의 단계별(fetch / parse / db_write) 소요 시간 (collection_logs.run_id로 연결)
+COLLECTION_LOG_PHASES_DDL = """
+    CREATE TABLE IF NOT EXISTS collection_log_phases (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        run_id VARCHAR(32) NOT NULL,
+        target_source VARCHAR(100) NOT NULL,
+        phase VARCHAR(20) NOT NULL,
+        duration_ms INT NOT NULL,
+        executed_at DATETIME NOT NULL,
+        INDEX idx_log_phases_run (run_id),
+        INDEX idx_log_phases_source (target_source, executed_at)
+    )
+"""
+
+# 현재 수집 실행의 PhaseTimer (asyncio.to_thread는 컨텍스트를 복사하므로 비동기 수집에도 전달됨)
+_PHASE_TIMER = contextvars.ContextVar('collection_phase_timer', default=None)
+_END = object()
+
+
+class PhaseTimer:
+    """수집 1회의 전체/단계별 소요 시간 측정
+
+    단계가 중첩되면 안쪽 단계 시간은 바깥 단계에서 빼고 기록한다. (단계별 시간 합 ≤ 전체 시간)
+    예: db_write 중에 청크를 만들기 위해 페이지를 받는 시간은 fetch로만 집계
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.logged = False
+        self._stack = []
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - started
+            nested = self._stack.pop()
+            self.phases[name] = self.phases.get(name, 0.0) + (total - nested)
+            if self._stack:
+                self._stack[-1] += total
+
+    def elapsed_ms(self):
+        return int((time.perf_counter() - self.started) * 1000)
+
+    def phase_ms(self):
+        return {name: int(sec * 1000) for name, sec in self.phases.items()}
+
+
+def timed_collection(func):
+    """수집 진입점 데코레이터: 호출마다 새 PhaseTimer를 시작하고 _log_status에서 기록"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _PHASE_TIMER.set(PhaseTimer())
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _PHASE_TIMER.reset(token)
+    return wrapper
+
+
+class TokenBucket:
+    """토큰 버킷 (초당 rate개 충전, 최대 capacity개 누적)
+
+    토큰이 부족하면 잔량을 음수로 예약하고 그만큼 대기하므로 먼저 요청한 스레드가 먼저 통과한다.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """토큰 1개를 예약하고 대기해야 하는 시간(초) 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        """토큰을 얻을 때까지 대기하고 대기 시간(초) 반환"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """호스트별 토큰 버킷 모음 (스케줄 실행, 수동 실행, API 검증이 같은 한도를 공유)
+
+    config_loader: () → (기본 초당 요청 수, 기본 버스트, {호스트: 초당 요청 수 | {'rps', 'burst'}})
+    초당 요청 수가 0 이하이면 제한하지 않는다. 설정은 reload_interval초마다 다시 읽는다.
+    """
+
+    def __init__(self, config_loader, reload_interval=60):
+        self.config_loader = config_loader
+        self.reload_interval = reload_interval
+        self._buckets = {}
+        self._limits = {}
+        self._stats = {}
+        self._default = (0.0, 1.0)
+        self._overrides = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _limit_for(self, host):
+        """호스트의 (rps, burst) — 설정 재조회 주기가 지났으면 다시 계산"""
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.reload_interval:
+            default_rps, default_burst, overrides = self.config_loader()
+            self._loaded_at = now
+            self._default = (default_rps, default_burst)
+            self._overrides = overrides or {}
+            self._limits.clear()
+
+        if host not in self._limits:
+            override = self._overrides.get(urlparse(host).hostname or host)
+            rps, burst = self._default
+            if isinstance(override, dict):
+                rps = float(override.get('rps', rps))
+                burst = float(override.get('burst', max(1.0, rps)))
+            elif override is not None:
+                rps = float(override)
+                burst = max(1.0, rps)
+            self._limits[host] = (rps, burst)
+        return self._limits[host]
+
+    def acquire(self, host):
+        """host로 요청을 보내기 전에 호출. 대기한 시간(초) 반환"""
+        with self._lock:
+            rps, burst = self._limit_for(host)
+            bucket = None
+            if rps > 0:
+                bucket = self._buckets.get(host)
+                # 한도가 바뀐 경우에만 버킷 교체 (설정 재조회만으로 토큰이 다시 채워지지 않도록)
+                if bucket is None or (bucket.rate, bucket.capacity) != (float(rps), max(1.0, float(burst))):
+                    bucket = self._buckets[host] = TokenBucket(rps, burst)
+            stat = self._stats.setdefault(host, {'throttled': 0, 'wait_total': 0.0, 'wait_max': 0.0})
+
+        wait = bucket.acquire() if bucket else 0.0
+        if wait > 0:
+            with self._lock:
+                stat['throttled'] += 1
+                stat['wait_total'] += wait
+                stat['wait_max'] = max(stat['wait_max'], wait)
+        return wait
+
+    def stats(self):
+        """호스트별 한도(rps)와 대기 횟수/누적·최대 대기 시간(초)"""
+        with self._lock:
+            return {
+                host: dict(stat, rps=self._limits.get(host, (0, 0))[0],
+                           wait_total=round(stat['wait_total'], 3), wait_max=round(stat['wait_max'], 3))
+                for host, stat in self._stats.items()
+            }
+
+
+class CircuitOpenError(Exception):
+    """회로 차단 상태인 소스로의 호출 (업스트림 장애로 판단되어 즉시 실패)"""
+
+
+class RetryPolicy:
+    """지수 백오프 + full jitter 재시도 정책
+
+    재시도 대상: 연결 오류, 타임아웃, 429, 5xx. 그 외(4xx, 파싱 오류 등)는 즉시 실패.
+    """
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=10.0):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def is_retryable_status(self, status_code):
+        return status_code in self.RETRYABLE_STATUS or status_code >= 500
+
+    def is_retryable(self, exc):
+        if isinstance(exc, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+            return True
+        if isinstance(exc, requests.HTTPError) and exc.response is not None:
+            return self.is_retryable_status(exc.response.status_code)
+        return False
+
+    def delay(self, attempt, response=None):
+        """attempt(0부터)번째 실패 후 대기 시간. 429/503의 Retry-After(초)가 있으면 우선 (max_delay 이내)"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.max_delay, float(retry_after))
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """소스별 회로 차단기 (closed → open → half_open → closed)
+
+    연속 failure_threshold회 실패하면 open 되어 reset_timeout초 동안 호출을 즉시 거부하고,
+    이후 한 번의 시험 호출(half_open)이 성공하면 closed, 실패하면 다시 open 된다.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """호출 가능 여부 확인 (불가 시 CircuitOpenError)"""
+        with self._lock:
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probe_in_flight):
+                retry_at = datetime.fromtimestamp(self.opened_at + self.reset_timeout).strftime('%H:%M:%S')
+                raise CircuitOpenError(f"Circuit open (retry after {retry_at}): {self.last_error}")
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:200] if error is not None else self.last_error
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            retry_at = None
+            if self.state == self.OPEN:
+                retry_at = datetime.fromtimestamp(self.opened_at + self.reset_timeout).strftime('%Y-%m-%d %H:%M:%S')
+            return {'state': self.state, 'failures': self.failures, 'retry_at': retry_at, 'last_error': self.last_error}
+
+
+class HttpClient:
+    """호스트별 keep-alive 세션 풀을 관리하는 HTTP 클라이언트
+
+    같은 호스트로의 반복 요청은 하나의 requests.Session(연결 풀)을 재사용하므로
+    TCP/TLS 핸드셰이크를 다시 하지 않는다.
+    """
+
+    def __init__(self, pool_maxsize=10, connect_timeout=5, read_timeout=30, rate_limiter=None):
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.rate_limiter = rate_limiter
+        self._sessions = {}
+        self._request_counts = {}
+        self._lock = threading.Lock()
+
+    def _host_key(self, url):
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def _session_for(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+                self._request_counts[host] = 0
+            self._request_counts[host] += 1
+            return session
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """timeout 미지정 시 (connect_timeout, read_timeout) 적용. rate_limiter가 있으면 호스트 한도만큼 대기 후 요청"""
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        host = self._host_key(url)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(host)
+        session = self._session_for(host)
+        return session.request(method, url, timeout=timeout, **kwargs)
+
+    def get(self, url, params=None, **kwargs):
+        return self.request('GET', url, params=params, **kwargs)
+
+    def stats(self):
+        """호스트별 요청 수, 새로 연 연결 수, 재사용된 요청 수"""
+        with self._lock:
+            sessions = list(self._sessions.items())
+            counts = dict(self._request_counts)
+
+        throttle = self.rate_limiter.stats() if self.rate_limiter is not None else {}
+        result = {}
+        for host, session in sessions:
+            opened = 0
+            for adapter in {id(a): a for a in session.adapters.values()}.values():
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        opened += pool.num_connections
+            requests_made = counts.get(host, 0)
+            result[host] = {
+                'requests': requests_made,
+                'connections_opened': opened,
+                'reused': max(0, requests_made - opened),
+                'rate_limit': throttle.get(host, {}).get('rps', 0),
+                'throttled': throttle.get(host, {}).get('throttled', 0),
+                'wait_total': throttle.get(host, {}).get('wait_total', 0.0),
+                'wait_max': throttle.get(host, {}).get('wait_max', 0.0),
+            }
+        return result
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._request_counts.clear()
+
 
 class DataCollector:
+    # 기본 수집기 (collection_sources.trigger_val → 수집 메서드, 로그 소스명)
+    BUILTIN_JOBS = {
+        'loan': ('collect_fss_loan_products', 'FSS_LOAN_API'),
+        'income': ('collect_kosis_income_stats', 'KOSIS_INCOME_API'),
+        'economy': ('collect_economic_indicators', 'ECONOMIC_INDICATORS'),
+    }
+
+    FSS_LOAN_API_URL = "http://finlife.fss.or.kr/finlifeapi/creditLoanProductsSearch.json"
+
     def __init__(self, engine=None):
         # 외부에서 engine을 주입받으면 사용, 아니면 자체 생성 (Standalone 모드)
         if engine:
@@ -21,6 +387,20 @@ class DataCollector:
         else:
             self.engine = self._create_default_engine()
 
+        # [New] 소스(API)별 동시 실행 제한용 세마포어
+        self._source_slots = {}
+        self._source_slots_lock = threading.Lock()
+
+        # [New] 호스트별 keep-alive HTTP 세션 풀 (최초 사용 시 service_config 값으로 생성)
+        self._http = None
+        self._breakers = {}
+        self._breaker_lock = threading.Lock()
+        self._http_lock = threading.Lock()
+
+        # 커스텀 수집기 JSON 저장 경로
+        self._snapshot_store = None
+        self.custom_source_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'custom_sources')
+
     def _create_default_engine(self):
         """단독 실행 시 secrets.toml을 읽어 DB 엔진 생성"""
         try:
@@ -52,61 +432,176 @@ class DataCollector:
         raise ValueError("DB 연결 설정을 찾을 수 없습니다. (secrets.toml 또는 환경변수를 확인해주세요.)")
 
     def _log_status(self, source, status, row_count=0, error_msg=None, level='INFO'):
-        """수집 결과를 collection_logs 테이블에 기록"""
+        """수집 결과를 collection_logs 테이블에 기록
+
+        진행 중인 PhaseTimer가 있으면 전체 소요 시간(duration_ms)과 단계별 시간(collection_log_phases)을 함께 기록
+        ERROR 로그의 메시지는 마지막 줄 요약 + error_signature(전체 텍스트는 error_signatures)로 기록
+        """
+        timer = _PHASE_TIMER.get()
+        if timer is not None and timer.logged:
+            timer = None
+        executed_at = datetime.now()
+
+        # [New] 에러는 지문(error_signatures)으로 전체 텍스트를 한 번만 저장하고 로그에는 요약만 남김
+        signature = None
+        if error_msg and level == 'ERROR':
+            try:
+                with self.engine.connect() as conn:
+                    signature = record_error_signature(conn, source, error_msg, executed_at)
+                    conn.commit()
+                error_msg = error_summary(error_msg)
+            except Exception as e:
+                print(f"에러 지문 기록 실패: {e}")
+
         log_data = {
             'target_source': source,
             'status': status,
             'row_count': row_count,
             'error_message': error_msg,
             'level': level,
-            'executed_at': datetime.now()
+            'executed_at': executed_at,
+            'duration_ms': timer.elapsed_ms() if timer else None,
+            'run_id': timer.run_id if timer else None,
+            'error_signature': signature,
         }
         df = pd.DataFrame([log_data])
         
         try:
-            df.to_sql('collection_logs', self.engine, if_exists='append', index=False)
+            self._append_log_row(df)
         except Exception as e:
             # 컬럼이 없을 경우 자동 추가 (Self-Repair)
             if "Unknown column" in str(e) or "1054" in str(e):
                 try:
                     with self.engine.connect() as conn:
-                        conn.execute(text("ALTER TABLE collection_logs ADD COLUMN level VARCHAR(20) DEFAULT 'INFO'"))
+                        for ddl in ("ALTER TABLE collection_logs ADD COLUMN level VARCHAR(20) DEFAULT 'INFO'",
+                                    "ALTER TABLE collection_logs ADD COLUMN duration_ms INT",
+                                    "ALTER TABLE collection_logs ADD COLUMN run_id VARCHAR(32)",
+                                    "ALTER TABLE collection_logs ADD COLUMN error_signature CHAR(40)"):
+                            try:
+                                conn.execute(text(ddl))
+                            except Exception:
+                                pass
                         conn.commit()
-                    df.to_sql('collection_logs', self.engine, if_exists='append', index=False)
+                    self._append_log_row(df)
                 except Exception:
                     print(f"로그 저장 실패: {e}")
             else:
                 print(f"로그 저장 실패: {e}")
 
-        print(f"[{source}] [{level}] {status} - Rows: {row_count}")
+        if timer:
+            timer.logged = True
+            self._log_phases(timer, source, executed_at)
+            print(f"[{source}] [{level}] {status} - Rows: {row_count}, {timer.elapsed_ms()}ms {timer.phase_ms()}")
+        else:
+            print(f"[{source}] [{level}] {status} - Rows: {row_count}")
+
+    def _append_log_row(self, df):
+        """로그 행 INSERT와 collection_logs 카운터 증가를 한 트랜잭션으로 기록"""
+        with self.engine.connect() as conn:
+            df.to_sql('collection_logs', conn, if_exists='append', index=False)
+            self._update_counter(conn, 'collection_logs', delta=1)
+            conn.commit()
+
+    def _log_phases(self, timer, source, executed_at):
+        """단계별 소요 시간을 collection_log_phases에 기록"""
+        rows = [{'run_id': timer.run_id, 'target_source': source, 'phase': name,
+                 'duration_ms': ms, 'executed_at': executed_at}
+                for name, ms in timer.phase_ms().items()]
+        if not rows:
+            return
+        try:
+            pd.DataFrame(rows).to_sql('collection_log_phases', self.engine, if_exists='append', index=False)
+        except Exception as e:
+            print(f"단계별 소요 시간 저장 실패: {e}")
+
+    @staticmethod
+    def _phase(name):
+        """현재 수집 실행의 단계 시간 측정 (PhaseTimer가 없으면 아무것도 하지 않음)"""
+        timer = _PHASE_TIMER.get()
+        return timer.phase(name) if timer is not None else nullcontext()
+
+    def _timed_iter(self, iterable, name):
+        """iterable에서 다음 항목을 만드는 데 걸린 시간을 name 단계로 집계"""
+        it = iter(iterable)
+        while True:
+            with self._phase(name):
+                item = next(it, _END)
+            if item is _END:
+                return
+            yield item
+
+    def _load_visibility_map(self):
+        """raw_loan_products의 (bank_name, product_name) → is_visible 매핑"""
+        visibility_map = {}
+        try:
+            existing = pd.read_sql("SELECT bank_name, product_name, is_visible FROM raw_loan_products", self.engine)
+            for _, row in existing.iterrows():
+                visibility_map[(row['bank_name'], row['product_name'])] = row['is_visible']
+        except Exception:
+            pass
+        return visibility_map
+
+    def _apply_visibility(self, df, visibility_map):
+        """보존된 is_visible 복원 (신규 상품은 기본값 1)"""
+        if 'is_visible' not in df.columns:
+            df['is_visible'] = df.apply(
+                lambda row: visibility_map.get((row['bank_name'], row['product_name']), 1), axis=1
+            )
+        return df
 
     def _replace_table(self, table_name, df):
         """기존 데이터를 삭제하고 새 데이터로 교체 (중복 적재 방지)
-        raw_loan_products의 경우 is_visible 값을 보존함"""
-        with self.engine.connect() as conn:
+        raw_loan_products의 경우 is_visible 값을 보존함
+        DELETE, INSERT, 행 수 카운터 갱신은 한 트랜잭션으로 처리한다."""
+        with self._phase('db_write'):
             if table_name == 'raw_loan_products':
                 # is_visible 보존: 기존 매핑 저장
-                visibility_map = {}
-                try:
-                    existing = pd.read_sql("SELECT bank_name, product_name, is_visible FROM raw_loan_products", self.engine)
-                    for _, row in existing.iterrows():
-                        visibility_map[(row['bank_name'], row['product_name'])] = row['is_visible']
-                except Exception:
-                    pass
+                self._apply_visibility(df, self._load_visibility_map())
 
+            with self.engine.connect() as conn:
                 conn.execute(text(f"DELETE FROM {table_name}"))
+                df.to_sql(table_name, conn, if_exists='append', index=False)
+                self._update_counter(conn, table_name, row_count=len(df))
                 conn.commit()
 
-                # 보존된 is_visible 복원 (신규 상품은 기본값 1)
-                if 'is_visible' not in df.columns:
-                    df['is_visible'] = df.apply(
-                        lambda row: visibility_map.get((row['bank_name'], row['product_name']), 1), axis=1
-                    )
+    @staticmethod
+    def _update_counter(conn, table_name, row_count=None, delta=None):
+        """table_counters 갱신 (row_count: 전체 교체, delta: 증감) — 실패해도 적재는 계속 (재계산 작업이 보정)"""
+        try:
+            if delta is None:
+                set_counter(conn, table_name, row_count)
             else:
-                conn.execute(text(f"DELETE FROM {table_name}"))
-                conn.commit()
+                bump_counter(conn, table_name, delta)
+        except Exception as e:
+            print(f"행 수 카운터 갱신 실패 ({table_name}): {e}")
+
+    def _replace_table_chunked(self, table_name, chunks):
+        """청크(list of dict) 스트림으로 테이블 교체, 적재한 총 행 수 반환
+
+        첫 청크를 받은 뒤에 DELETE 하므로 첫 페이지 수집 실패 시 기존 데이터가 유지되고,
+        DELETE와 모든 청크 INSERT가 하나의 트랜잭션이라 중간 실패 시 롤백된다.
+        메모리에는 한 번에 하나의 청크만 유지된다.
+        """
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        if first is None:
+            return 0
 
-        df.to_sql(table_name, self.engine, if_exists='append', index=False)
+        visibility_map = self._load_visibility_map() if table_name == 'raw_loan_products' else None
+        total = 0
+        with self._phase('db_write'), self.engine.connect() as conn:
+            conn.execute(text(f"DELETE FROM {table_name}"))
+            chunk = first
+            while chunk is not None:
+                df = pd.DataFrame(chunk)
+                if visibility_map is not None:
+                    self._apply_visibility(df, visibility_map)
+                df.to_sql(table_name, conn, if_exists='append', index=False)
+                total += len(df)
+                chunk = next(chunks, None)
+            self._update_counter(conn, table_name, row_count=total)
+            conn.commit()
+        return total
 
     def _is_source_enabled(self, config_key):
         """service_config에서 수집 소스 활성화 여부 확인"""
@@ -120,16 +615,78 @@ class DataCollector:
         except Exception:
             return True  # DB 오류 시 기본 활성
 
-    def _fetch_with_retry(self, func, max_retries=3):
-        """API 호출 실패 시 재시도 로직"""
-        for attempt in range(max_retries):
+    def _retry_policy(self, max_retries=None):
+        """RETRY_MAX_ATTEMPTS / RETRY_BASE_DELAY_MS / RETRY_MAX_DELAY_MS 설정 기반 재시도 정책"""
+        return RetryPolicy(
+            max_attempts=max_retries or self._get_int_config('RETRY_MAX_ATTEMPTS', 3),
+            base_delay=self._get_int_config('RETRY_BASE_DELAY_MS', 500) / 1000.0,
+            max_delay=self._get_int_config('RETRY_MAX_DELAY_MS', 10000) / 1000.0,
+        )
+
+    def _get_breaker(self, source):
+        """소스별 회로 차단기 (CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SEC 설정은 최초 생성 시 적용)"""
+        with self._breaker_lock:
+            breaker = self._breakers.get(source)
+            if breaker is None:
+                breaker = self._breakers[source] = CircuitBreaker(
+                    failure_threshold=self._get_int_config('CIRCUIT_FAILURE_THRESHOLD', 5),
+                    reset_timeout=self._get_int_config('CIRCUIT_RESET_SEC', 60),
+                )
+            return breaker
+
+    def get_circuit_states(self):
+        """소스별 회로 차단기 상태 {log_source: {'state', 'failures', 'retry_at', 'last_error'}}"""
+        with self._breaker_lock:
+            breakers = dict(self._breakers)
+        return {source: breaker.snapshot() for source, breaker in breakers.items()}
+
+    def _fetch_with_retry(self, func, max_retries=None, source=None):
+        """API 호출 실패 시 재시도 로직
+
+        [New] 지수 백오프 + jitter, 재시도 가능 오류만 재시도 (연결 오류/타임아웃/429/5xx).
+        source가 주어지면 소스별 회로 차단기를 거치며, 차단 중이면 CircuitOpenError로 즉시 실패한다.
+        func가 응답 객체를 반환하는 경우 429/5xx 응답도 재시도하고, 마지막 시도의 응답은 그대로 반환한다.
+        """
+        policy = self._retry_policy(max_retries)
+        breaker = self._get_breaker(source) if source else None
+        if breaker:
+            breaker.before_call()
+
+        for attempt in range(policy.max_attempts):
+            last_attempt = attempt == policy.max_attempts - 1
             try:
-                return func()
+                result = func()
             except Exception as e:
-                if attempt == max_retries - 1:
-                    raise e
-                print(f"Connection failed. Retrying... ({attempt + 1}/{max_retries})")
-                time.sleep(2)
+                if not policy.is_retryable(e):
+                    if breaker:
+                        response = getattr(e, 'response', None)
+                        if isinstance(e, requests.HTTPError) and response is not None and 400 <= response.status_code < 500:
+                            # 업스트림은 정상 응답(4xx)했으므로 장애로 집계하지 않음
+                            breaker.record_success()
+                        else:
+                            # 파싱 오류 등 그 밖의 실패는 장애로 집계 (회로가 계속 초기화되지 않도록)
+                            breaker.record_failure(e)
+                    raise
+                if last_attempt:
+                    if breaker:
+                        breaker.record_failure(e)
+                    raise
+                wait = policy.delay(attempt)
+            else:
+                status_code = getattr(result, 'status_code', None)
+                if status_code is None or not policy.is_retryable_status(status_code):
+                    if breaker:
+                        breaker.record_success()
+                    return result
+                if last_attempt:
+                    if breaker:
+                        breaker.record_failure(f"HTTP {status_code}")
+                    return result
+                wait = policy.delay(attempt, result)
+                result.close()
+
+            print(f"Connection failed. Retrying in {wait:.1f}s... ({attempt + 1}/{policy.max_attempts})")
+            time.sleep(wait)
 
     def _get_config(self, config_key, default=None):
         """DB에서 설정값 조회"""
@@ -143,45 +700,280 @@ class DataCollector:
         except Exception:
             return default
 
+    @staticmethod
+    def _set_config(conn, config_key, value):
+        """설정값 저장 (없으면 추가). 호출 측 트랜잭션 안에서 실행되며 commit은 호출 측에서"""
+        updated = conn.execute(text("UPDATE service_config SET config_value = :v WHERE config_key = :k"),
+                               {'k': config_key, 'v': value})
+        if updated.rowcount == 0:
+            conn.execute(text("INSERT INTO service_config (config_key, config_value) VALUES (:k, :v)"),
+                         {'k': config_key, 'v': value})
+
+    def _get_int_config(self, config_key, default):
+        """정수형 설정값 조회 (변환 실패 시 기본값)"""
+        try:
+            return int(self._get_config(config_key, default))
+        except (TypeError, ValueError):
+            return default
+
+    @property
+    def http(self):
+        """공용 HTTP 클라이언트 (HTTP_POOL_MAXSIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT 설정 사용)
+
+        [New] RATE_LIMIT_* 설정 기반 호스트별 토큰 버킷을 함께 사용하여 API 호출 한도를 지킨다.
+        """
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    self._http = HttpClient(
+                        pool_maxsize=max(1, self._get_int_config('HTTP_POOL_MAXSIZE', 10)),
+                        connect_timeout=self._get_int_config('HTTP_CONNECT_TIMEOUT', 5),
+                        read_timeout=self._get_int_config('HTTP_READ_TIMEOUT', 30),
+                        rate_limiter=RateLimiter(self._load_rate_limits,
+                                                 reload_interval=self._get_int_config('RATE_LIMIT_RELOAD_SEC', 60)),
+                    )
+        return self._http
+
+    def _load_rate_limits(self):
+        """RATE_LIMIT_DEFAULT_RPS / RATE_LIMIT_DEFAULT_BURST / RATE_LIMIT_HOSTS(JSON) 설정 조회"""
+        def _float(key, default):
+            val = self._get_config(key, default)
+            try:
+                return float(val) if isinstance(val, (str, int, float)) else default
+            except ValueError:
+                return default
+
+        raw_hosts = self._get_config('RATE_LIMIT_HOSTS', '{}')
+        try:
+            overrides = json.loads(raw_hosts) if isinstance(raw_hosts, str) and raw_hosts else {}
+        except ValueError:
+            overrides = {}
+        if not isinstance(overrides, dict):
+            overrides = {}
+        return _float('RATE_LIMIT_DEFAULT_RPS', 5.0), _float('RATE_LIMIT_DEFAULT_BURST', 5.0), overrides
+
+    def get_http_stats(self):
+        """호스트별 연결 재사용 및 호출 한도 대기(throttle) 통계"""
+        if self._http is None:
+            return {}
+        return self._http.stats()
+
+    # 최근 구간 p95가 직전 구간 p95의 이 배수를 넘으면 성능 저하로 표시
+    TIMING_REGRESSION_RATIO = 1.5
+
+    def load_collection_timings(self, days=30):
+        """최근 days일 성공 실행의 소요 시간 (target_source, executed_at, row_count, duration_ms)"""
+        cutoff = datetime.now() - timedelta(days=days)
+        return pd.read_sql(text("""
+            SELECT target_source, executed_at, row_count, duration_ms FROM collection_logs
+            WHERE executed_at >= :cutoff AND duration_ms IS NOT NULL AND status LIKE 'SUCCESS%'
+        """), self.engine, params={'cutoff': cutoff})
+
+    @classmethod
+    def summarize_collection_timings(cls, df, recent_days=7, now=None):
+        """소스별 p50/p95 소요 시간(ms)과 처리량(rows/sec, 중앙값)
+
+        최근 recent_days일과 그 이전 구간의 p95를 비교해 TIMING_REGRESSION_RATIO 이상 느려졌으면 regressed=True
+        반환: {target_source: {'runs', 'p50_ms', 'p95_ms', 'rows_per_sec', 'recent_p95_ms', 'prev_p95_ms', 'regressed'}}
+        """
+        if df.empty:
+            return {}
+        now = now or datetime.now()
+        df = df.assign(executed_at=pd.to_datetime(df['executed_at']),
+                       rows_per_sec=df['row_count'] / (df['duration_ms'].clip(lower=1) / 1000))
+        split = now - timedelta(days=recent_days)
+
+        summary = {}
+        for source, group in df.groupby('target_source'):
+            recent = group.loc[group['executed_at'] >= split, 'duration_ms']
+            prev = group.loc[group['executed_at'] < split, 'duration_ms']
+            recent_p95 = int(recent.quantile(0.95)) if len(recent) else None
+            prev_p95 = int(prev.quantile(0.95)) if len(prev) else None
+            summary[source] = {
+                'runs': len(group),
+                'p50_ms': int(group['duration_ms'].quantile(0.5)),
+                'p95_ms': int(group['duration_ms'].quantile(0.95)),
+                'rows_per_sec': round(float(group['rows_per_sec'].median()), 1),
+                'recent_p95_ms': recent_p95,
+                'prev_p95_ms': prev_p95,
+                'regressed': bool(len(recent) >= 3 and len(prev) >= 3
+                                  and recent_p95 > prev_p95 * cls.TIMING_REGRESSION_RATIO),
+            }
+        return summary
+
+    @staticmethod
+    def collection_timing_trend(df):
+        """일자·소스별 p50/p95 소요 시간(ms)과 처리량(rows/sec) 추이 DataFrame"""
+        if df.empty:
+            return pd.DataFrame(columns=['day', 'target_source', 'p50_ms', 'p95_ms', 'rows_per_sec'])
+        df = df.assign(day=pd.to_datetime(df['executed_at']).dt.normalize(),
+                       rows_per_sec=df['row_count'] / (df['duration_ms'].clip(lower=1) / 1000))
+        grouped = df.groupby(['day', 'target_source'])
+        return pd.DataFrame({
+            'p50_ms': grouped['duration_ms'].quantile(0.5),
+            'p95_ms': grouped['duration_ms'].quantile(0.95),
+            'rows_per_sec': grouped['rows_per_sec'].median().round(1),
+        }).reset_index()
+
+    def get_phase_breakdown(self, days=30):
+        """소스별 단계 평균 소요 시간(ms) → {target_source: {phase: avg_ms}}"""
+        cutoff = datetime.now() - timedelta(days=days)
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text("""
+                    SELECT target_source, phase, AVG(duration_ms) FROM collection_log_phases
+                    WHERE executed_at >= :cutoff GROUP BY target_source, phase
+                """), {'cutoff': cutoff}).fetchall()
+        except Exception as e:
+            print(f"단계별 소요 시간 조회 실패: {e}")
+            return {}
+        breakdown = {}
+        for source, phase, avg_ms in rows:
+            breakdown.setdefault(source, {})[phase] = int(avg_ms or 0)
+        return breakdown
+
+    @timed_collection
     def collect_fss_loan_products(self):
-        """1. 금융감독원 API: 대출 상품 정보 수집"""
+        """1. 금융감독원 API: 대출 상품 정보 수집 → (성공 여부, 에러 메시지)"""
         source_name = "FSS_LOAN_API"
         if not self._is_source_enabled('COLLECTOR_FSS_LOAN_ENABLED'):
             self._log_status(source_name, "SKIPPED", 0, "Source disabled by admin", level='WARNING')
-            return
+            return True, None
         try:
             api_key = self._get_config('API_KEY_FSS')
             period = self._get_config('COLLECTION_PERIOD_FSS_LOAN', '0')
             
-            if api_key:
-                # 실제 API 호출 (예시 URL)
-                url = "http://finlife.fss.or.kr/finlifeapi/creditLoanProductsSearch.json"
-                params = {
-                    'auth': api_key,
-                    'topFinGrpNo': '020000',
-                    'pageNo': 1
-                }
-                # response = self._fetch_with_retry(lambda: requests.get(url, params=params))
-                # data = response.json()
-                # if data['result']['err_cd'] == '000':
-                #     products = data['result']['baseList']
-                #     df = pd.DataFrame(products)
-                #     self._replace_table('raw_loan_products', df)
-                #     self._log_status(source_name, "SUCCESS", len(df))
-                # else:
-                #     raise Exception(f"API Error: {data['result']['err_msg']}")
-                
-                # [데모용] API Key가 있어도 실제 호출은 주석 처리하고 Mock 데이터 사용 (키가 유효하지 않을 수 있으므로)
-                # 실제 구현 시 위 주석을 해제하고 아래 Mock 로직을 제거하세요.
+            if api_key and self._get_config('COLLECTOR_FSS_LIVE_MODE', '0') == '1':
+                # [New] 실제 API 호출: 전체 페이지를 스트리밍으로 수집하여 청크 단위 적재
+                self._collect_fss_live(source_name, api_key)
+            elif api_key:
+                # [데모용] API Key가 있어도 실시간 모드(COLLECTOR_FSS_LIVE_MODE=1)가 아니면 Mock 데이터 사용
+                # (키가 유효하지 않을 수 있으므로)
                 print(f"[{source_name}] API Key detected. Period: {period} months. (Simulating API Call...)")
                 self._collect_fss_mock(source_name)
             else:
                 print(f"[{source_name}] No API Key. Using Mock Data.")
                 self._collect_fss_mock(source_name)
                 
-        except Exception:
+        except Exception as e:
             error_msg = traceback.format_exc()
             self._log_status(source_name, "FAIL", 0, error_msg, level='ERROR')
+            return False, str(e)
+        return True, None
+
+    def _request_fss_page(self, params, page_no, headers=None):
+        """금융감독원 API 단일 페이지 요청 (응답 객체 반환)"""
+        page_params = dict(params, pageNo=page_no)
+        return self._fetch_with_retry(lambda: self.http.get(self.FSS_LOAN_API_URL, params=page_params, headers=headers),
+                                      source="FSS_LOAN_API")
+
+    @staticmethod
+    def _parse_fss_response(response):
+        """금융감독원 API 응답 → result 객체 (에러 코드 검사 포함)"""
+        response.raise_for_status()
+        result = response.json()['result']
+        if result.get('err_cd') != '000':
+            raise Exception(f"API Error: {result.get('err_msg')}")
+        return result
+
+    def _fetch_fss_page(self, params, page_no):
+        """금융감독원 API 단일 페이지 조회 (result 객체 반환)"""
+        return self._parse_fss_response(self._request_fss_page(params, page_no))
+
+    def _iter_fss_pages(self, params, max_workers=4, first=None):
+        """전체 페이지를 순서대로 yield
+
+        1페이지로 max_page_no를 확인한 뒤 나머지 페이지는 최대 max_workers개씩 앞서 동시 요청한다.
+        (소비 속도보다 앞서 받아두는 페이지 수가 제한되므로 메모리 사용량이 일정하게 유지됨)
+        first: 이미 조회한 1페이지 result (조건부 요청 등으로 먼저 받은 경우)
+        """
+        if first is None:
+            first = self._fetch_fss_page(params, 1)
+        max_page = int(first.get('max_page_no') or 1)
+        yield first
+        del first
+
+        if max_page <= 1:
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="FssPage") as executor:
+            pending = deque()
+            next_page = 2
+            try:
+                while pending or next_page <= max_page:
+                    while next_page <= max_page and len(pending) < max_workers:
+                        pending.append(executor.submit(self._fetch_fss_page, params, next_page))
+                        next_page += 1
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _iter_fss_products(self, pages):
+        """페이지별 baseList와 optionList를 병합하여 상품 행 단위로 yield"""
+        for page in pages:
+            options = {}
+            for opt in page.get('optionList') or []:
+                options.setdefault((opt.get('fin_co_no'), opt.get('fin_prdt_cd')), []).append(opt)
+            for base in page.get('baseList') or []:
+                yield self._parse_fss_product(base, options.get((base.get('fin_co_no'), base.get('fin_prdt_cd')), []))
+
+    @staticmethod
+    def _parse_fss_product(base, options):
+        """금감원 상품(baseList) + 금리 옵션(optionList) → raw_loan_products 행"""
+        # 대출금리(A) 옵션 우선, 없으면 전체 옵션의 신용등급별 금리 사용
+        lend_options = [o for o in options if o.get('crdt_lend_rate_type') == 'A'] or options
+        rates = []
+        for opt in lend_options:
+            for key, val in opt.items():
+                if key.startswith('crdt_grad_') and val not in (None, ''):
+                    try:
+                        rates.append(float(val))
+                    except (TypeError, ValueError):
+                        pass
+        return {
+            'bank_name': base.get('kor_co_nm'),
+            'product_name': base.get('fin_prdt_nm'),
+            'loan_rate_min': min(rates) if rates else None,
+            'loan_rate_max': max(rates) if rates else None,
+            'loan_limit': None,  # 신용대출 API는 한도 정보를 제공하지 않음
+        }
+
+    @staticmethod
+    def _chunked(iterable, size):
+        """iterable을 size 크기의 list 청크로 나누어 yield"""
+        chunk = []
+        for item in iterable:
+            chunk.append(item)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _collect_fss_live(self, source_name, api_key):
+        """금융감독원 API 전체 페이지 수집 → 청크 단위로 raw_loan_products 교체"""
+        params = {'auth': api_key, 'topFinGrpNo': '020000'}
+        chunk_size = max(1, self._get_int_config('FSS_CHUNK_SIZE', 500))
+        max_workers = max(1, self._get_int_config('FSS_PAGE_WORKERS', 4))
+
+        # [New] 1페이지 조건부 요청: 변경이 없으면(304) 파싱/적재 생략
+        validators = self._load_source_validators(source_name)
+        with self._phase('fetch'):
+            response = self._request_fss_page(params, 1, headers=self._conditional_headers(validators))
+        if response.status_code == 304:
+            self._log_status(source_name, "UNCHANGED", 0, "Not modified since last collection")
+            return
+        with self._phase('parse'):
+            first = self._parse_fss_response(response)
+
+        # 페이지 수신(fetch) → 상품 행 변환(parse) → 청크 적재(db_write) 시간을 각각 집계
+        pages = self._timed_iter(self._iter_fss_pages(params, max_workers=max_workers, first=first), 'fetch')
+        del first
+        products = self._timed_iter(self._iter_fss_products(pages), 'parse')
+        total = self._replace_table_chunked('raw_loan_products', self._chunked(products, chunk_size))
+        self._save_source_validators(source_name, response.headers.get('ETag'), response.headers.get('Last-Modified'), None)
+        self._log_status(source_name, "SUCCESS", total)
 
     def _collect_fss_mock(self, source_name):
         """금융감독원 가상 데이터 수집"""
@@ -199,12 +991,13 @@ class DataCollector:
         self._replace_table('raw_loan_products', df)
         self._log_status(source_name, "SUCCESS (MOCK)", len(df))
 
+    @timed_collection
     def collect_kosis_income_stats(self):
-        """2. 통계청 API: 연령별/소득구간별 소득 통계 수집"""
+        """2. 통계청 API: 연령별/소득구간별 소득 통계 수집 → (성공 여부, 에러 메시지)"""
         source_name = "KOSIS_INCOME_API"
         if not self._is_source_enabled('COLLECTOR_KOSIS_INCOME_ENABLED'):
             self._log_status(source_name, "SKIPPED", 0, "Source disabled by admin", level='WARNING')
-            return
+            return True, None
         print(f"--- {source_name} 수집 시작 ---")
         try:
             api_key = self._get_config('API_KEY_KOSIS')
@@ -215,9 +1008,11 @@ class DataCollector:
                 self._collect_kosis_mock(source_name)
             else:
                 self._collect_kosis_mock(source_name)
-        except Exception:
+        except Exception as e:
             error_msg = traceback.format_exc()
             self._log_status(source_name, "FAIL", 0, error_msg, level='ERROR')
+            return False, str(e)
+        return True, None
 
     def _collect_kosis_mock(self, source_name):
         """통계청 가상 데이터 수집"""
@@ -231,12 +1026,13 @@ class DataCollector:
         self._replace_table('raw_income_stats', df)
         self._log_status(source_name, "SUCCESS (MOCK)", len(df))
 
+    @timed_collection
     def collect_economic_indicators(self):
-        """3,4,5. 경제 지표 통합 수집 (부동산, 금리, 고용)"""
+        """3,4,5. 경제 지표 통합 수집 (부동산, 금리, 고용) → (성공 여부, 에러 메시지)"""
         source_name = "ECONOMIC_INDICATORS"
         if not self._is_source_enabled('COLLECTOR_ECONOMIC_ENABLED'):
             self._log_status(source_name, "SKIPPED", 0, "Source disabled by admin", level='WARNING')
-            return
+            return True, None
         try:
             api_key = self._get_config('API_KEY_ECOS')
             period = self._get_config('COLLECTION_PERIOD_ECONOMIC', '0')
@@ -246,9 +1042,11 @@ class DataCollector:
                 self._collect_economic_mock(source_name)
             else:
                 self._collect_economic_mock(source_name)
-        except Exception:
+        except Exception as e:
             error_msg = traceback.format_exc()
             self._log_status(source_name, "FAIL", 0, error_msg, level='ERROR')
+            return False, str(e)
+        return True, None
 
     def _collect_economic_mock(self, source_name):
         """경제지표 가상 데이터 수집"""
@@ -261,21 +1059,25 @@ class DataCollector:
         self._replace_table('raw_economic_indicators', df)
         self._log_status(source_name, "SUCCESS (MOCK)", len(df))
 
+    def _build_auth_params(self, api_key):
+        """API Key를 공공데이터 포털에서 흔히 쓰는 파라미터명으로 전달"""
+        params = {}
+        if api_key:
+            params['auth'] = api_key
+            params['serviceKey'] = api_key
+            params['key'] = api_key
+        return params
+
     def verify_custom_source(self, endpoint, api_key):
         """커스텀 수집기 설정 검증 (API 호출 테스트)"""
         try:
             if not endpoint or not endpoint.startswith('http'):
                 return False, "유효한 URL이 아닙니다."
 
-            params = {}
-            if api_key:
-                # 일반적인 공공데이터 포털 파라미터명 시도
-                params['auth'] = api_key
-                params['serviceKey'] = api_key
-                params['key'] = api_key
+            params = self._build_auth_params(api_key)
             
             # 검증용 요청 (Timeout 5초)
-            response = requests.get(endpoint, params=params, timeout=5)
+            response = self.http.get(endpoint, params=params, timeout=5)
             
             if response.status_code == 200:
                 return True, "연결 성공 (200 OK)"
@@ -284,19 +1086,324 @@ class DataCollector:
         except Exception as e:
             return False, f"오류 발생: {str(e)}"
 
+    def _load_custom_source_meta(self, source_key):
+        """커스텀 수집기의 API Key와 log_source 조회 (DB 조회 실패 시 source_key로 대체)"""
+        with self.engine.connect() as conn:
+            row = conn.execute(text("SELECT api_key_config, log_source FROM collection_sources WHERE source_key = :k"), {'k': source_key}).fetchone()
+            api_key_config = row[0] if row else None
+            log_source = row[1] if (row and row[1]) else source_key
+
+        api_key = None
+        if api_key_config:
+            api_key = self._get_config(api_key_config)
+        return api_key, log_source
+
+    def _load_source_validators(self, log_source):
+        """마지막 수집 시 저장한 ETag / Last-Modified / 본문 해시 조회"""
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(text("""
+                    SELECT last_etag, last_modified, content_hash FROM collection_sources WHERE log_source = :s
+                """), {'s': log_source}).fetchone()
+        except Exception:
+            row = None
+        if not row:
+            return {}
+        return {'etag': row[0], 'last_modified': row[1], 'content_hash': row[2]}
+
+    def _save_source_validators(self, log_source, etag, last_modified, content_hash):
+        """수집 성공 시 다음 조건부 요청에 사용할 값 저장"""
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("""
+                    UPDATE collection_sources
+                    SET last_etag = :etag, last_modified = :lm, content_hash = :hash
+                    WHERE log_source = :s
+                """), {'etag': etag, 'lm': last_modified, 'hash': content_hash, 's': log_source})
+                conn.commit()
+        except Exception as e:
+            print(f"[{log_source}] 조건부 요청 정보 저장 실패: {e}")
+
+    @staticmethod
+    def _conditional_headers(validators):
+        """If-None-Match / If-Modified-Since 헤더 구성"""
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    @staticmethod
+    def _unchanged_result(response, validators):
+        """변경 없음 결과 구성
+
+        304/동일 본문 응답에도 서버가 새 ETag/Last-Modified를 줄 수 있으므로 응답 값을 우선 사용한다.
+        (헤더가 없으면 기존 값을 유지해 다음 조건부 요청이 계속 맞도록)
+        """
+        return {
+            'unchanged': True,
+            'data': None,
+            'name': None,
+            'etag': response.headers.get('ETag') or validators.get('etag'),
+            'last_modified': response.headers.get('Last-Modified') or validators.get('last_modified'),
+            'content_hash': validators.get('content_hash'),
+        }
+
+    def _fetch_custom_payload(self, endpoint, params, timeout=10, validators=None, circuit_key=None):
+        """커스텀 수집기 엔드포인트 조건부 호출
+
+        반환: {'unchanged': bool, 'data': JSON(또는 원문 텍스트), 'etag', 'last_modified', 'content_hash'}
+        304 응답이거나 본문 해시가 지난 수집과 같으면 unchanged=True (data는 파싱하지 않음, 검증값은 최신 응답 기준)
+        """
+        validators = validators or {}
+        headers = self._conditional_headers(validators)
+        response = self._fetch_with_retry(
+            lambda: self.http.get(endpoint, params=params, timeout=timeout, headers=headers),
+            source=circuit_key)
+        if response.status_code == 304:
+            return self._unchanged_result(response, validators)
+        response.raise_for_status()
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if content_hash == validators.get('content_hash'):
+            return self._unchanged_result(response, validators)
+        result = {
+            'unchanged': False,
+            'data': None,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': content_hash,
+        }
+        try:
+            result['data'] = response.json()
+        except ValueError:
+            result['data'] = {"raw_text": response.text}
+        return result
+
+    @property
+    def snapshot_store(self):
+        """custom_source_dir 기준 스냅샷 저장소"""
+        if self._snapshot_store is None or self._snapshot_store.base_dir != self.custom_source_dir:
+            self._snapshot_store = SnapshotStore(self.custom_source_dir)
+        return self._snapshot_store
+
+    def _snapshot_keep(self):
+        """소스별 스냅샷 보존 개수 (SNAPSHOT_KEEP_PER_SOURCE, 0이면 무제한)"""
+        return max(0, self._get_int_config('SNAPSHOT_KEEP_PER_SOURCE', 30))
+
+    def _save_custom_payload(self, source_key, data):
+        """수집한 JSON 데이터를 스냅샷 저장소에 저장하고 스냅샷 파일명 반환
+
+        [New] 압축(gzip) + 내용 해시 기반 중복 제거. 같은 내용이면 객체를 공유하고 manifest 포인터만 추가
+        """
+        entry = self.snapshot_store.put(source_key, data, keep=self._snapshot_keep())
+        return entry['name']
+
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    @staticmethod
+    def _validate_json_stream(fp):
+        """JSON 문법 검증 (ijson 사용 시 문서 전체를 메모리에 올리지 않음)"""
+        if ijson is None:
+            # ijson 미설치 환경 fallback (문서 전체를 파싱하므로 메모리 사용량이 크기에 비례)
+            json.load(fp)
+            return
+        try:
+            for _ in ijson.parse(fp):
+                pass
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid JSON payload: {e}")
+
+    @staticmethod
+    def _iter_bounded_chunks(response, chunk_size, max_bytes, deadline, abort=None):
+        """응답 본문을 청크 단위로 yield (크기 상한/전체 제한 시간 초과, abort 설정 시 중단)"""
+        received = 0
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if abort is not None and abort.is_set():
+                raise InterruptedError("Download aborted")
+            if not chunk:
+                continue
+            received += len(chunk)
+            if max_bytes and received > max_bytes:
+                raise ValueError(f"Response exceeds size limit ({max_bytes} bytes)")
+            if time.monotonic() > deadline:
+                raise TimeoutError("Streaming download exceeded time limit")
+            yield chunk
+
+    def _stream_custom_payload(self, source_key, endpoint, params, timeout=10, validators=None, abort=None,
+                               circuit_key=None):
+        """[New] 응답 본문을 메모리에 모으지 않고 청크 단위로 바로 스냅샷 저장소에 기록
+
+        CUSTOM_STREAM_MAX_BYTES (0이면 제한 없음), CUSTOM_STREAM_TIMEOUT(초, 전체 다운로드 제한 시간) 설정 사용
+        반환 형식은 _fetch_and_store_custom 참고
+        """
+        validators = validators or {}
+        max_bytes = self._get_int_config('CUSTOM_STREAM_MAX_BYTES', 0)
+        deadline = time.monotonic() + self._get_int_config('CUSTOM_STREAM_TIMEOUT', 300)
+
+        headers = self._conditional_headers(validators)
+        response = self._fetch_with_retry(
+            lambda: self.http.get(endpoint, params=params, timeout=timeout, stream=True, headers=headers),
+            source=circuit_key)
+        try:
+            if response.status_code == 304:
+                return self._unchanged_result(response, validators)
+            response.raise_for_status()
+
+            declared = response.headers.get('Content-Length')
+            if max_bytes and declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ValueError(f"Response exceeds size limit ({max_bytes} bytes)")
+
+            entry = self.snapshot_store.put_stream(
+                source_key,
+                self._iter_bounded_chunks(response, self.STREAM_CHUNK_SIZE, max_bytes, deadline, abort),
+                skip_hash=validators.get('content_hash'),
+                validate=self._validate_json_stream,
+                keep=self._snapshot_keep(),
+            )
+        finally:
+            response.close()
+
+        if entry is None:
+            return self._unchanged_result(response, validators)
+        return {
+            'unchanged': False,
+            'name': entry['name'],
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': entry['hash'],
+        }
+
+    def _is_stream_mode(self):
+        return str(self._get_config('CUSTOM_STREAM_MODE', '1')) == '1'
+
+    def _custom_wait_limit(self, timeout):
+        """비동기 수집 시 소스별 최대 대기 시간
+
+        스트리밍 모드에서는 대용량 다운로드를 위해 CUSTOM_STREAM_TIMEOUT까지 대기 (timeout은 연결/읽기 제한으로만 사용)
+        """
+        if self._is_stream_mode():
+            return max(timeout, self._get_int_config('CUSTOM_STREAM_TIMEOUT', 300))
+        return timeout
+
+    def _fetch_and_store_custom(self, source_key, endpoint, params, timeout=10, validators=None, abort=None,
+                                circuit_key=None):
+        """커스텀 수집기 요청 + 저장
+
+        CUSTOM_STREAM_MODE='1'이면 스트리밍 저장, 아니면 응답 전체를 파싱 후 저장
+        abort: threading.Event — 호출 측이 취소/타임아웃 처리한 경우 저장하지 않도록 표시
+        circuit_key: 재시도/회로 차단기 기준 소스명 (log_source)
+        반환: {'unchanged': bool, 'name': 스냅샷 파일명, 'etag', 'last_modified', 'content_hash'}
+        """
+        if self._is_stream_mode():
+            with self._phase('fetch'):
+                return self._stream_custom_payload(source_key, endpoint, params, timeout, validators, abort,
+                                                   circuit_key)
+
+        with self._phase('fetch'):
+            fetched = self._fetch_custom_payload(endpoint, params, timeout, validators, circuit_key)
+        if fetched['unchanged']:
+            return fetched
+        if abort is not None and abort.is_set():
+            raise InterruptedError("Download aborted")
+        with self._phase('store'):
+            name = self._save_custom_payload(source_key, fetched.pop('data'))
+        return dict(fetched, name=name)
+
+    def _load_flatten_config(self, source_key):
+        """평탄화 설정 조회 (record_path 미설정 시 None)"""
+        with self.engine.connect() as conn:
+            row = conn.execute(text("""
+                SELECT record_path, column_mapping, schema_cache FROM collection_sources WHERE source_key = :k
+            """), {'k': source_key}).fetchone()
+        if not row or not row[0]:
+            return None
+        return {
+            'record_path': row[0],
+            'column_mapping': json.loads(row[1]) if row[1] else None,
+            'schema_cache': json.loads(row[2]) if row[2] else None,
+        }
+
+    def _save_schema_cache(self, source_key, cache):
+        with self.engine.connect() as conn:
+            conn.execute(text("UPDATE collection_sources SET schema_cache = :c WHERE source_key = :k"),
+                         {'c': json.dumps(cache, ensure_ascii=False), 'k': source_key})
+            conn.commit()
+
+    def _load_custom_table(self, table_name, frames, schema):
+        """평탄화된 DataFrame 청크 스트림으로 테이블을 다시 만들고 총 행 수 반환
+
+        첫 청크로 테이블을 스키마 타입대로 재생성(replace)하고 나머지는 같은 연결에서 append
+        """
+        dtype = {col: SQL_TYPES[col_type] for col, col_type in schema}
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            first = RecordFlattener.to_frame([], schema)
+
+        total = 0
+        with self._phase('db_write'), self.engine.connect() as conn:
+            first.to_sql(table_name, conn, if_exists='replace', index=False, dtype=dtype)
+            total += len(first)
+            for df in frames:
+                df.to_sql(table_name, conn, if_exists='append', index=False, dtype=dtype)
+                total += len(df)
+            conn.commit()
+        return total
+
+    def flatten_custom_source(self, source_key, snapshot_name):
+        """[New] 저장된 스냅샷을 스트리밍 파싱하여 custom_<source_key> 테이블로 적재
+
+        collection_sources.record_path / column_mapping 설정 사용 (record_path 미설정 시 건너뜀, None 반환)
+        추론한 스키마는 schema_cache에 저장하고, 설정이 바뀌지 않았으면 재사용한다.
+        반환: (테이블명, 적재 행 수)
+        """
+        config = self._load_flatten_config(source_key)
+        if config is None:
+            return None
+
+        flattener = RecordFlattener(config['record_path'], config['column_mapping'])
+        cache = config['schema_cache']
+        if cache and cache.get('signature') == flattener.signature:
+            schema = [tuple(col) for col in cache['columns']]
+        else:
+            sample_size = max(1, self._get_int_config('FLATTEN_SCHEMA_SAMPLE', 500))
+            with self._phase('parse'), self.snapshot_store.open(snapshot_name) as fp:
+                schema = flattener.infer_schema(flattener.iter_rows(fp), sample_size)
+            self._save_schema_cache(source_key, {'signature': flattener.signature, 'columns': schema})
+
+        table_name = custom_table_name(source_key)
+        chunk_size = max(1, self._get_int_config('FLATTEN_CHUNK_SIZE', 1000))
+        with self.snapshot_store.open(snapshot_name) as fp:
+            frames = self._timed_iter((RecordFlattener.to_frame(chunk, schema)
+                                       for chunk in self._chunked(flattener.iter_rows(fp), chunk_size)), 'parse')
+            total = self._load_custom_table(table_name, frames, schema)
+        return table_name, total
+
+    def _complete_custom_store(self, source_key, log_source, stored):
+        """저장 완료 후처리: 평탄화 적재 → 조건부 요청 정보 저장 → SUCCESS 로그
+
+        평탄화에 실패하면 예외를 그대로 올려 FAIL로 기록되며, 조건부 요청 정보는 갱신하지 않는다.
+        (다음 실행에서 같은 페이로드를 다시 받아 재시도)
+        """
+        message = f"Data saved to {stored['name']}"
+        row_count = 1
+        flattened = self.flatten_custom_source(source_key, stored['name'])
+        if flattened:
+            table_name, row_count = flattened
+            message += f", {row_count} rows loaded into {table_name}"
+
+        self._save_source_validators(log_source, stored['etag'], stored['last_modified'], stored['content_hash'])
+        self._log_status(log_source, "SUCCESS", row_count, message)
+
+    @timed_collection
     def collect_custom_source(self, source_key, endpoint):
         """커스텀 수집기 실행 (Generic JSON Collector)"""
         log_source = source_key  # DB 조회 실패 시 fallback
         try:
             # 1. API Key 및 log_source 조회
-            with self.engine.connect() as conn:
-                row = conn.execute(text("SELECT api_key_config, log_source FROM collection_sources WHERE source_key = :k"), {'k': source_key}).fetchone()
-                api_key_config = row[0] if row else None
-                log_source = row[1] if (row and row[1]) else source_key
-
-            api_key = None
-            if api_key_config:
-                api_key = self._get_config(api_key_config)
+            api_key, log_source = self._load_custom_source_meta(source_key)
 
             print(f"[{source_key}] Fetching from {endpoint}...")
 
@@ -306,36 +1413,20 @@ class DataCollector:
                 self._log_status(log_source, "SUCCESS (MOCK)", 1, "Endpoint is not a valid URL, treated as mock success")
                 return True, None
 
-            params = {}
-            if api_key:
-                # 일반적인 공공데이터 포털 파라미터명 시도
-                params['auth'] = api_key
-                params['serviceKey'] = api_key
-                params['key'] = api_key
+            params = self._build_auth_params(api_key)
 
             try:
-                response = requests.get(endpoint, params=params, timeout=10)
-                response.raise_for_status()
-
-                # [New] JSON 데이터 파일 저장
-                try:
-                    data = response.json()
-                except ValueError:
-                    data = {"raw_text": response.text}
-
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-                save_dir = os.path.join(base_dir, 'data', 'custom_sources')
-                if not os.path.exists(save_dir):
-                    os.makedirs(save_dir)
-
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{source_key}_{timestamp}.json"
-                filepath = os.path.join(save_dir, filename)
+                validators = self._load_source_validators(log_source)
+                stored = self._fetch_and_store_custom(source_key, endpoint, params, validators=validators,
+                                                      circuit_key=log_source)
+                if stored['unchanged']:
+                    # [New] 변경 없음: 파싱/저장 생략 (서버가 갱신한 ETag/Last-Modified는 저장)
+                    self._save_source_validators(log_source, stored['etag'], stored['last_modified'],
+                                                 stored['content_hash'])
+                    self._log_status(log_source, "UNCHANGED", 0, "Payload unchanged since last collection")
+                    return True, None
 
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=4)
-
-                self._log_status(log_source, "SUCCESS", 1, f"Data saved to {filename}")
+                self._complete_custom_store(source_key, log_source, stored)
                 return True, None
             except Exception as req_e:
                 self._log_status(log_source, "FAIL", 0, str(req_e), level='ERROR')
@@ -346,167 +1437,714 @@ class DataCollector:
             self._log_status(log_source, "FAIL", 0, error_msg, level='ERROR')
             return False, str(e)
 
-    def run_all(self):
-        """모든 수집 작업 일괄 실행"""
+    def collect_custom_sources_async(self, sources=None, max_concurrency=None, per_host_limit=None,
+                                     timeout=None, cancel_event=None):
+        """asyncio 기반 커스텀 수집기 일괄 실행
+
+        sources: [(source_key, endpoint), ...] (None이면 활성화된 커스텀 수집기 전체)
+        max_concurrency: 전체 동시 요청 수 (CUSTOM_FETCH_MAX_CONCURRENCY, 기본 8)
+        per_host_limit: API 호스트별 동시 요청 수 (CUSTOM_FETCH_PER_HOST, 기본 2)
+        timeout: 소스별 요청 제한 시간(초) (CUSTOM_FETCH_TIMEOUT, 기본 30)
+        cancel_event: threading.Event — set 되면 진행 중/대기 중인 수집을 취소
+
+        결과는 기존 collect_custom_source와 동일하게 파일 저장 및 collection_logs에 기록되며,
+        run_all과 같은 형식의 리포트를 반환한다.
+        """
+        if sources is None:
+            sources = [(src['source_key'], src['endpoint']) for src in self._list_custom_sources()]
+        if max_concurrency is None:
+            max_concurrency = self._get_int_config('CUSTOM_FETCH_MAX_CONCURRENCY', 8)
+        if per_host_limit is None:
+            per_host_limit = self._get_int_config('CUSTOM_FETCH_PER_HOST', 2)
+        if timeout is None:
+            timeout = self._get_int_config('CUSTOM_FETCH_TIMEOUT', 30)
+
+        print(f"=== 커스텀 수집기 비동기 실행 시작 ({len(sources)}건) ===")
+        started = time.perf_counter()
+        results = asyncio.run(self._run_custom_sources_async(
+            sources, max(1, max_concurrency), max(1, per_host_limit), timeout, cancel_event
+        ))
+        report = {
+            'mode': 'async',
+            'wall_time': round(time.perf_counter() - started, 3),
+            'results': results,
+        }
+        for r in results:
+            print(f"  - {r['source']}: {'OK' if r['success'] else 'FAIL'} ({r['duration']:.2f}s)")
+        print(f"=== 커스텀 수집기 비동기 실행 종료 (총 {report['wall_time']:.2f}s) ===")
+        return report
+
+    async def _run_custom_sources_async(self, sources, max_concurrency, per_host_limit, timeout, cancel_event):
+        global_slots = asyncio.Semaphore(max_concurrency)
+        host_slots = {}
+        for source_key, endpoint in sources:
+            host = urlparse(endpoint or '').netloc or source_key
+            if host not in host_slots:
+                host_slots[host] = asyncio.Semaphore(per_host_limit)
+
+        tasks = [
+            asyncio.create_task(self._collect_custom_source_async(
+                source_key, endpoint,
+                global_slots, host_slots[urlparse(endpoint or '').netloc or source_key], timeout
+            ))
+            for source_key, endpoint in sources
+        ]
+
+        watcher = None
+        if cancel_event is not None:
+            async def watch_cancel():
+                while not cancel_event.is_set():
+                    await asyncio.sleep(0.05)
+                for task in tasks:
+                    task.cancel()
+            watcher = asyncio.create_task(watch_cancel())
+
+        try:
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+        results = []
+        for (source_key, _), outcome in zip(sources, outcomes):
+            if isinstance(outcome, BaseException):
+                # 시작 전에 취소된 작업
+                outcome = {'source': source_key, 'success': False, 'error': 'cancelled', 'duration': 0.0}
+            if outcome['error'] == 'cancelled':
+                if outcome['source'] == source_key:
+                    # log_source 조회 전에 취소됨 → 다른 로그와 같은 소스명으로 기록
+                    outcome['source'] = self._custom_log_source(source_key)
+                self._log_status(outcome['source'], "CANCELLED", 0, "Collection cancelled", level='WARNING')
+            results.append(outcome)
+        return results
+
+    def _custom_log_source(self, source_key):
+        """커스텀 수집기의 log_source (조회 실패 시 source_key)"""
+        try:
+            return self._load_custom_source_meta(source_key)[1]
+        except Exception:
+            return source_key
+
+    async def _collect_custom_source_async(self, source_key, endpoint, global_slots, host_slot, timeout):
+        """단일 커스텀 수집기 비동기 실행 (블로킹 I/O는 워커 스레드에서 수행)"""
+        result = {'source': source_key, 'success': False, 'error': None, 'duration': 0.0}
+        log_source = source_key
+        started = time.perf_counter()
+        abort = threading.Event()  # 취소/타임아웃 후 워커 스레드가 스냅샷을 저장하지 않도록 표시
+        wait_limit = timeout
+        try:
+            # 호스트 슬롯을 먼저 잡아야 한 호스트에 몰린 대기 작업이 전체 슬롯을 점유하지 않는다
+            async with host_slot, global_slots:
+                started = time.perf_counter()
+                _PHASE_TIMER.set(PhaseTimer())  # 태스크별 컨텍스트라 다른 소스와 섞이지 않음
+                api_key, log_source = await asyncio.to_thread(self._load_custom_source_meta, source_key)
+                result['source'] = log_source
+
+                if not endpoint or not endpoint.startswith('http'):
+                    await asyncio.to_thread(self._log_status, log_source, "SUCCESS (MOCK)", 1,
+                                            "Endpoint is not a valid URL, treated as mock success")
+                    result['success'] = True
+                    return result
+
+                params = self._build_auth_params(api_key)
+                validators = await asyncio.to_thread(self._load_source_validators, log_source)
+                wait_limit = await asyncio.to_thread(self._custom_wait_limit, timeout)
+                stored = await asyncio.wait_for(
+                    asyncio.to_thread(self._fetch_and_store_custom, source_key, endpoint, params, timeout,
+                                      validators, abort, log_source),
+                    wait_limit
+                )
+                if stored['unchanged']:
+                    await asyncio.to_thread(self._save_source_validators, log_source, stored['etag'],
+                                            stored['last_modified'], stored['content_hash'])
+                    await asyncio.to_thread(self._log_status, log_source, "UNCHANGED", 0,
+                                            "Payload unchanged since last collection")
+                else:
+                    await asyncio.to_thread(self._complete_custom_store, source_key, log_source, stored)
+                result['success'] = True
+        except asyncio.CancelledError:
+            # 워커 스레드의 요청은 requests timeout으로 종료되며, 그 결과는 버려진다
+            abort.set()
+            result['error'] = 'cancelled'
+        except asyncio.TimeoutError:
+            abort.set()
+            result['error'] = f"Timeout after {wait_limit}s"
+            await asyncio.to_thread(self._log_status, log_source, "FAIL", 0, result['error'], level='ERROR')
+        except Exception as e:
+            result['error'] = str(e)
+            await asyncio.to_thread(self._log_status, log_source, "FAIL", 0, str(e), level='ERROR')
+        finally:
+            result['duration'] = round(time.perf_counter() - started, 3)
+        return result
+
+    def _list_custom_sources(self):
+        """활성화된 커스텀 수집기 목록 (collection_sources + service_config)"""
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text("""
+                    SELECT s.source_key, s.trigger_val, s.endpoint, s.log_source, c.config_value
+                    FROM collection_sources s
+                    LEFT JOIN service_config c ON c.config_key = s.config_key_enabled
+                    ORDER BY s.id ASC
+                """)).fetchall()
+        except Exception as e:
+            print(f"커스텀 수집기 목록 조회 실패: {e}")
+            return []
+
+        sources = []
+        for source_key, trigger_val, endpoint, log_source, enabled in rows:
+            if trigger_val in self.BUILTIN_JOBS or enabled == '0':
+                continue
+            sources.append({'source_key': source_key, 'endpoint': endpoint, 'log_source': log_source or source_key})
+        return sources
+
+    def _list_builtin_jobs(self):
+        """기본 수집기 작업 목록 (순차 실행용)"""
+        return [
+            {'source': log_source, 'slot_key': log_source, 'func': getattr(self, method_name)}
+            for method_name, log_source in self.BUILTIN_JOBS.values()
+        ]
+
+    def _list_collection_jobs(self):
+        """실행 대상 수집 작업 목록 (기본 수집기 + 활성화된 커스텀 수집기)"""
+        jobs = self._list_builtin_jobs()
+        for src in self._list_custom_sources():
+            # 같은 API 호스트를 쓰는 커스텀 수집기는 하나의 동시 실행 슬롯을 공유
+            host = urlparse(src['endpoint'] or '').netloc or src['source_key']
+            jobs.append({
+                'source': src['log_source'],
+                'slot_key': host,
+                'func': lambda k=src['source_key'], ep=src['endpoint']: self.collect_custom_source(k, ep),
+            })
+        return jobs
+
+    def _get_source_slot(self, slot_key, limit):
+        """소스(API)별 동시 실행 제한 세마포어 반환
+
+        (slot_key, limit) 단위로 캐시하므로 COLLECTION_MAX_PER_SOURCE 변경은 다음 실행부터 바로 반영된다.
+        """
+        with self._source_slots_lock:
+            slot = self._source_slots.get((slot_key, limit))
+            if slot is None:
+                # 이전 제한값의 세마포어는 실행 중인 작업이 끝나면 더 이상 쓰이지 않으므로 정리
+                for key in [key for key in self._source_slots if key[0] == slot_key]:
+                    del self._source_slots[key]
+                slot = threading.BoundedSemaphore(limit)
+                self._source_slots[(slot_key, limit)] = slot
+            return slot
+
+    def _run_timed_job(self, job, slot=None):
+        """단일 수집 작업 실행 및 소요 시간 측정"""
+        result = {'source': job['source'], 'success': True, 'error': None, 'duration': 0.0}
+        if slot is not None:
+            slot.acquire()
+        try:
+            started = time.perf_counter()
+            try:
+                ret = job['func']()
+                # 수집기는 (성공 여부, 에러 메시지)를 반환
+                if isinstance(ret, tuple) and len(ret) == 2:
+                    result['success'], result['error'] = ret
+            except Exception as e:
+                result['success'] = False
+                result['error'] = str(e)
+            result['duration'] = round(time.perf_counter() - started, 3)
+        finally:
+            if slot is not None:
+                slot.release()
+        return result
+
+    def run_all(self, concurrent=False, max_workers=None):
+        """모든 수집 작업 일괄 실행
+
+        concurrent=True 이면 기본 수집기와 활성화된 커스텀 수집기를 스레드 풀에서 동시에 실행한다.
+        풀 크기는 COLLECTION_MAX_WORKERS, 소스(API 호스트)별 동시 실행 수는 COLLECTION_MAX_PER_SOURCE 설정을 따른다.
+        소스별 소요 시간과 전체 소요 시간(wall time)을 담은 리포트를 반환한다.
+        """
         print("=== 수집 파이프라인 시작 ===")
-        self.collect_fss_loan_products()
-        self.collect_kosis_income_stats()
-        self.collect_economic_indicators()
-        print("=== 수집 파이프라인 종료 ===")
+        started = time.perf_counter()
+
+        if not concurrent:
+            results = [self._run_timed_job(job) for job in self._list_builtin_jobs()]
+        else:
+            jobs = self._list_collection_jobs()
+            if max_workers is None:
+                max_workers = self._get_int_config('COLLECTION_MAX_WORKERS', 4)
+            per_source = max(1, self._get_int_config('COLLECTION_MAX_PER_SOURCE', 1))
+            max_workers = max(1, min(max_workers, len(jobs) or 1))
+
+            results = []
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Collector") as executor:
+                futures = [
+                    executor.submit(self._run_timed_job, job, self._get_source_slot(job['slot_key'], per_source))
+                    for job in jobs
+                ]
+                for future in as_completed(futures):
+                    results.append(future.result())
+
+        report = {
+            'mode': 'concurrent' if concurrent else 'sequential',
+            'wall_time': round(time.perf_counter() - started, 3),
+            'results': results,
+        }
+        for r in results:
+            print(f"  - {r['source']}: {'OK' if r['success'] else 'FAIL'} ({r['duration']:.2f}s)")
+        print(f"=== 수집 파이프라인 종료 (총 {report['wall_time']:.2f}s) ===")
+        return report
+
+    # 적립 건별 잔여 포인트 = clamp(누적 적립액 - 총 사용액, 0, 적립액) — FIFO 소진과 동일
+    EXPIRED_POINTS_SQL = """
+        SELECT user_id, SUM(remaining) AS expired_amount
+        FROM (
+            SELECT l.user_id,
+                   CASE
+                       WHEN l.cum_earned - COALESCE(s.total_spent, 0) <= 0 THEN 0
+                       WHEN l.cum_earned - COALESCE(s.total_spent, 0) >= l.amount THEN l.amount
+                       ELSE l.cum_earned - COALESCE(s.total_spent, 0)
+                   END AS remaining
+            FROM (
+                SELECT t.user_id, t.amount, t.expires_at,
+                       SUM(t.amount) OVER (
+                           PARTITION BY t.user_id ORDER BY t.created_at, t.transaction_id
+                           ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                       ) AS cum_earned
+                FROM point_transactions t
+                JOIN user_points p ON p.user_id = t.user_id AND p.balance > 0
+                WHERE t.amount > 0
+            ) l
+            LEFT JOIN (
+                SELECT user_id, -SUM(amount) AS total_spent
+                FROM point_transactions
+                WHERE amount < 0
+                GROUP BY user_id
+            ) s ON s.user_id = l.user_id
+            WHERE l.expires_at IS NOT NULL AND l.expires_at < :now
+        ) r
+        GROUP BY user_id
+        HAVING SUM(remaining) > 0
+    """
+
+    def _compute_expired_points_sql(self, conn, now):
+        """윈도우 함수로 유저별 만료 대상 포인트 계산 → [(user_id, amount), ...]"""
+        rows = conn.execute(text(self.EXPIRED_POINTS_SQL), {'now': now}).fetchall()
+        return [(user_id, int(amount)) for user_id, amount in rows]
+
+    def _compute_expired_points_pandas(self, conn, now):
+        """윈도우 함수를 지원하지 않는 DB용: 한 번에 조회 후 pandas로 FIFO 계산"""
+        df = pd.read_sql(text("""
+            SELECT t.transaction_id, t.user_id, t.amount, t.expires_at, t.created_at
+            FROM point_transactions t
+            JOIN user_points p ON p.user_id = t.user_id AND p.balance > 0
+        """), conn)
+        if df.empty:
+            return []
+
+        earned = fifo_remaining(df)
+        expires_at = pd.to_datetime(earned['expires_at'])
+        expired = earned[expires_at.notna() & (expires_at < pd.Timestamp(now))]
+        totals = expired.groupby('user_id')['remaining'].sum()
+        return [(user_id, int(amount)) for user_id, amount in totals.items() if amount > 0]
 
     def process_expired_points(self):
-        """포인트 유효기간 만료 처리 (FIFO 방식)"""
+        """포인트 유효기간 만료 처리 (FIFO 방식)
+
+        [New] 포인트 lot 원장(point_lots)이 준비되어 있으면 만료 lot만 인덱스로 조회하여 소멸 처리하고
+        (유저별 소멸액은 현재 잔액 이하, 원장 불일치는 check_point_lot_consistency가 보정),
+        아니면 집합 연산으로 만료액을 한 번에 계산한다 (SQL 윈도우 함수, 실패 시 pandas).
+        소멸 트랜잭션 INSERT와 잔액 UPDATE는 배치(executemany)로 기록한다.
+        반환: 소멸 처리된 유저 수
+        """
         print("--- 포인트 소멸 처리 시작 ---")
         try:
+            now = datetime.now()
+            ledger_ready = self._get_config(LEDGER_READY_KEY) == '1'
             with self.engine.connect() as conn:
-                # 1. 잔액이 있는 모든 유저 조회
-                users = conn.execute(text("SELECT user_id FROM user_points WHERE balance > 0")).fetchall()
-                
-                for (user_id,) in users:
-                    # 2. 해당 유저의 모든 트랜잭션 조회 (시간순)
-                    txs = conn.execute(text("""
-                        SELECT amount, expires_at 
-                        FROM point_transactions 
-                        WHERE user_id = :uid 
-                        ORDER BY created_at ASC
-                    """), {'uid': user_id}).fetchall()
-                    
-                    # 3. FIFO 로직으로 만료 대상 계산
-                    total_spent = 0
-                    earned_list = [] # (amount, expires_at)
-                    
-                    # 지출 총액과 획득 내역 분리
-                    for amt, exp in txs:
-                        if amt < 0:
-                            total_spent += abs(amt)
-                        else:
-                            earned_list.append({'amount': amt, 'expires_at': exp})
-                    
-                    expired_amount = 0
-                    now = datetime.now()
-                    
-                    for item in earned_list:
-                        if total_spent >= item['amount']:
-                            # 이미 사용된 포인트
-                            total_spent -= item['amount']
-                        else:
-                            # 아직 사용되지 않은 잔여 포인트
-                            remaining = item['amount'] - total_spent
-                            total_spent = 0 # 지출액 모두 소진
-                            
-                            # 유효기간이 있고, 현재 시간보다 과거라면 만료 처리
-                            if item['expires_at'] and item['expires_at'] < now:
-                                expired_amount += remaining
-                    
-                    # 4. 만료된 포인트가 있다면 차감 트랜잭션 생성
-                    if expired_amount > 0:
-                        conn.execute(text("""
-                            INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id)
-                            VALUES (:uid, :amt, 'expired', '유효기간 만료 소멸', 'system')
-                        """), {'uid': user_id, 'amt': -expired_amount})
-                        
-                        conn.execute(text("""
-                            UPDATE user_points 
-                            SET balance = balance - :amt 
-                            WHERE user_id = :uid
-                        """), {'uid': user_id, 'amt': expired_amount})
-                        
-                        print(f"[Expiration] User {user_id}: {expired_amount} points expired.")
-                
+                if ledger_ready:
+                    expired = expire_point_lots(conn, now)
+                    conn.commit()
+                    print(f"[Expiration] (lot ledger) {len(expired)} users, {sum(a for _, a in expired)} points expired.")
+                    print("--- 포인트 소멸 처리 완료 ---")
+                    return len(expired)
+
+                try:
+                    expired = self._compute_expired_points_sql(conn, now)
+                except Exception as e:
+                    print(f"[Expiration] 윈도우 함수 계산 실패, pandas로 대체: {e}")
+                    conn.rollback()
+                    expired = self._compute_expired_points_pandas(conn, now)
+
+                if expired:
+                    params = [{'uid': user_id, 'amt': amount, 'neg_amt': -amount} for user_id, amount in expired]
+                    conn.execute(text("""
+                        INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id)
+                        VALUES (:uid, :neg_amt, 'expired', '유효기간 만료 소멸', 'system')
+                    """), params)
+                    conn.execute(text("""
+                        UPDATE user_points 
+                        SET balance = balance - :amt 
+                        WHERE user_id = :uid
+                    """), params)
+
                 conn.commit()
+                total = sum(amount for _, amount in expired)
+                print(f"[Expiration] {len(expired)} users, {total} points expired.")
                 print("--- 포인트 소멸 처리 완료 ---")
+                return len(expired)
         except Exception as e:
             print(f"포인트 소멸 처리 중 오류: {e}")
             traceback.print_exc()
+            return 0
 
-    def check_mission_progress(self):
-        """사용자 통계(user_stats) 기반 미션 자동 완료 처리"""
-        print("--- 미션 달성 여부 확인 시작 ---")
+    def check_point_lot_consistency(self):
+        """포인트 잔액과 lot 원장 잔액 합계 비교 (불일치 유저 목록 반환, 결과는 collection_logs에 기록)
+
+        [Self-Repair] 불일치 유저의 lot만 이력(FIFO)으로 다시 생성한다. (lot을 소진하지 않는 차감 경로 보정)
+        """
+        if self._get_config(LEDGER_READY_KEY) != '1':
+            return []
         try:
             with self.engine.connect() as conn:
-                # 1. 진행 중이거나 대기 중인 미션 중 추적 조건이 있는 것 조회
-                missions = conn.execute(text("""
-                    SELECT m.mission_id, m.user_id, m.mission_title, m.reward_points, 
-                           m.tracking_key, m.tracking_operator, m.tracking_value
-                    FROM missions m
-                    WHERE m.status IN ('pending', 'in_progress') 
-                      AND m.tracking_key IS NOT NULL
-                """)).fetchall()
+                mismatches = find_point_lot_mismatches(conn)
+                if mismatches:
+                    rebuild_point_lots(conn, [m['user_id'] for m in mismatches])
+                    conn.commit()
+        except Exception as e:
+            self._log_status("POINT_LEDGER_CHECK", "FAIL", 0, str(e), level='ERROR')
+            return []
 
-                for m in missions:
-                    mid, uid, title, reward, key, op, val = m
-                    
-                    # 2. 유저 스탯 조회 (매핑)
-                    db_col = key
-                    if key == 'cardUsageRate': db_col = 'card_usage_rate'
-                    elif key == 'salaryTransfer': db_col = 'salary_transfer'
-                    elif key == 'highInterestLoan': db_col = 'high_interest_loan'
-                    elif key == 'minusLimit': db_col = 'minus_limit'
-                    elif key == 'openBanking': db_col = 'open_banking'
-                    elif key == 'checkedCredit': db_col = 'checked_credit'
-                    elif key == 'checkedMembership': db_col = 'checked_membership'
-                    
-                    try:
-                        user_val = conn.execute(text(f"SELECT {db_col} FROM user_stats WHERE user_id = :uid"), {'uid': uid}).scalar()
-                    except Exception:
-                        continue
-                        
-                    if user_val is None:
-                        continue
-
-                    # 3. 조건 비교
-                    passed = False
-                    try:
-                        if op == 'eq': passed = (float(user_val) == float(val))
-                        elif op == 'gte': passed = (float(user_val) >= float(val))
-                        elif op == 'lte': passed = (float(user_val) <= float(val))
-                        elif op == 'gt': passed = (float(user_val) > float(val))
-                        elif op == 'lt': passed = (float(user_val) < float(val))
-                    except ValueError:
-                        pass
+        if mismatches:
+            detail = ", ".join(f"{m['user_id']}(balance={m['balance']}, lots={m['lot_remaining']})" for m in mismatches[:20])
+            self._log_status("POINT_LEDGER_CHECK", "FAIL", len(mismatches),
+                             f"Balance/lot mismatch (lots rebuilt): {detail}", level='WARNING')
+        else:
+            self._log_status("POINT_LEDGER_CHECK", "SUCCESS", 0, "All balances match lot ledger")
+        return mismatches
 
-                    if passed:
-                        print(f"[Mission] User {uid} completed '{title}'")
-                        
-                        # 상태 업데이트
-                        conn.execute(text("UPDATE missions SET status = 'completed', completed_at = NOW() WHERE mission_id = :mid"), {'mid': mid})
-                        
-                        # 포인트 지급
-                        if reward > 0:
-                            expires_at = datetime.now() + timedelta(days=365)
-                            conn.execute(text("""
-                                INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id, reference_id, expires_at)
-                                VALUES (:uid, :amt, 'mission_reward', :reason, 'system', :ref, :exp)
-                            """), {'uid': uid, 'amt': reward, 'reason': f"{title} 미션 자동 달성", 'ref': f"mission_{mid}", 'exp': expires_at})
-                            
-                            conn.execute(text("UPDATE user_points SET balance = balance + :amt, total_earned = total_earned + :amt WHERE user_id = :uid"), {'uid': uid, 'amt': reward})
-                            
-                        conn.execute(text("INSERT INTO notifications (user_id, message, type) VALUES (:uid, :msg, 'success')"), {'uid': uid, 'msg': f"축하합니다! '{title}' 미션을 달성하여 {reward}P를 받았습니다."})
-                
+    def compact_collection_logs(self):
+        """collection_logs 일일 롤업 + 보존 기간이 지난 원본 로그를 월별 보관 테이블로 이동"""
+        try:
+            result = compact_collection_logs(self.engine)
+        except Exception as e:
+            self._log_status("LOG_COMPACTION", "FAIL", 0, str(e), level='ERROR')
+            return None
+        self._log_status("LOG_COMPACTION", "SUCCESS", result['archived'],
+                         f"{result['rolled_up_days']} day(s) rolled up, {result['archived']} row(s) archived")
+        return result
+
+    def reconcile_table_counters(self):
+        """table_counters를 COUNT(*)로 재계산 (다른 앱이 직접 쓰는 테이블의 오차 보정)"""
+        try:
+            drift = reconcile_table_counters(self.engine)
+        except Exception as e:
+            self._log_status("TABLE_COUNTERS", "FAIL", 0, str(e), level='ERROR')
+            return None
+        if drift:
+            detail = ", ".join(f"{name}({old}→{new})" for name, (old, new) in drift.items())
+            self._log_status("TABLE_COUNTERS", "SUCCESS", len(drift), f"Counter drift corrected: {detail}", level='WARNING')
+        return drift
+
+    # 미션 tracking_key(camelCase) → user_stats 컬럼 매핑 (snake_case 키는 그대로 사용)
+    TRACKING_KEY_COLUMNS = {
+        'creditScore': 'credit_score',
+        'dsr': 'dsr',
+        'cardUsageRate': 'card_usage_rate',
+        'delinquency': 'delinquency',
+        'salaryTransfer': 'salary_transfer',
+        'highInterestLoan': 'high_interest_loan',
+        'minusLimit': 'minus_limit',
+        'openBanking': 'open_banking',
+        'checkedCredit': 'checked_credit',
+        'checkedMembership': 'checked_membership',
+    }
+    TRACKING_OPERATORS = ('eq', 'gte', 'lte', 'gt', 'lt')
+
+    @classmethod
+    def _tracking_column(cls, key):
+        """tracking_key → user_stats 컬럼명 (알 수 없는 키는 None)"""
+        col = cls.TRACKING_KEY_COLUMNS.get(key, key)
+        return col if col in cls.TRACKING_KEY_COLUMNS.values() else None
+
+    # 변경분 평가 조건: 마지막 평가 이후 미션 자체가 바뀌었거나 유저 스탯이 바뀐 경우 (user_stats.updated_at 인덱스 사용)
+    CHANGED_MISSIONS_FILTER = """
+        AND (missions.updated_at >= :since
+             OR missions.user_id IN (SELECT user_id FROM user_stats WHERE updated_at >= :since))
+    """
+
+    def _load_active_missions(self, conn, since=None):
+        """추적 조건이 있는 진행/대기 미션과 해당 유저 스탯을 한 번에 조회 (JOIN 1회)
+
+        since: 지정 시 그 시각 이후 변경된 미션/스탯만 조회 (None이면 전체)
+        """
+        stat_cols = sorted(set(self.TRACKING_KEY_COLUMNS.values()))
+        return pd.read_sql(text(f"""
+            SELECT missions.mission_id, missions.user_id, missions.mission_title, missions.reward_points,
+                   missions.tracking_key, missions.tracking_operator, missions.tracking_value,
+                   {', '.join(f's.{c}' for c in stat_cols)}
+            FROM missions
+            JOIN user_stats s ON s.user_id = missions.user_id
+            WHERE missions.status IN ('pending', 'in_progress')
+              AND missions.tracking_key IS NOT NULL
+              {self.CHANGED_MISSIONS_FILTER if since else ''}
+        """), conn, params={'since': since} if since else None)
+
+    @classmethod
+    def _evaluate_missions(cls, df):
+        """미션별 조건(컬럼, 연산자, 기준값)을 벡터 연산으로 평가 → 달성한 미션 행만 반환"""
+        if df.empty:
+            return df
+        columns = df['tracking_key'].map(cls._tracking_column)
+        user_val = pd.Series(float('nan'), index=df.index)
+        for col in columns.dropna().unique():
+            mask = columns == col
+            user_val[mask] = pd.to_numeric(df.loc[mask, col], errors='coerce')
+        target = pd.to_numeric(df['tracking_value'], errors='coerce')
+
+        op = df['tracking_operator']
+        passed = (
+            ((op == 'eq') & (user_val == target)) |
+            ((op == 'gte') & (user_val >= target)) |
+            ((op == 'lte') & (user_val <= target)) |
+            ((op == 'gt') & (user_val > target)) |
+            ((op == 'lt') & (user_val < target))
+        )
+        # 스탯 값이나 기준값이 비어 있으면(NaN) 모든 비교가 False → 미달성
+        return df[passed]
+
+    def _apply_mission_completions(self, conn, completed, now):
+        """달성 미션의 상태 변경, 포인트 지급, 잔액 반영, 알림을 일괄(executemany) 기록 → 이번에 완료 처리한 미션 수
+
+        UPDATE 시 completion_batch를 표시하고, 이 회차에서 실제로 상태가 바뀐 미션에만 보상/알림을 기록한다.
+        (수동 실행과 스케줄 실행이 겹쳐도 이미 완료된 미션은 다시 보상하지 않음)
+        """
+        batch = uuid.uuid4().hex
+        missions = [
+            {'mid': int(r.mission_id), 'uid': r.user_id, 'title': r.mission_title,
+             'reward': int(r.reward_points or 0)}
+            for r in completed.itertuples()
+        ]
+        conn.execute(text("""
+            UPDATE missions SET status = 'completed', completed_at = :now, completion_batch = :batch
+            WHERE mission_id = :mid AND status IN ('pending', 'in_progress')
+        """), [{'mid': m['mid'], 'now': now, 'batch': batch} for m in missions])
+        changed = {row[0] for row in conn.execute(text("SELECT mission_id FROM missions WHERE completion_batch = :batch"),
+                                                  {'batch': batch}).fetchall()}
+        missions = [m for m in missions if m['mid'] in changed]
+        if not missions:
+            return 0
+
+        rewarded = [m for m in missions if m['reward'] > 0]
+        if rewarded:
+            expires_at = now + timedelta(days=365)
+            conn.execute(text("""
+                INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id, reference_id, expires_at)
+                VALUES (:uid, :amt, 'mission_reward', :reason, 'system', :ref, :exp)
+            """), [{'uid': m['uid'], 'amt': m['reward'], 'reason': f"{m['title']} 미션 자동 달성",
+                    'ref': f"mission_{m['mid']}", 'exp': expires_at} for m in rewarded])
+
+            # executemany는 생성된 ID를 돌려주지 않으므로 reference_id로 거래 ID를 다시 찾아 lot에 연결
+            refs = [f"mission_{m['mid']}" for m in rewarded]
+            tx_ids = dict(conn.execute(text("""
+                SELECT reference_id, MAX(transaction_id) FROM point_transactions
+                WHERE transaction_type = 'mission_reward' AND reference_id IN :refs
+                GROUP BY reference_id
+            """).bindparams(bindparam('refs', expanding=True)), {'refs': refs}).fetchall())
+            record_point_lots(conn, [{'uid': m['uid'], 'tid': tx_ids.get(f"mission_{m['mid']}"),
+                                      'amt': m['reward'], 'exp': expires_at} for m in rewarded])
+
+            totals = {}
+            for m in rewarded:
+                totals[m['uid']] = totals.get(m['uid'], 0) + m['reward']
+            conn.execute(text("""
+                UPDATE user_points SET balance = balance + :amt, total_earned = total_earned + :amt
+                WHERE user_id = :uid
+            """), [{'uid': uid, 'amt': amt} for uid, amt in totals.items()])
+
+        conn.execute(text("INSERT INTO notifications (user_id, message, type) VALUES (:uid, :msg, 'success')"), [
+            {'uid': m['uid'], 'msg': f"축하합니다! '{m['title']}' 미션을 달성하여 {m['reward']}P를 받았습니다."}
+            for m in missions
+        ])
+        return len(missions)
+
+    # tracking_operator → SQL 비교 연산자 (SQL 푸시다운 모드)
+    TRACKING_SQL_OPERATORS = {'eq': '=', 'gte': '>=', 'lte': '<=', 'gt': '>', 'lt': '<'}
+
+    @staticmethod
+    def _sql_concat(conn, *parts):
+        """DB 방언별 문자열 연결식 (MySQL은 CONCAT, 그 외는 ||)"""
+        if conn.dialect.name == 'mysql':
+            return f"CONCAT({', '.join(parts)})"
+        return ' || '.join(parts)
+
+    def _complete_missions_sql(self, conn, now, since=None):
+        """미션 달성 판정과 후속 기록을 집합 단위 SQL로 DB 안에서 처리 → 완료 처리한 미션 수
+
+        활성 규칙을 (컬럼, 연산자) 그룹으로 묶어 그룹당 UPDATE 1회로 완료 처리하고,
+        completion_batch로 표시된 이번 완료 건에서 보상/lot/잔액/알림을 INSERT ... SELECT로 생성한다.
+        (미션/스탯 행은 Python으로 가져오지 않음). since 지정 시 그 이후 변경분만 평가
+        """
+        changed = self.CHANGED_MISSIONS_FILTER if since else ''
+        rules = conn.execute(text(f"""
+            SELECT DISTINCT tracking_key, tracking_operator FROM missions
+            WHERE status IN ('pending', 'in_progress') AND tracking_key IS NOT NULL {changed}
+        """), {'since': since}).fetchall()
+
+        groups = {}
+        for key, op in rules:
+            col = self._tracking_column(key)
+            if col and op in self.TRACKING_SQL_OPERATORS:
+                groups.setdefault((col, op), []).append(key)
+
+        batch = uuid.uuid4().hex
+        completed = 0
+        for (col, op), keys in groups.items():
+            result = conn.execute(text(f"""
+                UPDATE missions SET status = 'completed', completed_at = :now, completion_batch = :batch
+                WHERE status IN ('pending', 'in_progress')
+                  AND tracking_operator = :op AND tracking_key IN :keys
+                  AND (SELECT s.{col} FROM user_stats s WHERE s.user_id = missions.user_id)
+                      {self.TRACKING_SQL_OPERATORS[op]} tracking_value
+                  {changed}
+            """).bindparams(bindparam('keys', expanding=True)),
+                {'now': now, 'batch': batch, 'op': op, 'keys': keys, 'since': since})
+            completed += result.rowcount
+        if completed == 0:
+            return 0
+
+        params = {'batch': batch, 'exp': now + timedelta(days=365)}
+        conn.execute(text(f"""
+            INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id, reference_id, expires_at)
+            SELECT user_id, reward_points, 'mission_reward', {self._sql_concat(conn, 'mission_title', "' 미션 자동 달성'")},
+                   'system', {self._sql_concat(conn, "'mission_'", 'mission_id')}, :exp
+            FROM missions WHERE completion_batch = :batch AND reward_points > 0
+        """), params)
+        conn.execute(text(f"""
+            INSERT INTO point_lots (user_id, transaction_id, amount, remaining, expires_at)
+            SELECT t.user_id, t.transaction_id, t.amount, t.amount, t.expires_at
+            FROM missions m
+            JOIN point_transactions t
+              ON t.reference_id = {self._sql_concat(conn, "'mission_'", 'm.mission_id')} AND t.transaction_type = 'mission_reward'
+            WHERE m.completion_batch = :batch AND m.reward_points > 0
+              AND NOT EXISTS (SELECT 1 FROM point_lots l WHERE l.transaction_id = t.transaction_id)
+        """), params)
+        conn.execute(text("""
+            UPDATE user_points
+            SET balance = balance + (SELECT SUM(m.reward_points) FROM missions m
+                                     WHERE m.completion_batch = :batch AND m.user_id = user_points.user_id),
+                total_earned = total_earned + (SELECT SUM(m.reward_points) FROM missions m
+                                               WHERE m.completion_batch = :batch AND m.user_id = user_points.user_id)
+            WHERE user_id IN (SELECT user_id FROM missions WHERE completion_batch = :batch AND reward_points > 0)
+        """), params)
+        message = self._sql_concat(conn, "'축하합니다! '''", 'mission_title', "''' 미션을 달성하여 '", 'reward_points',
+                                   "'P를 받았습니다.'")
+        conn.execute(text(f"""
+            INSERT INTO notifications (user_id, message, type)
+            SELECT user_id, {message}, 'success' FROM missions WHERE completion_batch = :batch
+        """), params)
+        return completed
+
+    MISSION_EVAL_HWM_KEY = 'MISSION_EVAL_HWM'
+
+    def check_mission_progress(self, full=False):
+        """사용자 통계(user_stats) 기반 미션 자동 완료 처리 → 완료 처리한 미션 수 반환
+
+        MISSION_EVAL_MODE 설정에 따라 평가 방식 선택
+        - batch (기본): 활성 미션과 유저 스탯을 JOIN 1회로 읽고 조건을 일괄 평가한 뒤 결과를 배치로 기록
+        - sql: 판정과 기록을 모두 집합 단위 SQL로 DB 안에서 처리 (_complete_missions_sql)
+
+        평소에는 MISSION_EVAL_HWM(마지막 평가 시작 시각) 이후 변경된 미션/스탯만 평가한다.
+        full=True이거나 HWM이 없으면 전체 활성 미션을 평가한다. (reconcile_mission_progress)
+        """
+        print("--- 미션 달성 여부 확인 시작 ---")
+        mode = self._get_config('MISSION_EVAL_MODE', 'batch')
+        since = None if full else self._get_config(self.MISSION_EVAL_HWM_KEY)
+        try:
+            with self.engine.connect() as conn:
+                # 기준 시각은 updated_at을 기록하는 DB 시계로 잡는다. 같은 초의 변경을 놓치지 않도록 다음 회차는 >= 로 비교
+                hwm = str(conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar())
+                now = datetime.now().replace(microsecond=0)
+                if mode == 'sql':
+                    count = self._complete_missions_sql(conn, now, since)
+                    if count:
+                        print(f"[Mission] {count} missions completed (sql)")
+                else:
+                    completed = self._evaluate_missions(self._load_active_missions(conn, since))
+                    for r in completed.itertuples():
+                        print(f"[Mission] User {r.user_id} completed '{r.mission_title}'")
+                    count = self._apply_mission_completions(conn, completed, now) if len(completed) else 0
+
+                self._set_config(conn, self.MISSION_EVAL_HWM_KEY, hwm)
                 conn.commit()
+                return count
         except Exception as e:
             print(f"미션 확인 중 오류: {e}")
             traceback.print_exc()
-            
+            return 0
+
+    def reconcile_mission_progress(self):
+        """전체 활성 미션 재평가 (변경 추적에서 누락된 건 보정용, 하루 1회)"""
+        return self.check_mission_progress(full=True)
+
+    def _expire_mission_batch(self, conn, today, now, batch_size):
+        """기한 지난 진행/대기 미션을 최대 batch_size건 만료 처리 → (조회한 미션 수, 실제 만료한 미션 수)
+
+        (status, due_date) 인덱스로 대상 ID만 먼저 고른 뒤 PK로 UPDATE 하여 잠금 범위를 배치 크기로 제한한다.
+        조회 후 상태가 바뀐 미션은 UPDATE 조건에서 빠지므로, 이번 UPDATE가 바꾼 행(updated_at = now)만
+        다시 조회해 이력을 남긴다.
+        """
+        ids = [r[0] for r in conn.execute(text("""
+            SELECT mission_id FROM missions
+            WHERE status IN ('pending', 'in_progress') AND due_date < :today
+            ORDER BY due_date
+            LIMIT :limit
+        """), {'today': today, 'limit': batch_size}).fetchall()]
+        if not ids:
+            return 0, 0
+
+        conn.execute(text("""
+            UPDATE missions SET status = 'expired', updated_at = :now
+            WHERE mission_id IN :ids AND status IN ('pending', 'in_progress')
+        """).bindparams(bindparam('ids', expanding=True)), {'ids': ids, 'now': now})
+        changed = [r[0] for r in conn.execute(text("""
+            SELECT mission_id FROM missions
+            WHERE mission_id IN :ids AND status = 'expired' AND updated_at = :now
+        """).bindparams(bindparam('ids', expanding=True)), {'ids': ids, 'now': now}).fetchall()]
+        if changed:
+            conn.execute(text("""
+                INSERT INTO mission_history (mission_id, admin_id, change_type, description)
+                VALUES (:mid, 'system', 'expire', '기한 만료 자동 처리')
+            """), [{'mid': mid} for mid in changed])
+        return len(ids), len(changed)
+
     def check_mission_expiration(self):
-        """기한이 지난 미션을 expired 상태로 변경"""
+        """기한이 지난 미션을 expired 상태로 변경 → {'expired': 처리 건수, 'duration': 소요 시간(초)}
+
+        MISSION_EXPIRE_BATCH_SIZE건씩 나누어 처리하고 배치마다 commit 한다. (긴 행 잠금 방지)
+        """
         print("--- 미션 기한 만료 확인 시작 ---")
+        batch_size = max(1, self._get_int_config('MISSION_EXPIRE_BATCH_SIZE', 500))
+        started = time.perf_counter()
+        expired = 0
         try:
             with self.engine.connect() as conn:
-                # 기한이 지났고(due_date < 오늘), 아직 진행중/대기중인 미션 조회 및 업데이트
-                result = conn.execute(text("""
-                    UPDATE missions 
-                    SET status = 'expired', updated_at = NOW()
-                    WHERE status IN ('pending', 'in_progress') 
-                      AND due_date < CURDATE()
-                """))
-                if result.rowcount > 0:
-                    print(f"[Mission] {result.rowcount} missions expired.")
+                today = datetime.now().date()
+                while True:
+                    # DATETIME 컬럼 정밀도(초)에 맞춰야 updated_at = now 재조회가 일치함
+                    selected, count = self._expire_mission_batch(conn, today, datetime.now().replace(microsecond=0),
+                                                                 batch_size)
                     conn.commit()
+                    expired += count
+                    if selected < batch_size:
+                        break
+
+            duration = time.perf_counter() - started
+            print(f"[Mission] {expired} missions expired in {duration:.2f}s")
+            if expired > 0:
+                self._log_status("MISSION_EXPIRATION", "SUCCESS", expired, f"{duration:.2f}s (batch {batch_size})")
+            return {'expired': expired, 'duration': duration}
         except Exception as e:
             print(f"미션 기한 확인 중 오류: {e}")
             traceback.print_exc()
-            self._log_status("MISSION_EXPIRATION", "FAIL", 0, str(e), level='ERROR')
+            self._log_status("MISSION_EXPIRATION", "FAIL", expired, str(e), level='ERROR')
             
             # [New] 예외 발생 시 시스템 로그 및 관리자 알림 전송
             try:
@@ -521,6 +2159,7 @@ class DataCollector:
                     conn.commit()
             except Exception as inner_e:
                 print(f"오류 알림 전송 실패: {inner_e}")
+            return {'expired': expired, 'duration': time.perf_counter() - started}
 
 if __name__ == "__main__":
     print("Data Collector Scheduler Started...")
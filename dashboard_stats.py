@@ -0,0 +1,114 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from table_counters import table_count
+
+# 대시보드/헤더 공용 통계를 한 번의 쿼리로 조회하고 짧게 캐시 (프로세스 내 모든 요청/스레드 공유)
+# 각 부분 쿼리는 (stat, label, num_value, text_value) 형태로 UNION ALL 한다.
+
+# collection_logs 등은 첫 수집 때 생성되므로, 한 부분이라도 실패하면 부분별로 나눠 다시 조회한다
+DASHBOARD_STAT_QUERIES = [
+    # 수집 데이터/수집 로그 건수는 COUNT(*) 대신 행 수 카운터(table_counters)
+    """SELECT 'counter' AS stat, table_name AS label, row_count AS num_value, NULL AS text_value FROM table_counters
+       WHERE table_name IN ('raw_loan_products', 'raw_economic_indicators', 'raw_income_stats', 'collection_logs')""",
+    "SELECT 'unread_notifications', NULL, COUNT(*), NULL FROM notifications WHERE is_read = 0",
+    "SELECT 'status_24h', status, COUNT(*), NULL FROM collection_logs WHERE executed_at >= :cutoff GROUP BY status",
+    "SELECT 'config', config_key, NULL, config_value FROM service_config",
+]
+DASHBOARD_STATS_SQL = "\nUNION ALL\n".join(DASHBOARD_STAT_QUERIES)
+
+COUNTER_STATS = {
+    'raw_loan_products': 'loan_count',
+    'raw_economic_indicators': 'economy_count',
+    'raw_income_stats': 'income_count',
+    'collection_logs': 'log_count',  # 현재 collection_logs 행 수 (보관 테이블로 옮긴 로그 제외)
+}
+
+
+def default_stats():
+    return {'loan_count': 0, 'economy_count': 0, 'income_count': 0, 'log_count': 0, 'unread_notifications': 0,
+            'WEIGHT_INCOME': 0.5, 'WEIGHT_JOB_STABILITY': 0.3, 'WEIGHT_ESTATE_ASSET': 0.2,
+            'COLLECTOR_FSS_LOAN_ENABLED': '1', 'COLLECTOR_KOSIS_INCOME_ENABLED': '1', 'COLLECTOR_ECONOMIC_ENABLED': '1',
+            'log_stats_24h': {}, 'recent_errors': 0}
+
+
+def load_dashboard_stats(conn, now=None):
+    """대시보드 통계 1회 조회 (collection_logs 카운터가 아직 없으면 COUNT(*) 후 카운터 생성)
+
+    반환 키: loan/economy/income_count, log_count, unread_notifications, log_stats_24h, recent_errors(24h FAIL),
+    service_config 전체 (WEIGHT_*는 float)
+    """
+    now = now or datetime.now()
+    stats = default_stats()
+    params = {'cutoff': now - timedelta(hours=24)}
+    try:
+        rows = conn.execute(text(DASHBOARD_STATS_SQL), params).fetchall()
+    except Exception:
+        conn.rollback()
+        rows = []
+        for query in DASHBOARD_STAT_QUERIES:
+            try:
+                rows.extend(conn.execute(text(query), {k: v for k, v in params.items() if f":{k}" in query}).fetchall())
+            except Exception:
+                conn.rollback()
+    counted = set()
+    for stat, label, num_value, text_value in rows:
+        if stat == 'counter':
+            counted.add(label)
+            stats[COUNTER_STATS[label]] = int(num_value or 0)
+        elif stat == 'status_24h':
+            stats['log_stats_24h'][label] = int(num_value)
+        elif stat == 'config':
+            if label.startswith('WEIGHT_'):
+                try:
+                    stats[label] = float(text_value)
+                except (TypeError, ValueError):
+                    pass
+            else:
+                stats[label] = text_value
+        else:
+            stats[stat] = int(num_value or 0)
+    if 'collection_logs' not in counted:
+        try:
+            stats['log_count'] = int(table_count(conn, 'collection_logs'))
+        except Exception:
+            conn.rollback()  # collection_logs가 아직 없음
+    stats['recent_errors'] = stats['log_stats_24h'].get('FAIL', 0)
+    return stats
+
+
+class DashboardStatsProvider:
+    """대시보드 통계 TTL 캐시
+
+    - ttl초 안의 요청은 캐시된 값을 복사해 반환 (쿼리 없음)
+    - 만료 시 한 스레드만 다시 조회하고 나머지는 그 결과를 기다림
+    - 조회 실패 시 직전 값(없으면 기본값)을 반환하고 다음 요청에서 재시도
+    """
+
+    def __init__(self, engine, ttl=5.0):
+        self.engine = engine
+        self.ttl = ttl
+        self._stats = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        stats = self._stats
+        if stats is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return dict(stats)
+        with self._lock:
+            if self._stats is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return dict(self._stats)
+            try:
+                with self.engine.connect() as conn:
+                    self._stats = load_dashboard_stats(conn)
+                self._loaded_at = time.monotonic()
+            except Exception as e:
+                print(f"대시보드 통계 조회 실패: {e}")
+                return dict(self._stats or default_stats(), db_error=True)
+            return dict(self._stats)
+
+    def invalidate(self):
+        """설정 변경 등으로 다음 요청에서 바로 다시 조회해야 할 때"""
+        self._loaded_at = 0.0
@@ -0,0 +1,77 @@
+import hashlib
+import re
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+# 수집 실패 에러 지문(fingerprint)
+# 같은 소스에서 같은 위치/유형으로 실패하면 같은 지문이 되도록 traceback을 정규화해 해시한다.
+# 전체 traceback은 error_signatures에 한 번만 저장하고, collection_logs에는 요약 한 줄과 지문만 남긴다.
+
+ERROR_SIGNATURES_DDL = """
+    CREATE TABLE IF NOT EXISTS error_signatures (
+        signature CHAR(40) PRIMARY KEY,
+        target_source VARCHAR(100) NOT NULL,
+        summary VARCHAR(500),
+        error_text MEDIUMTEXT,
+        occurrences INT NOT NULL DEFAULT 1,
+        first_seen DATETIME NOT NULL,
+        last_seen DATETIME NOT NULL,
+        INDEX idx_error_signatures_last_seen (last_seen)
+    )
+"""
+
+SUMMARY_MAX_LEN = 500
+
+# 실행마다 달라지는 값 (경로, 주소, UUID, 시각, 따옴표 안의 id) → 고정 토큰
+# traceback의 line N, HTTP 상태 코드, 에러 코드 같은 숫자는 실패 위치/유형을 구분하므로 그대로 둔다.
+_VOLATILE_PATTERNS = [
+    (re.compile(r'File "(?:[^"]*[/\\])?([^"/\\]+)"'), r'File "\1"'),
+    (re.compile(r'0x[0-9a-fA-F]+'), '0x?'),
+    (re.compile(r'[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}'), '<uuid>'),
+    (re.compile(r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?'), '<ts>'),
+    (re.compile(r'(?<!File )([\'"])[\w.:-]*\d[\w.:-]*\1'), r'\1<id>\1'),
+]
+
+
+def normalize_error(error_text):
+    """traceback/에러 메시지에서 실행마다 달라지는 값을 지우고 줄 단위 공백 정리"""
+    normalized = error_text or ''
+    for pattern, repl in _VOLATILE_PATTERNS:
+        normalized = pattern.sub(repl, normalized)
+    return '\n'.join(line.strip() for line in normalized.splitlines() if line.strip())
+
+
+def error_signature(source, error_text):
+    """소스 + 정규화한 에러 텍스트의 SHA-1 (40자)"""
+    return hashlib.sha1(f"{source}\n{normalize_error(error_text)}".encode('utf-8')).hexdigest()
+
+
+def error_summary(error_text):
+    """에러 텍스트의 마지막 줄 (traceback이면 예외 타입과 메시지)"""
+    lines = [line.strip() for line in (error_text or '').splitlines() if line.strip()]
+    return (lines[-1] if lines else '')[:SUMMARY_MAX_LEN]
+
+
+def record_error_signature(conn, source, error_text, seen_at):
+    """지문 발생 기록 (처음이면 전체 텍스트 저장, 이후에는 횟수/마지막 발생 시각만 갱신) → 지문
+
+    commit은 호출 측에서 한다.
+    """
+    signature = error_signature(source, error_text)
+    params = {'sig': signature, 'seen': seen_at}
+    updated = conn.execute(text("""
+        UPDATE error_signatures SET occurrences = occurrences + 1, last_seen = :seen WHERE signature = :sig
+    """), params)
+    if updated.rowcount == 0:
+        try:
+            conn.execute(text("""
+                INSERT INTO error_signatures (signature, target_source, summary, error_text, occurrences, first_seen, last_seen)
+                VALUES (:sig, :src, :summary, :text, 1, :seen, :seen)
+            """), dict(params, src=source, summary=error_summary(error_text), text=error_text))
+        except IntegrityError:
+            # 다른 프로세스가 같은 지문을 먼저 기록
+            conn.rollback()
+            conn.execute(text("""
+                UPDATE error_signatures SET occurrences = occurrences + 1, last_seen = :seen WHERE signature = :sig
+            """), params)
+    return signature
@@ -0,0 +1,159 @@
+import re
+import json
+import hashlib
+import pandas as pd
+from sqlalchemy.types import BigInteger, Float, Boolean, Text
+try:
+    import ijson  # 스트리밍 JSON 파서 (레코드 단위로 순회)
+except ImportError:
+    ijson = None
+
+# 추론 타입 → DB 컬럼 타입
+SQL_TYPES = {'int': BigInteger, 'float': Float, 'bool': Boolean, 'str': Text}
+
+
+def sanitize_column(name):
+    """DB 컬럼명으로 쓸 수 있도록 정리 (영문/숫자/_ 이외 문자는 _로 치환, 최대 64자)"""
+    cleaned = re.sub(r'[^0-9a-zA-Z_]', '_', str(name)).strip('_').lower()
+    return (cleaned or 'col')[:64]
+
+
+TABLE_NAME_MAX_LEN = 64  # MySQL 식별자 최대 길이
+
+
+def custom_table_name(source_key):
+    """커스텀 수집기의 평탄화 결과 테이블명 (custom_<source_key>_<원래 키 해시 8자>, 최대 64자)
+
+    정리 과정에서 다른 키가 같은 이름이 되지 않도록 원래 키의 해시를 붙인다.
+    """
+    suffix = hashlib.sha1(str(source_key).encode('utf-8')).hexdigest()[:8]
+    base = sanitize_column(source_key)[:TABLE_NAME_MAX_LEN - len('custom__') - len(suffix)]
+    return f"custom_{base}_{suffix}"
+
+
+def find_table_name_conflict(source_key, existing_keys):
+    """source_key와 같은 평탄화 테이블명을 쓰게 되는 기존 소스 키 (없으면 None)"""
+    table_name = custom_table_name(source_key)
+    for key in existing_keys:
+        if key != source_key and custom_table_name(key) == table_name:
+            return key
+    return None
+
+
+class RecordFlattener:
+    """커스텀 수집기 JSON 페이로드 → 평탄화된 행 변환기
+
+    record_path: 레코드 배열 위치 (점 구분, 예: "response.body.items"). "$"이면 최상위 배열
+    column_mapping: {"컬럼명": "레코드 내 경로(점 구분)"}. 없으면 중첩 객체를 a_b 형태로 모두 펼침
+    (배열/객체 값은 JSON 문자열로 저장)
+    """
+
+    def __init__(self, record_path=None, column_mapping=None):
+        self.record_path = (record_path or '').strip().lstrip('$').strip('.')
+        self.column_mapping = {sanitize_column(col): path for col, path in (column_mapping or {}).items()}
+
+    @property
+    def signature(self):
+        """설정 서명 (record_path/column_mapping이 바뀌면 스키마 캐시 무효화)"""
+        raw = json.dumps([self.record_path, self.column_mapping], sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def iter_records(self, fp):
+        """바이너리 스트림에서 레코드를 하나씩 yield (ijson 사용 시 문서 전체를 메모리에 올리지 않음)"""
+        if ijson is not None:
+            prefix = f"{self.record_path}.item" if self.record_path else 'item'
+            yield from ijson.items(fp, prefix, use_float=True)
+            return
+
+        # ijson 미설치 환경 fallback
+        node = json.load(fp)
+        for key in filter(None, self.record_path.split('.')):
+            node = node.get(key) if isinstance(node, dict) else None
+        yield from (node if isinstance(node, list) else [])
+
+    @staticmethod
+    def _scalar(value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    @classmethod
+    def _flatten_dict(cls, record, parent='', out=None):
+        out = {} if out is None else out
+        for key, value in record.items():
+            col = f"{parent}_{key}" if parent else str(key)
+            if isinstance(value, dict):
+                cls._flatten_dict(value, col, out)
+            else:
+                out[sanitize_column(col)] = cls._scalar(value)
+        return out
+
+    def flatten(self, record):
+        """레코드 하나 → {컬럼: 스칼라 값}"""
+        if not isinstance(record, dict):
+            return {'value': self._scalar(record)}
+        if not self.column_mapping:
+            return self._flatten_dict(record)
+
+        row = {}
+        for col, path in self.column_mapping.items():
+            node = record
+            for key in str(path).split('.'):
+                node = node.get(key) if isinstance(node, dict) else None
+            row[col] = self._scalar(node)
+        return row
+
+    def iter_rows(self, fp):
+        for record in self.iter_records(fp):
+            yield self.flatten(record)
+
+    @staticmethod
+    def _value_type(value):
+        if isinstance(value, bool):
+            return 'bool'
+        if isinstance(value, int):
+            return 'int'
+        if isinstance(value, float):
+            return 'float'
+        return 'str'
+
+    def infer_schema(self, rows, sample_size=500):
+        """앞쪽 sample_size개 행으로 컬럼 타입 추론 → [(컬럼, 타입), ...]
+
+        int와 float가 섞이면 float, 그 외 타입이 섞이거나 값이 모두 비어 있으면 str
+        """
+        types = {}
+        for i, row in enumerate(rows):
+            if i >= sample_size:
+                break
+            for col, value in row.items():
+                seen = types.setdefault(col, set())
+                if value is not None:
+                    seen.add(self._value_type(value))
+
+        schema = []
+        for col, seen in types.items():
+            if len(seen) == 1:
+                col_type = seen.pop()
+            elif seen == {'int', 'float'}:
+                col_type = 'float'
+            else:
+                col_type = 'str'
+            schema.append((col, col_type))
+        return schema
+
+    @staticmethod
+    def to_frame(rows, schema):
+        """행 목록을 스키마 타입으로 변환한 DataFrame (스키마에 없는 컬럼은 제외, 변환 불가 값은 NULL)"""
+        columns = [col for col, _ in schema]
+        df = pd.DataFrame(rows, columns=columns)
+        for col, col_type in schema:
+            if col_type == 'int':
+                df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+            elif col_type == 'float':
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            elif col_type == 'bool':
+                df[col] = df[col].map(lambda v: bool(v) if isinstance(v, (bool, int, float)) and v == v else None).astype('boolean')
+            else:
+                df[col] = df[col].map(lambda v: None if v is None or v != v else str(v))
+        return df
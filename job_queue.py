@@ -0,0 +1,179 @@
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+# 수집 작업 실행 이력 (수동 트리거/스케줄 실행 공용)
+COLLECTION_JOBS_DDL = """
+    CREATE TABLE IF NOT EXISTS collection_jobs (
+        job_id VARCHAR(32) PRIMARY KEY,
+        source_key VARCHAR(100) NOT NULL,
+        triggered_by VARCHAR(20) NOT NULL DEFAULT 'manual',
+        status VARCHAR(20) NOT NULL DEFAULT 'queued',
+        error_message TEXT,
+        created_at DATETIME NOT NULL,
+        started_at DATETIME,
+        finished_at DATETIME,
+        duration_ms INT,
+        worker_id VARCHAR(100),
+        active_key VARCHAR(100),
+        UNIQUE KEY uq_collection_jobs_active (active_key),
+        INDEX idx_collection_jobs_source (source_key, status),
+        INDEX idx_collection_jobs_created (created_at)
+    )
+"""
+
+ACTIVE_STATUSES = ('queued', 'running')
+ORPHANED_MESSAGE = 'Worker process exited before the job finished'
+STALE_MESSAGE = 'Job did not finish within stale_after; released for a new run'
+
+
+def _pid_alive(pid):
+    """같은 호스트의 프로세스 생존 여부 (확인할 수 없으면 True)"""
+    if os.name == 'nt':
+        return True  # Windows의 os.kill은 프로세스를 종료시키므로 확인하지 않음 (stale_after로 처리)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class CollectionJobQueue:
+    """수집 작업 백그라운드 실행 큐 (고정 크기 워커 풀 + collection_jobs 상태 기록)
+
+    - submit은 작업을 등록만 하고 바로 job_id를 반환 (HTTP 요청 스레드를 붙잡지 않음)
+    - 같은 소스의 작업이 queued/running 상태면 새로 만들지 않고 기존 job_id를 반환 (중복 트리거 병합)
+      진행 중인 작업은 active_key(UNIQUE, 완료 시 NULL)에 source_key를 두므로 여러 프로세스가 동시에
+      등록해도 DB가 하나만 받아들인다. stale_after초가 지난 작업은 failed로 정리하고 키를 넘겨받음
+    - 작업 행에 실행 프로세스(호스트:PID)를 기록하고, 시작 시 recover_orphaned_jobs로
+      같은 호스트에서 종료된 프로세스가 남긴 queued/running 작업을 failed로 정리
+    """
+
+    def __init__(self, engine, max_workers=2, stale_after=3600):
+        self.engine = engine
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._active = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="CollectionJob")
+
+    def _claim(self, conn, source_key, triggered_by):
+        """active_key 유일성으로 작업 행 등록 → (job_id, 새로 등록했는지 여부)
+
+        이미 다른 작업이 키를 잡고 있으면 그 job_id를 반환한다. 잡고 있는 작업이 stale_after보다
+        오래됐으면 failed로 정리해 키를 풀고 다시 시도한다.
+        """
+        while True:
+            job_id = uuid.uuid4().hex
+            try:
+                conn.execute(text("""
+                    INSERT INTO collection_jobs (job_id, source_key, triggered_by, status, created_at, worker_id, active_key)
+                    VALUES (:id, :k, :by, 'queued', :now, :worker, :k)
+                """), {'id': job_id, 'k': source_key, 'by': triggered_by, 'now': datetime.now(),
+                       'worker': self.worker_id})
+                conn.commit()
+                return job_id, True
+            except IntegrityError:
+                conn.rollback()
+
+            cutoff = datetime.now() - timedelta(seconds=self.stale_after)
+            holder = conn.execute(text("""
+                SELECT job_id FROM collection_jobs WHERE active_key = :k AND created_at >= :cutoff
+            """), {'k': source_key, 'cutoff': cutoff}).scalar()
+            if holder:
+                return holder, False
+            conn.execute(text("""
+                UPDATE collection_jobs SET status = 'failed', error_message = :msg, finished_at = :now, active_key = NULL
+                WHERE active_key = :k AND created_at < :cutoff
+            """), {'k': source_key, 'cutoff': cutoff, 'msg': STALE_MESSAGE, 'now': datetime.now()})
+            conn.commit()
+
+    def submit(self, source_key, func, triggered_by='manual'):
+        """작업 등록 → (job_id, 새로 등록했는지 여부)"""
+        with self._lock:
+            if source_key in self._active:
+                return self._active[source_key], False
+
+            with self.engine.connect() as conn:
+                job_id, created = self._claim(conn, source_key, triggered_by)
+            if not created:
+                return job_id, False
+            self._active[source_key] = job_id
+
+        self._executor.submit(self._run, job_id, source_key, func)
+        return job_id, True
+
+    def _update(self, job_id, **fields):
+        assignments = ', '.join(f"{col} = :{col}" for col in fields)
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text(f"UPDATE collection_jobs SET {assignments} WHERE job_id = :job_id"),
+                             dict(fields, job_id=job_id))
+                conn.commit()
+        except Exception as e:
+            print(f"[JobQueue] 작업 상태 기록 실패 ({job_id}): {e}")
+
+    def _run(self, job_id, source_key, func):
+        started = time.perf_counter()
+        self._update(job_id, status='running', started_at=datetime.now())
+        status, error = 'done', None
+        try:
+            func()
+        except Exception as e:
+            status, error = 'failed', str(e)
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._active.pop(source_key, None)
+            self._update(job_id, status=status, error_message=error, finished_at=datetime.now(),
+                         duration_ms=int((time.perf_counter() - started) * 1000), active_key=None)
+
+    def recover_orphaned_jobs(self):
+        """종료된 프로세스가 남긴 queued/running 작업을 failed로 기록 → 정리한 작업 수
+
+        같은 호스트의 작업은 PID 생존 여부로 판단하고, 실행 프로세스 기록이 없는 이전 버전의 작업은
+        모두 정리한다. 다른 호스트의 작업은 stale_after가 지나면 진행 중으로 보지 않는다.
+        """
+        host = self.worker_id.rsplit(':', 1)[0]
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT job_id, worker_id FROM collection_jobs WHERE status IN ('queued', 'running')
+            """)).fetchall()
+            orphaned = []
+            for job_id, worker_id in rows:
+                if not worker_id:
+                    orphaned.append(job_id)
+                    continue
+                worker_host, _, pid = worker_id.rpartition(':')
+                if worker_host == host and worker_id != self.worker_id and pid.isdigit() and not _pid_alive(int(pid)):
+                    orphaned.append(job_id)
+            if orphaned:
+                conn.execute(text("""
+                    UPDATE collection_jobs SET status = 'failed', error_message = :msg, finished_at = :now,
+                                               active_key = NULL
+                    WHERE job_id = :id AND status IN ('queued', 'running')
+                """), [{'id': job_id, 'msg': ORPHANED_MESSAGE, 'now': datetime.now()} for job_id in orphaned])
+                conn.commit()
+        return len(orphaned)
+
+    def get(self, job_id):
+        """작업 상태 조회 (없으면 None)"""
+        with self.engine.connect() as conn:
+            row = conn.execute(text("""
+                SELECT job_id, source_key, triggered_by, status, error_message,
+                       created_at, started_at, finished_at, duration_ms
+                FROM collection_jobs WHERE job_id = :id
+            """), {'id': job_id}).mappings().fetchone()
+        return dict(row) if row else None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,176 @@
+import pandas as pd
+from datetime import datetime, time, timedelta
+from sqlalchemy import text
+from table_counters import bump_counter
+
+# collection_logs 보존/집계
+# - 하루가 끝나면 (소스, 일자, 상태)별 실행 수/적재 행 수를 collection_log_daily에 롤업한다.
+# - LOG_RETENTION_DAYS가 지난 원본 로그는 월별 보관 테이블(collection_logs_archive_YYYYMM)로 옮긴다.
+# - 누적 집계(최초 실행, 누적 건수)는 롤업 + 아직 롤업되지 않은 오늘 원본만 읽는다.
+
+COLLECTION_LOG_DAILY_DDL = """
+    CREATE TABLE IF NOT EXISTS collection_log_daily (
+        target_source VARCHAR(100) NOT NULL,
+        day DATE NOT NULL,
+        status VARCHAR(50) NOT NULL,
+        run_count INT NOT NULL DEFAULT 0,
+        row_count BIGINT NOT NULL DEFAULT 0,
+        first_run DATETIME,
+        last_run DATETIME,
+        PRIMARY KEY (target_source, day, status),
+        INDEX idx_log_daily_day (day)
+    )
+"""
+
+ROLLUP_DAY_KEY = 'COLLECTION_LOG_ROLLUP_DAY'
+RETENTION_DAYS_KEY = 'LOG_RETENTION_DAYS'
+
+
+def archive_table_name(month_start):
+    return f"collection_logs_archive_{month_start:%Y%m}"
+
+
+def _get_config(conn, key):
+    return conn.execute(text("SELECT config_value FROM service_config WHERE config_key = :k"), {'k': key}).scalar()
+
+
+def _set_config(conn, key, value):
+    updated = conn.execute(text("UPDATE service_config SET config_value = :v WHERE config_key = :k"),
+                           {'k': key, 'v': value})
+    if updated.rowcount == 0:
+        conn.execute(text("INSERT INTO service_config (config_key, config_value) VALUES (:k, :v)"),
+                     {'k': key, 'v': value})
+
+
+def rolled_up_through(conn):
+    """롤업이 끝난 마지막 일자 (아직 없으면 None)"""
+    val = _get_config(conn, ROLLUP_DAY_KEY)
+    return datetime.strptime(val, '%Y-%m-%d').date() if val else None
+
+
+def raw_log_start(conn):
+    """원본 collection_logs에서 집계해야 하는 시작 시각 (롤업 이후 일자의 0시)"""
+    last = rolled_up_through(conn)
+    return datetime.combine(last + timedelta(days=1), time.min) if last else None
+
+
+def rollup_day(conn, day):
+    """하루치 원본 로그를 (소스, 상태)별로 집계해 collection_log_daily에 다시 기록"""
+    start = datetime.combine(day, time.min)
+    conn.execute(text("DELETE FROM collection_log_daily WHERE day = :day"), {'day': day})
+    conn.execute(text("""
+        INSERT INTO collection_log_daily (target_source, day, status, run_count, row_count, first_run, last_run)
+        SELECT target_source, :day, status, COUNT(*), COALESCE(SUM(row_count), 0), MIN(executed_at), MAX(executed_at)
+        FROM collection_logs
+        WHERE executed_at >= :start AND executed_at < :end
+        GROUP BY target_source, status
+    """), {'day': day, 'start': start, 'end': start + timedelta(days=1)})
+
+
+def rollup_collection_logs(conn, today):
+    """마지막 롤업 다음 날부터 어제까지 일자별 롤업 (일자마다 commit) → 롤업한 일수"""
+    last = rolled_up_through(conn)
+    if last is None:
+        first = conn.execute(text("SELECT MIN(executed_at) FROM collection_logs")).scalar()
+        day = pd.Timestamp(first).date() if first else today
+    else:
+        day = last + timedelta(days=1)
+
+    days = 0
+    while day < today:
+        rollup_day(conn, day)
+        _set_config(conn, ROLLUP_DAY_KEY, day.strftime('%Y-%m-%d'))
+        conn.commit()
+        day += timedelta(days=1)
+        days += 1
+    return days
+
+
+def archive_collection_logs(conn, cutoff):
+    """cutoff 이전 원본 로그를 월별 보관 테이블로 이동 (월마다 commit) → 이동한 행 수
+
+    롤업이 끝난 일자까지만 이동하므로 누적 집계 값은 바뀌지 않는다.
+    단계별 소요 시간(collection_log_phases)은 보관하지 않고 함께 삭제한다.
+    """
+    rollup_start = raw_log_start(conn)
+    if rollup_start is None:
+        return 0
+    cutoff = min(cutoff, rollup_start)
+    first = conn.execute(text("SELECT MIN(executed_at) FROM collection_logs WHERE executed_at < :cutoff"),
+                         {'cutoff': cutoff}).scalar()
+    if not first:
+        return 0
+
+    moved = 0
+    month_start = pd.Timestamp(first).to_pydatetime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month_start < cutoff:
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        end = min(next_month, cutoff)
+        table = archive_table_name(month_start)
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table} AS SELECT * FROM collection_logs WHERE 1 = 0"))
+        # 보관 테이블 생성 이후 collection_logs에 추가된 컬럼은 제외하고 옮긴다
+        columns = ', '.join(conn.execute(text(f"SELECT * FROM {table} LIMIT 0")).keys())
+        params = {'start': month_start, 'end': end}
+        conn.execute(text(f"""
+            INSERT INTO {table} ({columns})
+            SELECT {columns} FROM collection_logs WHERE executed_at >= :start AND executed_at < :end
+        """), params)
+        deleted = conn.execute(text("DELETE FROM collection_logs WHERE executed_at >= :start AND executed_at < :end"),
+                               params).rowcount
+        try:
+            bump_counter(conn, 'collection_logs', -deleted)
+        except Exception:
+            pass  # 카운터 테이블이 없으면 재계산 작업이 생성
+        moved += deleted
+        conn.commit()
+        month_start = next_month
+
+    try:
+        conn.execute(text("DELETE FROM collection_log_phases WHERE executed_at < :cutoff"), {'cutoff': cutoff})
+        conn.commit()
+    except Exception:
+        conn.rollback()  # 단계별 소요 시간 테이블이 아직 없음
+    return moved
+
+
+def compact_collection_logs(engine, now=None):
+    """일일 롤업 + 보존 기간(LOG_RETENTION_DAYS, 기본 90일)이 지난 원본 로그 보관 처리
+
+    반환: {'rolled_up_days': 롤업한 일수, 'archived': 보관 테이블로 옮긴 행 수}
+    """
+    now = now or datetime.now()
+    with engine.connect() as conn:
+        try:
+            retention_days = max(1, int(_get_config(conn, RETENTION_DAYS_KEY) or 90))
+        except ValueError:
+            retention_days = 90
+        rolled = rollup_collection_logs(conn, now.date())
+        cutoff = datetime.combine(now.date() - timedelta(days=retention_days), time.min)
+        archived = archive_collection_logs(conn, cutoff)
+    return {'rolled_up_days': rolled, 'archived': archived}
+
+
+def log_totals_by_source(conn):
+    """소스별 최초/최근 실행 시각, 누적 적재 행 수, 실행 수 (롤업 + 롤업 이후 원본)
+
+    반환: {target_source: {'first_run', 'last_run': datetime | None, 'row_count': int, 'run_count': int}}
+    """
+    since = raw_log_start(conn) or datetime(1970, 1, 1)
+    rows = conn.execute(text("""
+        SELECT target_source, MIN(first_run), MAX(last_run), SUM(row_count), SUM(run_count)
+        FROM (
+            SELECT target_source, first_run, last_run, row_count, run_count FROM collection_log_daily
+            UNION ALL
+            SELECT target_source, executed_at, executed_at, row_count, 1 FROM collection_logs WHERE executed_at >= :since
+        ) t
+        GROUP BY target_source
+    """), {'since': since}).fetchall()
+    return {
+        source: {
+            'first_run': pd.Timestamp(first_run).to_pydatetime() if first_run else None,
+            'last_run': pd.Timestamp(last_run).to_pydatetime() if last_run else None,
+            'row_count': int(row_count or 0),
+            'run_count': int(run_count or 0),
+        }
+        for source, first_run, last_run, row_count, run_count in rows
+    }
@@ -0,0 +1,212 @@
+import pandas as pd
+from sqlalchemy import text, bindparam
+
+# 포인트 적립 건(lot) 원장
+# 적립 시 lot을 만들고(remaining = 적립액), 차감 시 오래된 lot부터 remaining을 소진(FIFO)한다.
+# 소멸 처리는 expires_at < 현재 AND remaining > 0 인 lot만 인덱스로 조회하면 된다.
+
+POINT_LOTS_DDL = """
+    CREATE TABLE IF NOT EXISTS point_lots (
+        lot_id INT AUTO_INCREMENT PRIMARY KEY,
+        user_id VARCHAR(100) NOT NULL,
+        transaction_id INT,
+        amount INT NOT NULL,
+        remaining INT NOT NULL,
+        expires_at DATETIME,
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_point_lots_expiry (expires_at, remaining),
+        INDEX idx_point_lots_user (user_id, remaining)
+    )
+"""
+
+LEDGER_READY_KEY = 'POINT_LOT_LEDGER_READY'
+
+
+def fifo_remaining(df):
+    """트랜잭션 DataFrame(transaction_id, user_id, amount, created_at)에서 적립 건별 미사용 잔액 계산
+
+    적립 건의 잔액 = clamp(누적 적립액 - 총 사용액, 0, 적립액) — 오래된 적립부터 소진(FIFO)
+    반환: 적립 건만 남긴 DataFrame (+ remaining 컬럼)
+    """
+    spent = -df.loc[df['amount'] < 0].groupby('user_id')['amount'].sum()
+    earned = df.loc[df['amount'] > 0].sort_values(['user_id', 'created_at', 'transaction_id'])
+    cum_earned = earned.groupby('user_id')['amount'].cumsum()
+    available = cum_earned - earned['user_id'].map(spent).fillna(0)
+    return earned.assign(remaining=available.clip(lower=0).clip(upper=earned['amount']).astype(int))
+
+
+def is_ledger_ready(conn):
+    val = conn.execute(text("SELECT config_value FROM service_config WHERE config_key = :k"),
+                       {'k': LEDGER_READY_KEY}).scalar()
+    return val == '1'
+
+
+def record_point_lot(conn, user_id, amount, expires_at=None, transaction_id=None):
+    """적립 lot 생성 (적립 트랜잭션과 같은 트랜잭션 안에서 호출)"""
+    if amount <= 0:
+        return
+    conn.execute(text("""
+        INSERT INTO point_lots (user_id, transaction_id, amount, remaining, expires_at)
+        VALUES (:uid, :tid, :amt, :amt, :exp)
+    """), {'uid': user_id, 'tid': transaction_id, 'amt': amount, 'exp': expires_at})
+
+
+def record_point_lots(conn, lots):
+    """적립 lot 일괄 생성 (lots: [{'uid', 'tid', 'amt', 'exp'}, ...], 금액 0 이하는 제외)"""
+    params = [lot for lot in lots if lot['amt'] > 0]
+    if params:
+        conn.execute(text("""
+            INSERT INTO point_lots (user_id, transaction_id, amount, remaining, expires_at)
+            VALUES (:uid, :tid, :amt, :amt, :exp)
+        """), params)
+
+
+def consume_point_lots(conn, user_id, amount):
+    """차감액만큼 오래된 lot부터 remaining 소진 (FIFO). 실제 소진한 금액 반환
+
+    원장 도입 이전 잔액 등으로 lot이 부족하면 가능한 만큼만 소진한다.
+    """
+    needed = abs(amount)
+    # 동시 차감이 같은 lot을 중복 소진하지 않도록 행 잠금 (SQLite는 FOR UPDATE 미지원, DB 단위 잠금)
+    lock = " FOR UPDATE" if conn.dialect.name == 'mysql' else ""
+    lots = conn.execute(text(f"""
+        SELECT lot_id, remaining FROM point_lots
+        WHERE user_id = :uid AND remaining > 0
+        ORDER BY created_at ASC, lot_id ASC{lock}
+    """), {'uid': user_id}).fetchall()
+
+    updates = []
+    for lot_id, remaining in lots:
+        if needed <= 0:
+            break
+        used = min(remaining, needed)
+        updates.append({'lot_id': lot_id, 'used': used})
+        needed -= used
+    if updates:
+        conn.execute(text("UPDATE point_lots SET remaining = remaining - :used WHERE lot_id = :lot_id"), updates)
+    return abs(amount) - needed
+
+
+def expire_point_lots(conn, now):
+    """유효기간이 지난 lot의 잔액 소멸 처리 → [(user_id, 소멸액), ...]
+
+    유저별 소멸액은 LEAST(만료 lot 잔액 합계, 현재 잔액)으로 제한한다.
+    (lot을 소진하지 않는 차감 경로가 있어도 잔액이 음수가 되지 않도록)
+    소멸 트랜잭션 INSERT, 잔액 UPDATE, lot 정리는 모두 배치로 기록한다. (commit은 호출 측에서)
+    """
+    lock = " FOR UPDATE" if conn.dialect.name == 'mysql' else ""
+    lots = conn.execute(text(f"""
+        SELECT lot_id, user_id, remaining FROM point_lots
+        WHERE expires_at < :now AND remaining > 0{lock}
+    """), {'now': now}).fetchall()
+    if not lots:
+        return []
+
+    totals = {}
+    for _, user_id, remaining in lots:
+        totals[user_id] = totals.get(user_id, 0) + remaining
+    balances = dict(conn.execute(
+        text(f"SELECT user_id, balance FROM user_points WHERE user_id IN :uids{lock}")
+        .bindparams(bindparam('uids', expanding=True)),
+        {'uids': list(totals)}
+    ).fetchall())
+    expired = [(user_id, min(total, max(int(balances.get(user_id) or 0), 0))) for user_id, total in totals.items()]
+    expired = [(user_id, amount) for user_id, amount in expired if amount > 0]
+
+    if expired:
+        params = [{'uid': user_id, 'amt': amount, 'neg_amt': -amount} for user_id, amount in expired]
+        conn.execute(text("""
+            INSERT INTO point_transactions (user_id, amount, transaction_type, reason, admin_id)
+            VALUES (:uid, :neg_amt, 'expired', '유효기간 만료 소멸', 'system')
+        """), params)
+        conn.execute(text("UPDATE user_points SET balance = balance - :amt WHERE user_id = :uid"), params)
+    conn.execute(text("UPDATE point_lots SET remaining = 0 WHERE lot_id = :lot_id"),
+                 [{'lot_id': lot_id} for lot_id, _, _ in lots])
+    return expired
+
+
+def backfill_point_lots(conn):
+    """기존 point_transactions 이력으로 lot 원장 1회 생성 (완료 시 POINT_LOT_LEDGER_READY=1)
+
+    반환: 생성한 lot 수 (이미 완료된 경우 None)
+    """
+    if is_ledger_ready(conn):
+        return None
+
+    df = pd.read_sql(text("""
+        SELECT transaction_id, user_id, amount, expires_at, created_at FROM point_transactions
+    """), conn)
+    conn.execute(text("DELETE FROM point_lots"))
+    lots = fifo_remaining(df) if not df.empty else df
+    _insert_history_lots(conn, lots)
+
+    updated = conn.execute(text("UPDATE service_config SET config_value = '1' WHERE config_key = :k"),
+                           {'k': LEDGER_READY_KEY})
+    if updated.rowcount == 0:
+        conn.execute(text("INSERT INTO service_config (config_key, config_value) VALUES (:k, '1')"),
+                     {'k': LEDGER_READY_KEY})
+    return len(lots)
+
+
+def _insert_history_lots(conn, lots):
+    """fifo_remaining 결과(적립 건 + remaining)를 point_lots에 일괄 INSERT"""
+    if not len(lots):
+        return
+    conn.execute(text("""
+        INSERT INTO point_lots (user_id, transaction_id, amount, remaining, expires_at, created_at)
+        VALUES (:uid, :tid, :amt, :rem, :exp, :created)
+    """), [
+        {'uid': row.user_id, 'tid': int(row.transaction_id), 'amt': int(row.amount), 'rem': int(row.remaining),
+         'exp': None if pd.isna(row.expires_at) else pd.Timestamp(row.expires_at).to_pydatetime(),
+         'created': pd.Timestamp(row.created_at).to_pydatetime()}
+        for row in lots.itertuples()
+    ])
+
+
+def rebuild_point_lots(conn, user_ids):
+    """지정한 유저의 lot만 point_transactions 이력(FIFO)으로 다시 생성 → 생성한 lot 수 (commit은 호출 측에서)
+
+    이력에 남지 않은 차감(lot을 소진하지 않는 구매 경로 등)으로 lot 잔액 합계가 잔액보다 크면
+    초과분을 오래된 lot부터 소진해 잔액에 맞춘다.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    df = pd.read_sql(
+        text("""
+            SELECT transaction_id, user_id, amount, expires_at, created_at FROM point_transactions
+            WHERE user_id IN :uids
+        """).bindparams(bindparam('uids', expanding=True)),
+        conn, params={'uids': user_ids}
+    )
+    conn.execute(text("DELETE FROM point_lots WHERE user_id IN :uids").bindparams(bindparam('uids', expanding=True)),
+                 {'uids': user_ids})
+    lots = fifo_remaining(df) if not df.empty else df
+    _insert_history_lots(conn, lots)
+
+    for m in find_point_lot_mismatches(conn, user_ids):
+        if m['lot_remaining'] > max(m['balance'], 0):
+            consume_point_lots(conn, m['user_id'], m['lot_remaining'] - max(m['balance'], 0))
+    return len(lots)
+
+
+def find_point_lot_mismatches(conn, user_ids=None):
+    """user_points.balance와 lot 잔액 합계가 다른 유저 목록 → [{'user_id', 'balance', 'lot_remaining'}, ...]
+
+    user_ids를 주면 해당 유저만 비교한다.
+    """
+    only = "AND p.user_id IN :uids" if user_ids is not None else ""
+    query = text(f"""
+        SELECT p.user_id, p.balance, COALESCE(l.lot_remaining, 0) AS lot_remaining
+        FROM user_points p
+        LEFT JOIN (
+            SELECT user_id, SUM(remaining) AS lot_remaining FROM point_lots GROUP BY user_id
+        ) l ON l.user_id = p.user_id
+        WHERE p.balance <> COALESCE(l.lot_remaining, 0) {only}
+    """)
+    params = {}
+    if user_ids is not None:
+        query = query.bindparams(bindparam('uids', expanding=True))
+        params['uids'] = list(user_ids)
+    rows = conn.execute(query, params).fetchall()
+    return [{'user_id': r[0], 'balance': int(r[1]), 'lot_remaining': int(r[2])} for r in rows]
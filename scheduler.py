@@ -0,0 +1,364 @@
+import heapq
+import calendar
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+try:
+    import fcntl  # 파일 잠금 (단일 호스트/SQLite 환경의 리더 선출용, Windows에는 없음)
+except ImportError:
+    fcntl = None
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+# 수집 주기 설정이 바뀔 때마다 갱신되는 버전 키 (스케줄러는 이 값이 바뀔 때만 수집 작업을 다시 구성)
+SCHEDULE_VERSION_KEY = 'SCHEDULE_CONFIG_VERSION'
+# 현재 스케줄러 리더 정보 (JSON: host, pid, backend, since, heartbeat)
+SCHEDULER_LEADER_KEY = 'SCHEDULER_LEADER'
+
+_UNLOADED = object()
+
+WEEKDAYS = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+
+
+def _parse_time(time_str):
+    return datetime.strptime(time_str or '09:00', "%H:%M").time()
+
+
+def next_fire_time(freq, now, time_str='09:00', day='1', weekday='mon', is_last_day=False):
+    """수집 주기 설정으로 now 이후 첫 실행 시각 계산
+
+    freq: daily | weekly | monthly
+    - weekly: weekday(mon~sun) 요일의 time_str
+    - monthly: 매월 day일(해당 월 일수보다 크면 말일) 또는 is_last_day이면 말일의 time_str
+    """
+    run_time = _parse_time(time_str)
+
+    if freq == 'weekly':
+        target = WEEKDAYS.get(str(weekday).lower()[:3], 0)
+        candidate = datetime.combine(now.date(), run_time) + timedelta(days=(target - now.weekday()) % 7)
+        return candidate if candidate > now else candidate + timedelta(days=7)
+
+    if freq == 'monthly':
+        year, month = now.year, now.month
+        for _ in range(2):
+            last = calendar.monthrange(year, month)[1]
+            dom = last if is_last_day else min(max(int(day or 1), 1), last)
+            candidate = datetime.combine(datetime(year, month, dom).date(), run_time)
+            if candidate > now:
+                return candidate
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return candidate
+
+    # daily (알 수 없는 값도 매일로 처리)
+    candidate = datetime.combine(now.date(), run_time)
+    return candidate if candidate > now else candidate + timedelta(days=1)
+
+
+def collection_next_run(source_key, freq_key, configs, now):
+    """수집기 설정(service_config dict) 기준 다음 실행 시각 (스케줄러와 수집 관리 화면이 같은 계산을 사용)"""
+    return next_fire_time(
+        configs.get(freq_key, 'daily'), now,
+        time_str=configs.get(f"COLLECTION_TIME_{source_key}", '09:00'),
+        day=configs.get(f"COLLECTION_DAY_{source_key}", '1'),
+        weekday=configs.get(f"COLLECTION_WEEKDAY_{source_key}", 'mon'),
+        is_last_day=configs.get(f"COLLECTION_IS_LAST_DAY_{source_key}", '0') == '1',
+    )
+
+
+def _set_service_config(conn, config_key, value):
+    updated = conn.execute(text("UPDATE service_config SET config_value = :v WHERE config_key = :k"),
+                           {'k': config_key, 'v': value})
+    if updated.rowcount == 0:
+        conn.execute(text("INSERT INTO service_config (config_key, config_value) VALUES (:k, :v)"),
+                     {'k': config_key, 'v': value})
+
+
+def bump_schedule_version(conn):
+    """수집 주기/활성화 설정 변경 시 호출 (commit은 호출 측에서)"""
+    _set_service_config(conn, SCHEDULE_VERSION_KEY, str(time.time_ns()))
+
+
+class ScheduledJob:
+    """스케줄 작업 (rule: 기준 시각 → 다음 실행 시각 함수)"""
+
+    def __init__(self, name, func, rule):
+        self.name = name
+        self.func = func
+        self.rule = rule
+
+    @classmethod
+    def every(cls, name, func, seconds):
+        return cls(name, func, lambda now: now + timedelta(seconds=seconds))
+
+    @classmethod
+    def daily_at(cls, name, func, time_str):
+        return cls(name, func, lambda now: next_fire_time('daily', now, time_str))
+
+
+class HeapScheduler:
+    """다음 실행 시각 기준 우선순위 큐(heap) 스케줄러
+
+    - 고정 작업(add)과 설정 기반 작업(job_loader)을 하나의 heap에서 관리
+    - 가장 이른 작업 시각까지 정확히 대기 (단, version_loader 확인을 위해 최대 poll_interval초)
+    - version_loader 값이 바뀐 경우에만 job_loader로 설정 기반 작업을 다시 구성
+    - 작업은 워커 스레드에서 실행하며, 같은 작업이 아직 실행 중이면 이번 회차는 건너뜀
+    """
+
+    def __init__(self, job_loader=None, version_loader=None, poll_interval=30, max_workers=4):
+        self.job_loader = job_loader
+        self.version_loader = version_loader
+        self.poll_interval = poll_interval
+        self._dynamic = []
+        self._heap = []
+        self._seq = 0
+        self._version = _UNLOADED
+        self._running = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ScheduledJob")
+
+    def add(self, job, now=None):
+        """고정 작업 등록 (설정 버전과 무관하게 유지)"""
+        with self._lock:
+            self._push(job, now or datetime.now())
+
+    def _push(self, job, now):
+        """다음 실행 시각을 계산해 heap에 등록. 잘못된 설정 등으로 계산에 실패하면 로그만 남기고 제외"""
+        try:
+            fire_at = job.rule(now)
+        except Exception as e:
+            print(f"[Scheduler] 다음 실행 시각 계산 실패, 작업 제외 ({job.name}): {e}")
+            return False
+        self._seq += 1
+        heapq.heappush(self._heap, (fire_at, self._seq, job))
+        return True
+
+    def _current_version(self):
+        try:
+            return self.version_loader() if self.version_loader else None
+        except Exception as e:
+            print(f"[Scheduler] 설정 버전 조회 실패: {e}")
+            return self._version
+
+    def refresh(self, now=None, force=False):
+        """설정 버전이 바뀌었으면 설정 기반 작업을 다시 구성. 재구성 여부 반환"""
+        if not self.job_loader:
+            return False
+        version = self._current_version()
+        if not force and version == self._version:
+            return False
+        try:
+            jobs = list(self.job_loader())
+        except Exception as e:
+            print(f"[Scheduler] 작업 목록 구성 실패: {e}")
+            return False
+
+        now = now or datetime.now()
+        with self._lock:
+            dynamic = {id(j) for j in self._dynamic}
+            self._heap = [entry for entry in self._heap if id(entry[2]) not in dynamic]
+            heapq.heapify(self._heap)
+            self._dynamic = jobs
+            for job in jobs:
+                self._push(job, now)
+        self._version = version
+        print(f"[Scheduler] 설정 기반 작업 {len(jobs)}개 구성 (version={version})")
+        return True
+
+    def next_runs(self):
+        """작업명 → 다음 실행 시각"""
+        with self._lock:
+            return {job.name: fire_at for fire_at, _, job in self._heap}
+
+    def _execute(self, job):
+        try:
+            job.func()
+        except Exception as e:
+            print(f"[Scheduler] 작업 실패 ({job.name}): {e}")
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._running.discard(job.name)
+
+    def run_pending(self, now=None):
+        """실행 시각이 된 작업을 워커에 제출하고 다음 시각으로 재등록 → 제출한 작업명 목록"""
+        now = now or datetime.now()
+        submitted = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, job = heapq.heappop(self._heap)
+                self._push(job, now)
+                if job.name in self._running:
+                    print(f"[Scheduler] 이전 실행이 끝나지 않아 건너뜀: {job.name}")
+                    continue
+                self._running.add(job.name)
+                submitted.append(job)
+        for job in submitted:
+            self._executor.submit(self._execute, job)
+        return [job.name for job in submitted]
+
+    def seconds_until_next(self, now=None):
+        now = now or datetime.now()
+        with self._lock:
+            if not self._heap:
+                return self.poll_interval
+            return max(0.0, (self._heap[0][0] - now).total_seconds())
+
+    def wake(self):
+        """설정 변경 직후 대기 중인 루프를 깨워 즉시 버전 확인"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def run_forever(self):
+        self.refresh(force=True)
+        while not self._stopped.is_set():
+            self.run_pending()
+            self._wake.wait(min(self.seconds_until_next(), self.poll_interval))
+            self._wake.clear()
+            self.refresh()
+        self._executor.shutdown(wait=False)
+
+
+class LeaderElector:
+    """여러 프로세스(WSGI 워커) 중 스케줄러를 실행할 리더 1개 선출
+
+    - MySQL: GET_LOCK 기반 advisory lock. 잠금을 얻은 연결을 계속 유지하며, 프로세스/연결이 끊기면 자동 해제
+    - 그 외(SQLite 등): lock_file에 대한 fcntl.flock (같은 호스트의 프로세스 간에만 유효)
+    리더는 heartbeat마다 SCHEDULER_LEADER 설정에 자신의 정보를 기록한다.
+    """
+
+    def __init__(self, engine, lock_file, lock_name='scheduler_leader'):
+        self.engine = engine
+        self.lock_file = lock_file
+        self.lock_name = f"{engine.url.database or 'app'}.{lock_name}"
+        self.identity = {'host': socket.gethostname(), 'pid': os.getpid()}
+        self.since = None
+        self._conn = None
+        self._fd = None
+
+    @property
+    def backend(self):
+        return 'mysql' if self.engine.dialect.name == 'mysql' else 'file'
+
+    @property
+    def is_leader(self):
+        return self.since is not None
+
+    def _acquire_mysql(self):
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(text("SELECT GET_LOCK(:n, 0)"), {'n': self.lock_name}).scalar() == 1
+            conn.commit()  # 잠금은 세션 단위이므로 트랜잭션은 바로 종료
+        except Exception:
+            conn.close()
+            raise
+        if acquired:
+            self._conn = conn
+        else:
+            conn.close()
+        return acquired
+
+    def _acquire_file(self):
+        if fcntl is None:
+            return True  # 파일 잠금을 지원하지 않는 환경은 단일 프로세스로 간주
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def acquire(self):
+        """리더 잠금 시도 (대기하지 않음). 리더 여부 반환"""
+        if self.is_leader:
+            return True
+        try:
+            acquired = self._acquire_mysql() if self.backend == 'mysql' else self._acquire_file()
+        except Exception as e:
+            print(f"[Leader] 잠금 시도 실패: {e}")
+            return False
+        if acquired:
+            self.since = datetime.now()
+            print(f"[Leader] 스케줄러 리더로 선출됨 ({self.identity['host']}:{self.identity['pid']}, {self.backend})")
+            self._publish()
+        return acquired
+
+    def _still_held(self):
+        if self._conn is None:
+            return True  # 파일 잠금은 프로세스가 살아 있는 동안 유지
+        try:
+            held = self._conn.execute(text("SELECT IS_USED_LOCK(:n) = CONNECTION_ID()"), {'n': self.lock_name}).scalar()
+            self._conn.commit()
+            return held == 1
+        except Exception as e:
+            print(f"[Leader] 잠금 연결 확인 실패: {e}")
+            return False
+
+    def heartbeat(self):
+        """리더 잠금 유지 확인 후 리더 정보 갱신. 잠금을 잃었으면 정리하고 False"""
+        if not self.is_leader:
+            return False
+        if not self._still_held():
+            print("[Leader] 리더 잠금을 잃었습니다. 스케줄러를 중지합니다.")
+            self.release()
+            return False
+        self._publish()
+        return True
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT RELEASE_LOCK(:n)"), {'n': self.lock_name})
+                self._conn.commit()
+            except Exception:
+                pass
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+            self._fd = None
+        self.since = None
+
+    def _publish(self):
+        info = dict(self.identity, backend=self.backend,
+                    since=self.since.strftime('%Y-%m-%d %H:%M:%S'),
+                    heartbeat=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        try:
+            with self.engine.connect() as conn:
+                _set_service_config(conn, SCHEDULER_LEADER_KEY, json.dumps(info))
+                conn.commit()
+        except Exception as e:
+            print(f"[Leader] 리더 정보 기록 실패: {e}")
+
+
+def run_leader_loop(elector, scheduler_factory, heartbeat_interval=15, stop_event=None):
+    """리더가 되면 스케줄러를 실행하고, 리더를 잃으면 중지 후 재선출을 기다림 (자동 failover)"""
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        if elector.acquire():
+            scheduler = scheduler_factory()
+            worker = threading.Thread(target=scheduler.run_forever, daemon=True, name="SchedulerLoop")
+            worker.start()
+            while not stop_event.wait(heartbeat_interval) and elector.heartbeat():
+                pass
+            scheduler.stop()
+            if stop_event.is_set():
+                elector.release()
+                return
+        stop_event.wait(heartbeat_interval)
@@ -0,0 +1,285 @@
+import os
+import json
+import gzip
+import hashlib
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+try:
+    import fcntl  # 프로세스 간 manifest 쓰기 잠금 (Windows에는 없음)
+except ImportError:
+    fcntl = None
+
+# 같은 프로세스 안의 모든 SnapshotStore 인스턴스가 공유하는 manifest 쓰기 잠금
+# (수집기 스레드와 Flask 요청이 동시에 같은 manifest를 갱신할 수 있음)
+# 여러 프로세스(WSGI 워커, 스케줄러) 사이는 manifests/.lock 파일 잠금으로 직렬화한다.
+_MANIFEST_LOCK = threading.Lock()
+
+
+class SnapshotStore:
+    """커스텀 수집기 응답 저장소 (압축 + 내용 해시 기반 중복 제거)
+
+    디렉터리 구조:
+        <base_dir>/objects/<sha256>.json.gz   실제 페이로드 (compact JSON, gzip)
+        <base_dir>/manifests/<source_key>.json 소스별 스냅샷 목록 (파일명 → 해시 포인터)
+        <base_dir>/manifests/.index            스냅샷 파일명 → 소스 키, 객체 해시 → 참조 수
+        <base_dir>/*.json                      이전 방식으로 저장된 파일 (읽기/삭제만 지원)
+
+    같은 내용의 페이로드는 객체 파일 하나를 공유하고 manifest에 포인터만 추가된다.
+    조회/삭제는 인덱스로 소스를 찾아 manifest 하나만 읽는다.
+    """
+    OBJECT_SUFFIX = '.json.gz'
+    INDEX_FILE = '.index'
+    LOCK_FILE = '.lock'
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self.objects_dir = os.path.join(base_dir, 'objects')
+        self.manifests_dir = os.path.join(base_dir, 'manifests')
+
+    # --- 내부 유틸 ---
+    @staticmethod
+    def _atomic_write(path, payload):
+        """임시 파일에 쓴 뒤 교체 (쓰기 도중 실패해도 기존 파일 보존)"""
+        tmp_path = f"{path}.tmp.{uuid.uuid4().hex}"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.objects_dir, content_hash + self.OBJECT_SUFFIX)
+
+    def _manifest_path(self, source_key):
+        return os.path.join(self.manifests_dir, f"{source_key}.json")
+
+    def _read_manifest(self, source_key):
+        path = self._manifest_path(source_key)
+        if not os.path.exists(path):
+            return {'source_key': source_key, 'snapshots': []}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        payload = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._atomic_write(self._manifest_path(manifest['source_key']), payload)
+
+    def _iter_manifests(self):
+        if not os.path.isdir(self.manifests_dir):
+            return
+        for f in os.listdir(self.manifests_dir):
+            if f.endswith('.json'):
+                yield self._read_manifest(f[:-len('.json')])
+
+    @contextmanager
+    def _locked(self):
+        """manifest/인덱스 갱신 잠금 (스레드 잠금 + 프로세스 간 파일 잠금)"""
+        with _MANIFEST_LOCK:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.manifests_dir, exist_ok=True)
+            fd = os.open(os.path.join(self.manifests_dir, self.LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(fd)  # 파일을 닫으면 잠금도 해제됨
+
+    def _read_index(self):
+        """{'names': {파일명: 소스 키}, 'refs': {해시: 참조 수}}
+
+        인덱스 파일이 없으면(이전 버전 저장소) manifest 전체로 다시 만든다. 다음 쓰기 때 파일로 저장됨
+        """
+        path = os.path.join(self.manifests_dir, self.INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        index = {'names': {}, 'refs': {}}
+        for manifest in self._iter_manifests():
+            for entry in manifest['snapshots']:
+                index['names'][entry['name']] = manifest['source_key']
+                index['refs'][entry['hash']] = index['refs'].get(entry['hash'], 0) + 1
+        return index
+
+    def _write_index(self, index):
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        payload = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._atomic_write(os.path.join(self.manifests_dir, self.INDEX_FILE), payload)
+
+    def _release(self, index, entry):
+        """인덱스에서 스냅샷 항목을 빼고, 더 이상 참조되지 않는 객체 파일 삭제"""
+        index['names'].pop(entry['name'], None)
+        refs = index['refs'].get(entry['hash'], 0) - 1
+        if refs > 0:
+            index['refs'][entry['hash']] = refs
+            return
+        index['refs'].pop(entry['hash'], None)
+        object_path = self._object_path(entry['hash'])
+        if os.path.exists(object_path):
+            os.remove(object_path)
+
+    def _find_entry(self, name):
+        """스냅샷 파일명으로 (manifest, entry) 조회 (인덱스로 찾은 소스의 manifest만 읽음)"""
+        source_key = self._read_index()['names'].get(name)
+        if source_key is None:
+            return None, None
+        manifest = self._read_manifest(source_key)
+        for entry in manifest['snapshots']:
+            if entry['name'] == name:
+                return manifest, entry
+        return None, None
+
+    @staticmethod
+    def _is_safe_name(name):
+        return bool(name) and '..' not in name and '/' not in name and '\\' not in name
+
+    def _register(self, source_key, content_hash, raw_size, saved_at, incoming_path=None, raw=None, keep=None):
+        """객체 파일 저장(없을 때만) 후 manifest에 항목 추가. _locked() 안에서 호출
+
+        keep: 소스별 보존 개수 (초과하면 오래된 스냅샷부터 정리, None/0이면 무제한)
+        """
+        object_path = self._object_path(content_hash)
+        deduplicated = os.path.exists(object_path)
+        if not deduplicated:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            if incoming_path:
+                os.replace(incoming_path, object_path)
+            else:
+                self._atomic_write(object_path, gzip.compress(raw))
+
+        manifest = self._read_manifest(source_key)
+        names = {entry['name'] for entry in manifest['snapshots']}
+        base_name = f"{source_key}_{saved_at.strftime('%Y%m%d_%H%M%S')}"
+        name, seq = f"{base_name}.json", 1
+        while name in names:
+            name, seq = f"{base_name}_{seq}.json", seq + 1
+
+        entry = {
+            'name': name,
+            'hash': content_hash,
+            'saved_at': saved_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'raw_size': raw_size,
+            'stored_size': os.path.getsize(object_path),
+        }
+        manifest['snapshots'].append(entry)
+        index = self._read_index()
+        index['names'][name] = source_key
+        index['refs'][content_hash] = index['refs'].get(content_hash, 0) + 1
+
+        expired = []
+        if keep and len(manifest['snapshots']) > keep:
+            expired = manifest['snapshots'][:-keep]
+            manifest['snapshots'] = manifest['snapshots'][-keep:]
+        self._write_manifest(manifest)
+        for old in expired:
+            self._release(index, old)
+        self._write_index(index)
+        return dict(entry, deduplicated=deduplicated)
+
+    # --- 공개 API ---
+    def put_bytes(self, source_key, raw, saved_at=None, keep=None):
+        """이미 직렬화된 JSON 바이트를 저장하고 manifest 항목(dict) 반환"""
+        content_hash = hashlib.sha256(raw).hexdigest()
+        with self._locked():
+            return self._register(source_key, content_hash, len(raw), saved_at or datetime.now(), raw=raw,
+                                  keep=keep)
+
+    def put_stream(self, source_key, chunks, skip_hash=None, validate=None, saved_at=None, keep=None):
+        """청크 단위 원문 바이트를 임시 파일에 바로 압축 저장한 뒤 등록 (메모리 사용량은 청크 크기로 제한)
+
+        skip_hash: 전체 해시가 이 값과 같으면 저장하지 않고 None 반환 (변경 없음)
+        validate: 압축 해제 스트림(file object)을 받아 검증하는 함수. 예외 발생 시 저장 취소
+        keep: 소스별 보존 개수 (_register 참고)
+        """
+        os.makedirs(self.objects_dir, exist_ok=True)
+        incoming_path = os.path.join(self.objects_dir, f".incoming.{uuid.uuid4().hex}")
+        sha = hashlib.sha256()
+        raw_size = 0
+        try:
+            with gzip.open(incoming_path, 'wb') as gz:
+                for chunk in chunks:
+                    sha.update(chunk)
+                    gz.write(chunk)
+                    raw_size += len(chunk)
+            content_hash = sha.hexdigest()
+            if skip_hash and content_hash == skip_hash:
+                return None
+
+            if validate:
+                with gzip.open(incoming_path, 'rb') as f:
+                    validate(f)
+
+            with self._locked():
+                return self._register(source_key, content_hash, raw_size, saved_at or datetime.now(),
+                                      incoming_path=incoming_path, keep=keep)
+        finally:
+            if os.path.exists(incoming_path):
+                os.remove(incoming_path)
+
+    def put(self, source_key, data, saved_at=None, keep=None):
+        """JSON 직렬화 가능한 데이터를 compact 형태로 저장"""
+        raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return self.put_bytes(source_key, raw, saved_at, keep)
+
+    def list_snapshots(self):
+        """전체 스냅샷 목록 (manifest 항목 + 이전 방식 .json 파일), 파일명 역순"""
+        items = []
+        for manifest in self._iter_manifests():
+            for entry in manifest['snapshots']:
+                items.append(dict(entry, source_key=manifest['source_key'], legacy=False))
+
+        if os.path.isdir(self.base_dir):
+            for f in os.listdir(self.base_dir):
+                path = os.path.join(self.base_dir, f)
+                if f.endswith('.json') and os.path.isfile(path):
+                    stats = os.stat(path)
+                    items.append({
+                        'name': f,
+                        'hash': None,
+                        'saved_at': datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+                        'raw_size': stats.st_size,
+                        'stored_size': stats.st_size,
+                        'source_key': None,
+                        'legacy': True,
+                    })
+        items.sort(key=lambda x: x['name'], reverse=True)
+        return items
+
+    def open(self, name):
+        """스냅샷 원문을 바이너리 스트림으로 열기 (압축 해제는 읽는 만큼만 수행)"""
+        if not self._is_safe_name(name):
+            raise ValueError("잘못된 파일명입니다.")
+
+        _, entry = self._find_entry(name)
+        if entry:
+            return gzip.open(self._object_path(entry['hash']), 'rb')
+        return open(os.path.join(self.base_dir, name), 'rb')
+
+    def read(self, name):
+        """스냅샷 파일명으로 데이터 조회 (없으면 FileNotFoundError)"""
+        with self.open(name) as f:
+            return json.loads(f.read().decode('utf-8'))
+
+    def delete(self, name):
+        """스냅샷 삭제 (더 이상 참조되지 않는 객체 파일도 정리). 삭제 여부 반환"""
+        if not self._is_safe_name(name):
+            raise ValueError("잘못된 파일명입니다.")
+
+        with self._locked():
+            manifest, entry = self._find_entry(name)
+            if entry:
+                manifest['snapshots'] = [e for e in manifest['snapshots'] if e['name'] != name]
+                self._write_manifest(manifest)
+                index = self._read_index()
+                self._release(index, entry)
+                self._write_index(index)
+                return True
+
+            legacy_path = os.path.join(self.base_dir, name)
+            if os.path.isfile(legacy_path):
+                os.remove(legacy_path)
+                return True
+        return False
@@ -0,0 +1,92 @@
+from datetime import datetime
+from sqlalchemy import text
+
+# 테이블 행 수 카운터
+# 대시보드/목록 화면의 전체 건수는 COUNT(*) 대신 table_counters 한 행을 읽는다.
+# 카운터는 모든 쓰기 경로(수집기, 라우트, 배치)가 데이터와 같은 트랜잭션에서 갱신하는 테이블(COUNTED_TABLES)에만 둔다.
+# 사용자 앱이 직접 쓰는 테이블(missions, users, user_points 등)과 그 밖의 테이블은 COUNT(*)를 사용한다.
+# 주기적인 재계산(reconcile_table_counters)은 수동 SQL 등으로 생긴 오차를 보정한다.
+
+TABLE_COUNTERS_DDL = """
+    CREATE TABLE IF NOT EXISTS table_counters (
+        table_name VARCHAR(64) PRIMARY KEY,
+        row_count BIGINT NOT NULL DEFAULT 0,
+        updated_at DATETIME,
+        reconciled_at DATETIME
+    )
+"""
+
+COUNTED_TABLES = (
+    'raw_loan_products', 'raw_economic_indicators', 'raw_income_stats', 'collection_logs', 'point_products',
+)
+
+
+def bump_counter(conn, table_name, delta):
+    """행 수 증감 (카운터가 아직 없으면 무시 — 다음 재계산 때 생성) (commit은 호출 측에서)"""
+    if delta:
+        conn.execute(text("""
+            UPDATE table_counters SET row_count = row_count + :d, updated_at = :now WHERE table_name = :t
+        """), {'t': table_name, 'd': delta, 'now': datetime.now()})
+
+
+def set_counter(conn, table_name, row_count, reconciled=False):
+    """행 수를 지정한 값으로 기록 (전체 교체 적재/재계산 시) (commit은 호출 측에서)"""
+    now = datetime.now()
+    params = {'t': table_name, 'c': int(row_count), 'now': now, 'rec': now if reconciled else None}
+    updated = conn.execute(text("""
+        UPDATE table_counters SET row_count = :c, updated_at = :now, reconciled_at = COALESCE(:rec, reconciled_at)
+        WHERE table_name = :t
+    """), params)
+    if updated.rowcount == 0:
+        conn.execute(text("""
+            INSERT INTO table_counters (table_name, row_count, updated_at, reconciled_at) VALUES (:t, :c, :now, :rec)
+        """), params)
+
+
+def read_counters(conn, table_names=None):
+    """카운터 조회 → {table_name: row_count}"""
+    rows = conn.execute(text("SELECT table_name, row_count FROM table_counters")).fetchall()
+    counters = {name: int(count) for name, count in rows}
+    if table_names is not None:
+        counters = {name: counters[name] for name in table_names if name in counters}
+    return counters
+
+
+def table_count(conn, table_name):
+    """테이블 전체 행 수 (COUNTED_TABLES는 카운터 우선 — 없으면 COUNT(*) 후 카운터 생성, 그 밖의 테이블은 COUNT(*))"""
+    if table_name not in COUNTED_TABLES:
+        return conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+    try:
+        count = conn.execute(text("SELECT row_count FROM table_counters WHERE table_name = :t"),
+                             {'t': table_name}).scalar()
+    except Exception:
+        conn.rollback()  # table_counters가 아직 없음
+        return conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+    if count is not None:
+        return int(count)
+    count = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+    set_counter(conn, table_name, count, reconciled=True)
+    conn.commit()
+    return count
+
+
+def reconcile_table_counters(engine, table_names=None):
+    """COUNT(*)로 카운터 재계산/생성 (테이블마다 commit) → 값이 달랐던 테이블 {table_name: (카운터, 실제)}
+
+    table_names가 없으면 COUNTED_TABLES 전체
+    """
+    drift = {}
+    with engine.connect() as conn:
+        counters = read_counters(conn)
+        names = table_names or list(COUNTED_TABLES)
+        for name in names:
+            try:
+                actual = conn.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar()
+            except Exception:
+                conn.rollback()  # 아직 생성되지 않은 테이블 (첫 수집 전)
+                continue
+            if name in counters and counters[name] != actual:
+                drift[name] = (counters[name], actual)
+            set_counter(conn, name, actual, reconciled=True)
+            conn.commit()
+    return drift
@@ -1,114 +1,1577 @@
 import unittest
-from unittest.mock import MagicMock, ANY
-from collector import DataCollector
-from sqlalchemy import text
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, ANY, patch
+from urllib.parse import urlparse, parse_qs
+import pandas as pd
+import requests
+from datetime import datetime, timedelta
+from collector import DataCollector, HttpClient, PhaseTimer, RateLimiter, CircuitOpenError
+from snapshot_store import SnapshotStore
+from point_ledger import backfill_point_lots, consume_point_lots, expire_point_lots, record_point_lot
+from job_queue import CollectionJobQueue
+from log_retention import compact_collection_logs, log_totals_by_source
+from error_signatures import error_signature
+from flattener import custom_table_name, find_table_name_conflict
+from dashboard_stats import DashboardStatsProvider, load_dashboard_stats
+from table_counters import read_counters, table_count
+from scheduler import HeapScheduler, ScheduledJob, LeaderElector, next_fire_time
+from sqlalchemy import create_engine, text
+
+def seed_missions(engine, missions, stats):
+    """미션 평가 테스트용 SQLite 스키마 (missions: (mission_id, user_id, title, reward, key, op, val))"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE missions (
+                mission_id INTEGER PRIMARY KEY, user_id TEXT, mission_title TEXT, reward_points INTEGER,
+                status TEXT DEFAULT 'pending', tracking_key TEXT, tracking_operator TEXT, tracking_value REAL,
+                due_date DATE, completed_at DATETIME, completion_batch TEXT,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+        conn.execute(text("""
+            CREATE TABLE user_stats (
+                user_id TEXT PRIMARY KEY, credit_score INTEGER DEFAULT 0, dsr REAL DEFAULT 0,
+                card_usage_rate REAL DEFAULT 0, delinquency INTEGER DEFAULT 0, salary_transfer INTEGER DEFAULT 0,
+                high_interest_loan INTEGER DEFAULT 0, minus_limit INTEGER DEFAULT 0, open_banking INTEGER DEFAULT 0,
+                checked_credit INTEGER DEFAULT 0, checked_membership INTEGER DEFAULT 0,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE user_points (user_id TEXT PRIMARY KEY, balance INTEGER DEFAULT 0,
+                                      total_earned INTEGER DEFAULT 0, total_spent INTEGER DEFAULT 0)
+        """))
+        conn.execute(text("""
+            CREATE TABLE point_transactions (
+                transaction_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, amount INTEGER,
+                transaction_type TEXT, reason TEXT, admin_id TEXT, reference_id TEXT,
+                expires_at DATETIME, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE point_lots (
+                lot_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, transaction_id INTEGER,
+                amount INTEGER, remaining INTEGER, expires_at DATETIME, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        conn.execute(text("""
+            CREATE TABLE notifications (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, message TEXT, type TEXT,
+                                        is_read INTEGER DEFAULT 0, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)
+        """))
+        conn.execute(text("""
+            INSERT INTO missions (mission_id, user_id, mission_title, reward_points, tracking_key, tracking_operator, tracking_value)
+            VALUES (:mid, :uid, :title, :reward, :key, :op, :val)
+        """), [dict(zip(('mid', 'uid', 'title', 'reward', 'key', 'op', 'val'), m)) for m in missions])
+        for uid, cols in stats.items():
+            conn.execute(text(f"INSERT INTO user_stats (user_id, {', '.join(cols)}) VALUES (:uid, {', '.join(':' + c for c in cols)})"),
+                         dict(cols, uid=uid))
+            conn.execute(text("INSERT INTO user_points (user_id, balance) VALUES (:uid, 0)"), {'uid': uid})
+        conn.commit()
 
 class TestDataCollector(unittest.TestCase):
     def setUp(self):
-        # DB 엔진 및 연결 객체 Mocking
-        self.mock_engine = MagicMock()
-        # context manager (with self.engine.connect() as conn) 처리
-        self.mock_conn = self.mock_engine.connect.return_value.__enter__.return_value
-        self.collector = DataCollector(engine=self.mock_engine)
+        self.engine = create_engine("sqlite://")
+        self.collector = DataCollector(engine=self.engine)
+
+    def _fetch(self, sql):
+        with self.engine.connect() as conn:
+            return [tuple(r) for r in conn.execute(text(sql)).fetchall()]
 
     def test_check_mission_progress_success(self):
-        """미션 조건 달성 시 상태 업데이트 및 포인트 지급 테스트"""
-        # 1. Mock Data 설정
-        # (mission_id, user_id, title, reward, key, op, val)
-        mock_missions = [
-            (101, 'user_test', 'Credit Score Mission', 100, 'creditScore', 'gte', 800)
-        ]
-        
-        # 2. execute 메서드의 side_effect 설정 (쿼리에 따라 다른 결과 반환)
-        def execute_side_effect(statement, params=None):
-            sql = str(statement)
-            mock_result = MagicMock()
-            
-            # 미션 목록 조회 쿼리
-            if "SELECT m.mission_id" in sql:
-                mock_result.fetchall.return_value = mock_missions
-                return mock_result
-            
-            # 유저 스탯 조회 쿼리 (creditScore -> credit_score 매핑 확인)
-            if "SELECT credit_score FROM user_stats" in sql:
-                # 유저 점수 850 (조건 800 이상 만족)
-                mock_result.scalar.return_value = 850
-                return mock_result
-            
-            return mock_result
+        """미션 조건 달성 시 상태 업데이트, 포인트 지급, lot 생성, 알림 일괄 기록"""
+        seed_missions(self.engine, [
+            (101, 'user_test', 'Credit Score Mission', 100, 'creditScore', 'gte', 800),
+            (102, 'user_test', 'Salary Mission', 50, 'salaryTransfer', 'eq', 1),
+        ], {'user_test': {'credit_score': 850, 'salary_transfer': 1}})
 
-        self.mock_conn.execute.side_effect = execute_side_effect
+        self.assertEqual(self.collector.check_mission_progress(), 2)
+
+        self.assertEqual(self._fetch("SELECT mission_id, status FROM missions ORDER BY mission_id"),
+                         [(101, 'completed'), (102, 'completed')])
+        self.assertEqual(self._fetch("SELECT user_id, amount, reference_id FROM point_transactions ORDER BY amount"),
+                         [('user_test', 50, 'mission_102'), ('user_test', 100, 'mission_101')])
+        self.assertEqual(self._fetch("SELECT balance, total_earned FROM user_points"), [(150, 150)])
+        # lot은 해당 보상 거래와 연결되어야 함
+        self.assertEqual(self._fetch("""
+            SELECT t.reference_id, l.remaining FROM point_lots l
+            JOIN point_transactions t ON t.transaction_id = l.transaction_id ORDER BY t.reference_id
+        """), [('mission_101', 100), ('mission_102', 50)])
+        self.assertEqual(len(self._fetch("SELECT id FROM notifications WHERE type = 'success'")), 2)
 
-        # 3. 메서드 실행
-        self.collector.check_mission_progress()
-
-        # 4. 검증
-        calls = self.mock_conn.execute.call_args_list
-        
-        # 4-1. 미션 상태 업데이트 쿼리 호출 여부 확인
-        update_called = False
-        for call in calls:
-            sql = str(call[0][0])
-            if "UPDATE missions SET status = 'completed'" in sql:
-                update_called = True
-                # 파라미터 확인
-                self.assertEqual(call[1]['mid'], 101)
-        
-        self.assertTrue(update_called, "미션 완료 상태 업데이트가 호출되어야 합니다.")
-
-        # 4-2. 포인트 지급 쿼리 호출 여부 확인
-        point_insert_called = False
-        for call in calls:
-            sql = str(call[0][0])
-            if "INSERT INTO point_transactions" in sql:
-                point_insert_called = True
-                self.assertEqual(call[1]['uid'], 'user_test')
-                self.assertEqual(call[1]['amt'], 100)
-        
-        self.assertTrue(point_insert_called, "포인트 트랜잭션 생성이 호출되어야 합니다.")
+    def test_overlapping_passes_reward_once(self):
+        """다른 실행이 먼저 완료 처리한 미션은 보상/알림을 다시 기록하지 않음"""
+        seed_missions(self.engine, [
+            (401, 'u1', 'Credit', 100, 'creditScore', 'gte', 800),
+            (402, 'u1', 'Salary', 50, 'salaryTransfer', 'eq', 1),
+        ], {'u1': {'credit_score': 850, 'salary_transfer': 1}})
+        with self.engine.connect() as conn:
+            completed = self.collector._evaluate_missions(self.collector._load_active_missions(conn))
+            # 이 회차가 평가한 뒤 기록하기 전에 겹친 실행이 401을 먼저 완료 처리
+            conn.execute(text("UPDATE missions SET status = 'completed' WHERE mission_id = 401"))
+            self.assertEqual(self.collector._apply_mission_completions(conn, completed, datetime(2026, 3, 15)), 1)
+            conn.commit()
+
+        self.assertEqual(self._fetch("SELECT reference_id FROM point_transactions"), [('mission_402',)])
+        self.assertEqual(self._fetch("SELECT balance FROM user_points WHERE user_id = 'u1'"), [(50,)])
+        self.assertEqual(len(self._fetch("SELECT id FROM notifications")), 1)
 
     def test_check_mission_progress_fail(self):
         """미션 조건 미달성 시 업데이트가 수행되지 않아야 함"""
-        mock_missions = [
-            (102, 'user_test_fail', 'High Score', 200, 'creditScore', 'gte', 900)
+        seed_missions(self.engine, [
+            (102, 'user_test_fail', 'High Score', 200, 'creditScore', 'gte', 900),
+            (103, 'user_test_fail', 'Unknown Key', 10, 'noSuchStat', 'eq', 0),
+            (104, 'user_no_stats', 'No Stats', 10, 'dsr', 'lte', 50),
+        ], {'user_test_fail': {'credit_score': 800}})
+
+        self.assertEqual(self.collector.check_mission_progress(), 0)
+        self.assertEqual(self._fetch("SELECT COUNT(*) FROM missions WHERE status = 'completed'"), [(0,)])
+        self.assertEqual(self._fetch("SELECT COUNT(*) FROM point_transactions"), [(0,)])
+
+    def test_check_mission_mapping(self):
+        """컬럼 매핑 및 연산자별 비교 (cardUsageRate -> card_usage_rate 등)"""
+        seed_missions(self.engine, [
+            (201, 'u1', 'Low Usage', 50, 'cardUsageRate', 'lte', 30),
+            (202, 'u1', 'No Delinquency', 0, 'delinquency', 'lt', 1),
+            (203, 'u1', 'Minus Limit', 10, 'minusLimit', 'gt', 0),
+            (204, 'u1', 'DSR', 10, 'dsr', 'lte', 40),
+            (205, 'u2', 'Low Usage', 50, 'cardUsageRate', 'lte', 30),
+        ], {'u1': {'card_usage_rate': 25.0, 'delinquency': 0, 'minus_limit': 0, 'dsr': 35.5},
+            'u2': {'card_usage_rate': 80.0}})
+
+        self.assertEqual(self.collector.check_mission_progress(), 3)
+        self.assertEqual(self._fetch("SELECT mission_id FROM missions WHERE status = 'completed' ORDER BY mission_id"),
+                         [(201,), (202,), (204,)])
+        # 보상 0P 미션은 거래를 만들지 않음
+        self.assertEqual(self._fetch("SELECT balance FROM user_points WHERE user_id = 'u1'"), [(60,)])
+
+    def test_check_mission_progress_sql_mode(self):
+        """MISSION_EVAL_MODE=sql: 집합 단위 SQL로 batch 모드와 같은 결과를 기록"""
+        seed_missions(self.engine, [
+            (301, 'u1', 'Credit', 100, 'creditScore', 'gte', 800),
+            (302, 'u1', 'Low Usage', 50, 'cardUsageRate', 'lte', 30),
+            (303, 'u2', 'Credit', 100, 'credit_score', 'gte', 800),
+            (304, 'u2', 'Zero Reward', 0, 'delinquency', 'eq', 0),
+            (305, 'u2', 'Unknown Key', 10, 'noSuchStat', 'eq', 0),
+        ], {'u1': {'credit_score': 850, 'card_usage_rate': 25.0}, 'u2': {'credit_score': 700}})
+        with self.engine.connect() as conn:
+            conn.execute(text("INSERT INTO service_config VALUES ('MISSION_EVAL_MODE', 'sql')"))
+            conn.commit()
+
+        self.assertEqual(self.collector.check_mission_progress(), 3)
+        self.assertEqual(self._fetch("SELECT mission_id FROM missions WHERE status = 'completed' ORDER BY mission_id"),
+                         [(301,), (302,), (304,)])
+        self.assertEqual(self._fetch("SELECT user_id, balance, total_earned FROM user_points ORDER BY user_id"),
+                         [('u1', 150, 150), ('u2', 0, 0)])
+        self.assertEqual(self._fetch("""
+            SELECT t.reference_id, t.reason, l.remaining FROM point_lots l
+            JOIN point_transactions t ON t.transaction_id = l.transaction_id ORDER BY t.reference_id
+        """), [('mission_301', 'Credit 미션 자동 달성', 100), ('mission_302', 'Low Usage 미션 자동 달성', 50)])
+        self.assertIn(("축하합니다! 'Zero Reward' 미션을 달성하여 0P를 받았습니다.",),
+                      self._fetch("SELECT message FROM notifications WHERE user_id = 'u2'"))
+
+        # 이미 완료된 미션은 다시 처리하지 않음
+        self.assertEqual(self.collector.check_mission_progress(), 0)
+
+    def test_mission_progress_only_evaluates_changes(self):
+        """MISSION_EVAL_HWM 이후 변경된 스탯만 평가하고, 누락분은 전체 재평가에서 처리"""
+        for mode in ('batch', 'sql'):
+            with self.subTest(mode=mode):
+                engine = create_engine("sqlite://")
+                collector = DataCollector(engine=engine)
+                seed_missions(engine, [
+                    (401, 'u1', 'Credit', 10, 'creditScore', 'gte', 800),
+                    (402, 'u2', 'Credit', 10, 'creditScore', 'gte', 800),
+                ], {'u1': {'credit_score': 700}, 'u2': {'credit_score': 700}})
+                with engine.connect() as conn:
+                    conn.execute(text("INSERT INTO service_config VALUES ('MISSION_EVAL_MODE', :m)"), {'m': mode})
+                    conn.commit()
+
+                self.assertEqual(collector.check_mission_progress(), 0)  # HWM 없음 → 전체 평가 후 HWM 기록
+                with engine.connect() as conn:
+                    conn.execute(text("UPDATE missions SET updated_at = '2000-01-01 00:00:00'"))
+                    # u1은 updated_at 갱신 없이 변경(추적 누락), u2는 정상 변경
+                    conn.execute(text("UPDATE user_stats SET credit_score = 850, updated_at = '2000-01-01 00:00:00' WHERE user_id = 'u1'"))
+                    conn.execute(text("UPDATE user_stats SET credit_score = 900, updated_at = CURRENT_TIMESTAMP WHERE user_id = 'u2'"))
+                    conn.commit()
+
+                self.assertEqual(collector.check_mission_progress(), 1)
+                with engine.connect() as conn:
+                    done = conn.execute(text("SELECT mission_id FROM missions WHERE status = 'completed'")).fetchall()
+                self.assertEqual([tuple(r) for r in done], [(402,)])
+                self.assertEqual(collector.reconcile_mission_progress(), 1)
+
+    def test_check_mission_expiration_batches(self):
+        """기한 지난 미션을 배치 단위로 만료 처리하고 건별 이력을 남김"""
+        seed_missions(self.engine, [(500 + i, 'u1', f'M{i}', 10, None, None, None) for i in range(7)], {'u1': {'credit_score': 0}})
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                CREATE TABLE mission_history (history_id INTEGER PRIMARY KEY AUTOINCREMENT, mission_id INTEGER,
+                                              admin_id TEXT, change_type TEXT, description TEXT)
+            """))
+            conn.execute(text("UPDATE missions SET due_date = '2000-01-01' WHERE mission_id < 505"))
+            conn.execute(text("UPDATE missions SET due_date = '2999-01-01' WHERE mission_id = 505"))
+            conn.execute(text("UPDATE missions SET due_date = '2000-01-01', status = 'completed' WHERE mission_id = 506"))
+            conn.execute(text("INSERT INTO service_config VALUES ('MISSION_EXPIRE_BATCH_SIZE', '2')"))
+            conn.commit()
+
+        report = self.collector.check_mission_expiration()
+        self.assertEqual(report['expired'], 5)
+        self.assertGreaterEqual(report['duration'], 0)
+        self.assertEqual(self._fetch("SELECT mission_id FROM missions WHERE status = 'expired' ORDER BY mission_id"),
+                         [(500,), (501,), (502,), (503,), (504,)])
+        self.assertEqual(self._fetch("SELECT COUNT(*) FROM mission_history WHERE change_type = 'expire'"), [(5,)])
+        self.assertEqual(self.collector.check_mission_expiration()['expired'], 0)
+
+    def test_mission_expiration_skips_concurrently_changed_rows(self):
+        """조회 후 다른 처리가 상태를 바꾼 미션은 만료 건수/이력에서 빠져야 함"""
+        seed_missions(self.engine, [(600 + i, 'u1', f'M{i}', 10, None, None, None) for i in range(3)], {'u1': {'credit_score': 0}})
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                CREATE TABLE mission_history (history_id INTEGER PRIMARY KEY AUTOINCREMENT, mission_id INTEGER,
+                                              admin_id TEXT, change_type TEXT, description TEXT)
+            """))
+            conn.execute(text("UPDATE missions SET due_date = '2000-01-01'"))
+            conn.commit()
+
+            real_execute = conn.execute
+
+            def racing_execute(stmt, *args, **kwargs):
+                result = real_execute(stmt, *args, **kwargs)
+                if 'LIMIT' in str(stmt):
+                    rows = result.fetchall()
+                    # 대상 조회 직후 다른 요청이 미션을 완료 처리
+                    real_execute(text("UPDATE missions SET status = 'completed' WHERE mission_id = 601"))
+                    result = MagicMock()
+                    result.fetchall.return_value = rows
+                return result
+
+            with patch.object(conn, 'execute', side_effect=racing_execute):
+                result = self.collector._expire_mission_batch(conn, datetime.now().date(),
+                                                              datetime.now().replace(microsecond=0), 10)
+            conn.commit()
+
+        self.assertEqual(result, (3, 2))
+        self.assertEqual(self._fetch("SELECT mission_id FROM mission_history ORDER BY mission_id"), [(600,), (602,)])
+        self.assertEqual(self._fetch("SELECT status FROM missions WHERE mission_id = 601"), [('completed',)])
+
+class StubHandler(BaseHTTPRequestHandler):
+    """테스트용 로컬 API 서버 핸들러 (경로별 응답 시뮬레이션)"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?')[0]
+        with server.lock:
+            server.hits.append(path)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if path.startswith('/slow'):
+                time.sleep(server.slow_seconds)
+            if path.startswith('/error'):
+                self._send(500, b'{"error": "upstream"}')
+            elif path.startswith('/missing'):
+                self._send(404, b'{"error": "not found"}')
+            elif path.startswith('/etag'):
+                # ETag가 일치하면 304, 아니면 본문과 함께 ETag 전송
+                if self.headers.get('If-None-Match') == '"v1"':
+                    self._send(304, b'')
+                else:
+                    self._send(200, b'{"items": [1]}', {'ETag': '"v1"'})
+            elif path.startswith('/big'):
+                self._send(200, json.dumps({'items': list(range(50000))}).encode())
+            elif path.startswith('/invalid'):
+                self._send(200, b'{"items": [1, 2,')
+            elif path.startswith('/records'):
+                body = {'response': {'items': [
+                    {'bank': {'name': '은행1', 'code': 1}, 'rate': 3, 'active': True, 'tags': ['a']},
+                    {'bank': {'name': '은행2', 'code': 2}, 'rate': 4.5, 'active': False, 'tags': []},
+                    {'bank': {'name': '은행3', 'code': 'X'}, 'rate': None, 'active': True, 'tags': ['b']},
+                ]}}
+                self._send(200, json.dumps(body, ensure_ascii=False).encode())
+            elif path.startswith('/rotating'):
+                # 본문은 같지만 요청마다 ETag가 바뀜
+                self._send(200, b'{"items": [1]}', {'ETag': f'"r{len(server.hits)}"'})
+            elif path.startswith('/static'):
+                # 검증 헤더 없이 항상 같은 본문 반환
+                self._send(200, b'{"items": [1]}')
+            else:
+                self._send(200, json.dumps({'path': path, 'items': [1, 2, 3]}).encode())
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, val in (headers or {}).items():
+            self.send_header(key, val)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """스레드에서 실행되는 로컬 HTTP 스텁 서버"""
+    def __init__(self, handler=StubHandler):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.lock = threading.Lock()
+        self.httpd.hits = []
+        self.httpd.active = 0
+        self.httpd.max_active = 0
+        self.httpd.slow_seconds = 0.3
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def url(self, path):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}{path}"
+
+
+class FinlifeStubHandler(StubHandler):
+    """금융감독원 finlife 신용대출 API 페이지네이션 응답 스텁"""
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)
+        page_no = int(query.get('pageNo', ['1'])[0])
+        with server.lock:
+            server.hits.append(page_no)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(0.02)
+            start = (page_no - 1) * server.page_size
+            end = min(start + server.page_size, server.total_products)
+            base_list, option_list = [], []
+            for i in range(start, end):
+                base_list.append({'fin_co_no': f'CO{i % 7}', 'fin_prdt_cd': f'P{i}',
+                                  'kor_co_nm': f'은행{i % 7}', 'fin_prdt_nm': f'상품{i}'})
+                option_list.append({'fin_co_no': f'CO{i % 7}', 'fin_prdt_cd': f'P{i}', 'crdt_lend_rate_type': 'A',
+                                    'crdt_grad_1': 3.0 + i / 1000, 'crdt_grad_13': 9.5, 'crdt_grad_avg': 5.1})
+                option_list.append({'fin_co_no': f'CO{i % 7}', 'fin_prdt_cd': f'P{i}', 'crdt_lend_rate_type': 'B',
+                                    'crdt_grad_1': 1.0, 'crdt_grad_13': 1.0})
+            max_page = (server.total_products + server.page_size - 1) // server.page_size
+            body = {'result': {'err_cd': '000', 'err_msg': '정상', 'max_page_no': max_page, 'now_page_no': page_no,
+                               'baseList': base_list, 'optionList': option_list}}
+            self._send(200, json.dumps(body).encode())
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+class TestRunAll(unittest.TestCase):
+    def setUp(self):
+        self.mock_engine = MagicMock()
+        self.mock_conn = self.mock_engine.connect.return_value.__enter__.return_value
+        self.collector = DataCollector(engine=self.mock_engine)
+
+        # collection_sources 조회 결과: 기본 수집기 1개 + 같은 호스트의 커스텀 수집기 2개 + 비활성 1개
+        source_rows = [
+            ('FSS_LOAN', 'loan', None, 'FSS_LOAN_API', '1'),
+            ('CUSTOM_A', 'custom_a', 'http://api.example.com/a', 'CUSTOM_A_API', '1'),
+            ('CUSTOM_B', 'custom_b', 'http://api.example.com/b', 'CUSTOM_B_API', '1'),
+            ('CUSTOM_C', 'custom_c', 'http://other.example.com/c', 'CUSTOM_C_API', '0'),
         ]
-        
+
         def execute_side_effect(statement, params=None):
-            sql = str(statement)
             mock_result = MagicMock()
-            
-            if "SELECT m.mission_id" in sql:
-                mock_result.fetchall.return_value = mock_missions
-                return mock_result
-            
-            if "SELECT credit_score FROM user_stats" in sql:
-                # 유저 점수 800 (조건 900 이상 불만족)
-                mock_result.scalar.return_value = 800
-                return mock_result
-            
+            if "FROM collection_sources s" in str(statement):
+                mock_result.fetchall.return_value = source_rows
+            else:
+                mock_result.scalar.return_value = None
             return mock_result
 
         self.mock_conn.execute.side_effect = execute_side_effect
-        self.collector.check_mission_progress()
 
-        # 업데이트 쿼리가 호출되지 않았는지 확인
-        calls = self.mock_conn.execute.call_args_list
-        for call in calls:
-            sql = str(call[0][0])
-            self.assertNotIn("UPDATE missions SET status = 'completed'", sql)
-            self.assertNotIn("INSERT INTO point_transactions", sql)
+    def _slow(self, seconds, ret=None):
+        def job(*args):
+            time.sleep(seconds)
+            return ret
+        return job
 
-    def test_check_mission_mapping(self):
-        """컬럼 매핑 로직 테스트 (cardUsageRate -> card_usage_rate)"""
-        mock_missions = [
-            (103, 'user_card', 'Low Usage', 50, 'cardUsageRate', 'lte', 30)
+    def test_run_all_concurrent_reports_durations(self):
+        """동시 실행 시 소스별 소요 시간과 전체 wall time 리포트"""
+        with patch.object(self.collector, 'collect_fss_loan_products', self._slow(0.2)), \
+             patch.object(self.collector, 'collect_kosis_income_stats', self._slow(0.2)), \
+             patch.object(self.collector, 'collect_economic_indicators', self._slow(0.2)), \
+             patch.object(self.collector, 'collect_custom_source', self._slow(0.05, (True, None))):
+            report = self.collector.run_all(concurrent=True, max_workers=5)
+
+        sources = sorted(r['source'] for r in report['results'])
+        self.assertEqual(sources, ['CUSTOM_A_API', 'CUSTOM_B_API', 'ECONOMIC_INDICATORS', 'FSS_LOAN_API', 'KOSIS_INCOME_API'])
+        self.assertTrue(all(r['success'] for r in report['results']))
+        self.assertTrue(all(r['duration'] > 0 for r in report['results']))
+        # 기본 수집기 3개(0.2s)가 병렬로 실행되어야 함
+        self.assertLess(report['wall_time'], 0.5)
+
+    def test_run_all_concurrent_per_source_cap(self):
+        """같은 API 호스트의 커스텀 수집기는 동시에 실행되지 않아야 함"""
+        active = {'now': 0, 'max': 0}
+        lock = threading.Lock()
+
+        def custom_job(source_key, endpoint):
+            with lock:
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.1)
+            with lock:
+                active['now'] -= 1
+            return False, "boom"
+
+        with patch.object(self.collector, 'collect_fss_loan_products', self._slow(0)), \
+             patch.object(self.collector, 'collect_kosis_income_stats', self._slow(0)), \
+             patch.object(self.collector, 'collect_economic_indicators', self._slow(0)), \
+             patch.object(self.collector, 'collect_custom_source', custom_job):
+            report = self.collector.run_all(concurrent=True, max_workers=5)
+
+        self.assertEqual(active['max'], 1)
+        failed = [r for r in report['results'] if not r['success']]
+        self.assertEqual(sorted(r['source'] for r in failed), ['CUSTOM_A_API', 'CUSTOM_B_API'])
+        self.assertEqual(failed[0]['error'], "boom")
+
+    def test_run_all_reports_builtin_failure(self):
+        """기본 수집기가 내부에서 FAIL을 기록하면 리포트에도 실패로 남아야 함"""
+        with patch.object(self.collector, '_log_status'), \
+             patch.object(self.collector, '_collect_fss_mock'), \
+             patch.object(self.collector, '_collect_kosis_mock'), \
+             patch.object(self.collector, '_collect_economic_mock', side_effect=ValueError("bad payload")):
+            report = self.collector.run_all()
+
+        results = {r['source']: r for r in report['results']}
+        self.assertTrue(results['FSS_LOAN_API']['success'])
+        self.assertFalse(results['ECONOMIC_INDICATORS']['success'])
+        self.assertEqual(results['ECONOMIC_INDICATORS']['error'], "bad payload")
+
+    def test_source_slot_follows_limit_change(self):
+        """동시 실행 제한값이 바뀌면 새 세마포어를 사용"""
+        slot = self.collector._get_source_slot('api.example.com', 1)
+        self.assertIs(self.collector._get_source_slot('api.example.com', 1), slot)
+        wider = self.collector._get_source_slot('api.example.com', 3)
+        self.assertIsNot(wider, slot)
+        for _ in range(3):
+            self.assertTrue(wider.acquire(blocking=False))
+
+class TestAsyncCustomSources(unittest.TestCase):
+    def setUp(self):
+        self.collector = DataCollector(engine=MagicMock())
+        self.tmp_dir = tempfile.mkdtemp()
+        self.collector.custom_source_dir = self.tmp_dir
+        self.collector._load_custom_source_meta = lambda key: (None, f"{key}_API")
+        self.collector._load_source_validators = lambda log_source: {}
+        self.collector._save_source_validators = lambda *args: None
+        self.collector.flatten_custom_source = lambda *args: None
+        self.logs = []
+        self.collector._log_status = lambda source, status, *args, **kwargs: self.logs.append((source, status))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_async_fetch_writes_snapshots_and_logs(self):
+        """성공/실패 소스가 각각 파일 저장 및 로그 기록 경로를 따라야 함"""
+        with StubServer() as server:
+            sources = [('SRC_OK', server.url('/ok')), ('SRC_ERR', server.url('/error')), ('SRC_MOCK', 'not-a-url')]
+            report = self.collector.collect_custom_sources_async(sources, max_concurrency=4, per_host_limit=4, timeout=5)
+
+        by_source = {r['source']: r for r in report['results']}
+        self.assertTrue(by_source['SRC_OK_API']['success'])
+        self.assertFalse(by_source['SRC_ERR_API']['success'])
+        self.assertTrue(by_source['SRC_MOCK_API']['success'])
+        self.assertIn(('SRC_OK_API', 'SUCCESS'), self.logs)
+        self.assertIn(('SRC_ERR_API', 'FAIL'), self.logs)
+        self.assertIn(('SRC_MOCK_API', 'SUCCESS (MOCK)'), self.logs)
+
+        snapshots = self.collector.snapshot_store.list_snapshots()
+        self.assertEqual(len(snapshots), 1)
+        self.assertTrue(snapshots[0]['name'].startswith('SRC_OK_'))
+
+    def test_async_fetch_respects_per_host_limit_and_timeout(self):
+        """호스트별 동시 요청 제한과 소스별 타임아웃"""
+        with StubServer() as server:
+            server.httpd.slow_seconds = 0.2
+            sources = [(f'SRC_{i}', server.url(f'/slow/{i}')) for i in range(4)]
+            report = self.collector.collect_custom_sources_async(sources, max_concurrency=8, per_host_limit=2, timeout=5)
+            self.assertEqual(server.httpd.max_active, 2)
+            self.assertTrue(all(r['success'] for r in report['results']))
+
+            server.httpd.slow_seconds = 1.0
+            report = self.collector.collect_custom_sources_async([('SRC_T', server.url('/slow/t'))], timeout=0.2)
+        self.assertFalse(report['results'][0]['success'])
+        self.assertIn('Timeout', report['results'][0]['error'])
+
+    def test_async_busy_host_does_not_starve_other_hosts(self):
+        """한 호스트의 대기 작업이 전체 슬롯을 잡지 않아 다른 호스트 수집이 바로 진행되어야 함"""
+        with StubServer() as slow, StubServer() as fast:
+            slow.httpd.slow_seconds = 0.3
+            sources = [(f'SLOW_{i}', slow.url(f'/slow/{i}')) for i in range(3)] + [('FAST', fast.url('/ok'))]
+            report = self.collector.collect_custom_sources_async(sources, max_concurrency=2, per_host_limit=1, timeout=5)
+
+        self.assertTrue(all(r['success'] for r in report['results']))
+        # 전역 슬롯을 먼저 잡으면 FAST는 SLOW 대기 작업 뒤로 밀려 SLOW_1보다 늦게 끝남
+        finished = [source for source, status in self.logs if status == 'SUCCESS']
+        self.assertLess(finished.index('FAST_API'), finished.index('SLOW_1_API'))
+
+    def test_async_fetch_cancellation(self):
+        """cancel_event가 set 되면 대기 중인 수집이 취소되어야 함"""
+        cancel_event = threading.Event()
+        with StubServer() as server:
+            server.httpd.slow_seconds = 0.5
+            sources = [(f'SRC_{i}', server.url(f'/slow/{i}')) for i in range(3)]
+            threading.Timer(0.1, cancel_event.set).start()
+            report = self.collector.collect_custom_sources_async(sources, max_concurrency=1, per_host_limit=1,
+                                                                 timeout=5, cancel_event=cancel_event)
+
+        self.assertTrue(all(r['error'] == 'cancelled' for r in report['results']))
+        # 시작 전에 취소된 작업도 다른 로그와 같은 log_source로 기록
+        self.assertEqual(sorted(source for source, status in self.logs if status == 'CANCELLED'),
+                         ['SRC_0_API', 'SRC_1_API', 'SRC_2_API'])
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+class TestHttpClient(unittest.TestCase):
+    def test_keep_alive_connection_reuse(self):
+        """같은 호스트로의 반복 요청은 하나의 연결을 재사용해야 함"""
+        client = HttpClient(pool_maxsize=2, connect_timeout=2, read_timeout=2)
+        with StubServer() as server:
+            for i in range(5):
+                response = client.get(server.url('/ok'), params={'i': i})
+                self.assertEqual(response.status_code, 200)
+            stats = client.stats()
+        client.close()
+
+        host = server.url('').rstrip('/')
+        self.assertEqual(stats[host]['requests'], 5)
+        self.assertEqual(stats[host]['connections_opened'], 1)
+        self.assertEqual(stats[host]['reused'], 4)
+
+    def test_collector_uses_pooled_client(self):
+        """verify_custom_source도 공용 세션 풀을 사용해야 함"""
+        collector = DataCollector(engine=MagicMock())
+        collector._get_config = lambda key, default=None: default
+        with StubServer() as server:
+            self.assertTrue(collector.verify_custom_source(server.url('/ok'), 'KEY')[0])
+            self.assertFalse(collector.verify_custom_source(server.url('/error'), None)[0])
+            stats = collector.get_http_stats()
+        self.assertEqual(list(stats.values())[0]['reused'], 1)
+
+class TestCustomSourceFetch(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.connect() as conn:
+            conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+            conn.execute(text("""
+                CREATE TABLE collection_sources (
+                    source_key TEXT, log_source TEXT, api_key_config TEXT,
+                    last_etag TEXT, last_modified TEXT, content_hash TEXT,
+                    record_path TEXT, column_mapping TEXT, schema_cache TEXT
+                )
+            """))
+            conn.execute(text("INSERT INTO collection_sources (source_key, log_source) VALUES ('SRC', 'SRC_API')"))
+            conn.commit()
+        self.collector = DataCollector(engine=self.engine)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.collector.custom_source_dir = self.tmp_dir
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _statuses(self):
+        return list(pd.read_sql("SELECT status FROM collection_logs", self.engine)['status'])
+
+    def test_etag_not_modified_skips_save(self):
+        """두 번째 요청은 If-None-Match로 304를 받아 저장을 생략해야 함"""
+        with StubServer() as server:
+            self.assertEqual(self.collector.collect_custom_source('SRC', server.url('/etag')), (True, None))
+            self.assertEqual(self.collector.collect_custom_source('SRC', server.url('/etag')), (True, None))
+
+        self.assertEqual(self._statuses(), ['SUCCESS', 'UNCHANGED'])
+        self.assertEqual(len(self.collector.snapshot_store.list_snapshots()), 1)
+        self.assertEqual(self.collector._load_source_validators('SRC_API')['etag'], '"v1"')
+
+    def test_identical_body_detected_by_hash(self):
+        """검증 헤더가 없어도 본문 해시가 같으면 변경 없음으로 처리"""
+        with StubServer() as server:
+            self.collector.collect_custom_source('SRC', server.url('/static'))
+            self.collector.collect_custom_source('SRC', server.url('/static'))
+
+        self.assertEqual(self._statuses(), ['SUCCESS', 'UNCHANGED'])
+        self.assertEqual(len(self.collector.snapshot_store.list_snapshots()), 1)
+
+    def test_unchanged_body_refreshes_validators(self):
+        """본문이 같아도 서버가 새 ETag를 주면 UNCHANGED 처리 후 새 ETag를 저장해야 함 (스트리밍/일반 모드)"""
+        for stream_mode in ('1', '0'):
+            with self.subTest(stream_mode=stream_mode):
+                self._set_config('CUSTOM_STREAM_MODE', stream_mode)
+                with StubServer() as server:
+                    self.collector.collect_custom_source('SRC', server.url('/rotating'))
+                    self.collector.collect_custom_source('SRC', server.url('/rotating'))
+
+                self.assertEqual(self._statuses()[-1], 'UNCHANGED')
+                self.assertEqual(self.collector._load_source_validators('SRC_API')['etag'], '"r2"')
+                with self.engine.connect() as conn:
+                    conn.execute(text("DELETE FROM service_config"))
+                    conn.commit()
+
+    def _set_config(self, key, val):
+        with self.engine.connect() as conn:
+            conn.execute(text("INSERT INTO service_config VALUES (:k, :v)"), {'k': key, 'v': val})
+            conn.commit()
+
+    def test_streaming_download_respects_size_cap(self):
+        """스트리밍 저장은 크기 상한을 넘으면 중단하고 임시 파일을 남기지 않아야 함"""
+        with StubServer() as server:
+            ok, _ = self.collector.collect_custom_source('SRC', server.url('/big'))
+            self.assertTrue(ok)
+            self._set_config('CUSTOM_STREAM_MAX_BYTES', '100000')
+            ok, err = self.collector.collect_custom_source('SRC', server.url('/big'))
+
+        self.assertFalse(ok)
+        self.assertIn('size limit', err)
+        store = self.collector.snapshot_store
+        snapshot = store.list_snapshots()[0]
+        self.assertGreater(snapshot['raw_size'], 100000)
+        self.assertEqual(len(store.read(snapshot['name'])['items']), 50000)
+        self.assertEqual(len(os.listdir(store.objects_dir)), 1)
+
+    def test_streaming_rejects_invalid_json(self):
+        """깨진 JSON은 저장하지 않고 실패로 기록"""
+        with StubServer() as server:
+            ok, err = self.collector.collect_custom_source('SRC', server.url('/invalid'))
+
+        self.assertFalse(ok)
+        self.assertEqual(self._statuses(), ['FAIL'])
+        self.assertEqual(self.collector.snapshot_store.list_snapshots(), [])
+        self.assertEqual(os.listdir(self.collector.snapshot_store.objects_dir), [])
+
+    def _set_source(self, **fields):
+        with self.engine.connect() as conn:
+            for col, val in fields.items():
+                conn.execute(text(f"UPDATE collection_sources SET {col} = :v WHERE source_key = 'SRC'"), {'v': val})
+            conn.commit()
+
+    def test_flatten_records_into_custom_table(self):
+        """record_path 설정 시 레코드를 펼쳐 custom_<source_key> 테이블에 타입별로 적재"""
+        self._set_source(record_path='response.items')
+        self._set_config('FLATTEN_CHUNK_SIZE', '2')
+        with StubServer() as server:
+            ok, _ = self.collector.collect_custom_source('SRC', server.url('/records'))
+        self.assertTrue(ok)
+
+        df = pd.read_sql(f"SELECT * FROM {custom_table_name('SRC')} ORDER BY bank_name", self.engine)
+        self.assertEqual(list(df.columns), ['bank_name', 'bank_code', 'rate', 'active', 'tags'])
+        self.assertEqual(list(df['bank_name']), ['은행1', '은행2', '은행3'])
+        self.assertEqual(list(df['bank_code']), ['1', '2', 'X'])  # 타입이 섞이면 문자열
+        self.assertAlmostEqual(df['rate'].iloc[1], 4.5)
+        self.assertEqual(df['tags'].iloc[0], '["a"]')
+
+        logs = pd.read_sql("SELECT * FROM collection_logs", self.engine)
+        self.assertEqual(logs.iloc[-1]['row_count'], 3)
+
+    def test_schema_cache_reused_until_mapping_changes(self):
+        """스키마 캐시는 설정 서명이 같으면 재사용하고 매핑 변경 시 다시 추론"""
+        self._set_source(record_path='response.items', column_mapping=json.dumps({'bank': 'bank.name', 'rate': 'rate'}))
+        with StubServer() as server:
+            self.collector.collect_custom_source('SRC', server.url('/records'))
+            name = self.collector.snapshot_store.list_snapshots()[0]['name']
+
+            with patch('collector.RecordFlattener.infer_schema') as infer:
+                self.assertEqual(self.collector.flatten_custom_source('SRC', name), (custom_table_name('SRC'), 3))
+                infer.assert_not_called()
+
+            self._set_source(column_mapping=json.dumps({'bank': 'bank.name'}))
+            self.collector.flatten_custom_source('SRC', name)
+
+        df = pd.read_sql(f"SELECT * FROM {custom_table_name('SRC')}", self.engine)
+        self.assertEqual(list(df.columns), ['bank'])
+        with self.engine.connect() as conn:
+            cache = json.loads(conn.execute(text("SELECT schema_cache FROM collection_sources")).scalar())
+        self.assertEqual(cache['columns'], [['bank', 'str']])
+
+    def test_custom_table_name_is_bounded_and_unique(self):
+        """정리 결과가 같은 키도 다른 테이블명이 되고, 긴 키도 64자를 넘지 않아야 함"""
+        self.assertNotEqual(custom_table_name('Loan-API'), custom_table_name('loan_api'))
+        long_name = custom_table_name('X' * 200)
+        self.assertLessEqual(len(long_name), 64)
+        self.assertTrue(long_name.startswith('custom_xxx'))
+        self.assertIsNone(find_table_name_conflict('NEW', ['SRC', 'NEW']))
+        with patch('flattener.custom_table_name', side_effect=lambda key: 'custom_same'):
+            self.assertEqual(find_table_name_conflict('NEW', ['SRC']), 'SRC')
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = SnapshotStore(self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_identical_payloads_share_one_object(self):
+        """같은 내용은 압축 객체 하나를 공유하고, 마지막 참조 삭제 시 객체도 정리"""
+        payload = {'items': list(range(200)), 'name': '대출'}
+        first = self.store.put('SRC', payload)
+        second = self.store.put('SRC', payload)
+
+        self.assertFalse(first['deduplicated'])
+        self.assertTrue(second['deduplicated'])
+        self.assertNotEqual(first['name'], second['name'])
+        self.assertEqual(len(os.listdir(self.store.objects_dir)), 1)
+        self.assertLess(first['stored_size'], first['raw_size'])
+        self.assertEqual(self.store.read(second['name']), payload)
+
+        self.assertTrue(self.store.delete(first['name']))
+        self.assertEqual(len(os.listdir(self.store.objects_dir)), 1)
+        self.assertTrue(self.store.delete(second['name']))
+        self.assertEqual(os.listdir(self.store.objects_dir), [])
+        self.assertEqual(self.store.list_snapshots(), [])
+
+    def test_retention_per_source(self):
+        """keep 개수를 넘으면 해당 소스의 오래된 스냅샷만 정리하고, 다른 스냅샷이 참조하는 객체는 유지"""
+        shared = {'items': [0]}
+        other = self.store.put('OTHER', shared)
+        names = [self.store.put('SRC', payload, keep=2)['name']
+                 for payload in (shared, {'items': [1]}, {'items': [2]})]
+
+        remaining = {s['name'] for s in self.store.list_snapshots()}
+        self.assertEqual(remaining, {other['name'], names[1], names[2]})
+        self.assertEqual(len(os.listdir(self.store.objects_dir)), 3)
+        self.assertEqual(self.store.read(other['name']), shared)
+
+        self.store.put('SRC', {'items': [3]}, keep=2)
+        self.assertEqual(len(os.listdir(self.store.objects_dir)), 3)  # {'items': [1]} 객체 삭제
+
+    def test_lookup_reads_only_owning_manifest(self):
+        """조회는 인덱스로 찾은 소스의 manifest만 읽음 (인덱스가 없으면 manifest로 다시 구성)"""
+        entry = self.store.put('SRC', {'a': 1})
+        self.store.put('BROKEN', {'b': 2})
+        with open(self.store._manifest_path('BROKEN'), 'w', encoding='utf-8') as f:
+            f.write('not json')
+        self.assertEqual(self.store.read(entry['name']), {'a': 1})
+
+        os.remove(self.store._manifest_path('BROKEN'))
+        os.remove(os.path.join(self.store.manifests_dir, SnapshotStore.INDEX_FILE))
+        self.assertEqual(self.store.read(entry['name']), {'a': 1})
+        self.assertTrue(self.store.delete(entry['name']))
+
+    def test_legacy_files_readable_and_deletable(self):
+        """이전 방식으로 저장된 .json 파일도 목록/조회/삭제 가능"""
+        with open(os.path.join(self.tmp_dir, 'OLD_20240101_000000.json'), 'w', encoding='utf-8') as f:
+            json.dump({'old': True}, f, indent=4)
+
+        snapshots = self.store.list_snapshots()
+        self.assertEqual([s['name'] for s in snapshots], ['OLD_20240101_000000.json'])
+        self.assertTrue(snapshots[0]['legacy'])
+        self.assertEqual(self.store.read('OLD_20240101_000000.json'), {'old': True})
+        self.assertTrue(self.store.delete('OLD_20240101_000000.json'))
+        self.assertFalse(self.store.delete('OLD_20240101_000000.json'))
+
+def seed_point_history(engine):
+    """포인트 만료 테스트용 SQLite 스키마와 거래 이력"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE TABLE user_points (user_id TEXT PRIMARY KEY, balance INTEGER, total_earned INTEGER DEFAULT 0,
+                                      total_spent INTEGER DEFAULT 0)
+        """))
+        conn.execute(text("""
+            CREATE TABLE point_transactions (
+                transaction_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, amount INTEGER,
+                transaction_type TEXT, reason TEXT, admin_id TEXT, reference_id TEXT,
+                expires_at DATETIME, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+        past, future = '2020-01-01 00:00:00', '2999-01-01 00:00:00'
+        txs = [
+            # user_a: 만료된 100 중 30 사용 → 70 소멸, 미만료 50은 유지
+            ('user_a', 100, past, '2019-01-01'), ('user_a', 50, future, '2019-02-01'), ('user_a', -30, None, '2019-03-01'),
+            # user_b: 만료된 100은 이미 모두 사용됨 → 소멸 없음
+            ('user_b', 100, past, '2019-01-01'), ('user_b', 100, future, '2019-02-01'), ('user_b', -150, None, '2019-03-01'),
+            # user_c: 잔액 0 → 대상 아님
+            ('user_c', 80, past, '2019-01-01'), ('user_c', -80, None, '2019-01-05'),
+            # user_d: 만료 건 두 개 (40 + 60)
+            ('user_d', 40, past, '2019-01-01'), ('user_d', 60, past, '2019-01-02'),
         ]
-        
-        # execute 호출 시 card_usage_rate 쿼리가 생성되는지 확인하기 위한 Mock 설정은 생략하고
-        # 실제 로직에서 매핑이 잘 동작하여 업데이트까지 이어지는지 확인
-        # (위의 success 테스트와 유사하지만 키값만 다름)
-        # ... (생략: 위 패턴과 동일하게 구현 가능)
-        pass
+        for uid, amt, exp, created in txs:
+            conn.execute(text("""
+                INSERT INTO point_transactions (user_id, amount, transaction_type, expires_at, created_at)
+                VALUES (:u, :a, 'manual', :e, :c)
+            """), {'u': uid, 'a': amt, 'e': exp, 'c': created})
+        for uid, balance in [('user_a', 120), ('user_b', 50), ('user_c', 0), ('user_d', 100)]:
+            conn.execute(text("INSERT INTO user_points (user_id, balance) VALUES (:u, :b)"), {'u': uid, 'b': balance})
+        conn.commit()
+
+class TestPointExpiration(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        seed_point_history(self.engine)
+        self.collector = DataCollector(engine=self.engine)
+
+    def _assert_expired(self):
+        with self.engine.connect() as conn:
+            balances = dict(conn.execute(text("SELECT user_id, balance FROM user_points")).fetchall())
+            expired = dict(conn.execute(text(
+                "SELECT user_id, amount FROM point_transactions WHERE transaction_type = 'expired'")).fetchall())
+        self.assertEqual(balances, {'user_a': 50, 'user_b': 50, 'user_c': 0, 'user_d': 0})
+        self.assertEqual(expired, {'user_a': -70, 'user_d': -100})
+
+    def test_window_function_expiration(self):
+        """윈도우 함수로 유저별 FIFO 잔여분 중 만료액만 소멸"""
+        self.assertEqual(self.collector.process_expired_points(), 2)
+        self._assert_expired()
+
+    def test_pandas_fallback_matches(self):
+        """SQL 계산 실패 시 pandas 벡터 연산으로 같은 결과"""
+        with patch.object(DataCollector, '_compute_expired_points_sql', side_effect=Exception("no window functions")):
+            self.assertEqual(self.collector.process_expired_points(), 2)
+        self._assert_expired()
+
+class TestPointLotLedger(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        seed_point_history(self.engine)
+        with self.engine.connect() as conn:
+            conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+            conn.execute(text("""
+                CREATE TABLE point_lots (
+                    lot_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT, transaction_id INTEGER,
+                    amount INTEGER, remaining INTEGER, expires_at DATETIME, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+            self.assertEqual(backfill_point_lots(conn), 7)
+            self.assertIsNone(backfill_point_lots(conn))
+            conn.commit()
+        self.collector = DataCollector(engine=self.engine)
+
+    def _lots(self, user_id):
+        with self.engine.connect() as conn:
+            return [tuple(r) for r in conn.execute(text(
+                "SELECT amount, remaining FROM point_lots WHERE user_id = :u ORDER BY lot_id"), {'u': user_id})]
+
+    def test_backfill_matches_fifo_history(self):
+        """백필된 lot 잔액은 FIFO 소진 결과와 같고 잔액과 일치해야 함"""
+        self.assertEqual(self._lots('user_a'), [(100, 70), (50, 50)])
+        self.assertEqual(self._lots('user_b'), [(100, 0), (100, 50)])
+        self.assertEqual(self.collector.check_point_lot_consistency(), [])
+
+    def test_consume_and_sweep_expired_lots(self):
+        """차감은 오래된 lot부터 소진하고, 소멸은 만료 lot 잔액만 처리"""
+        with self.engine.connect() as conn:
+            self.assertEqual(consume_point_lots(conn, 'user_a', -80), 80)
+            conn.execute(text("UPDATE user_points SET balance = balance - 80 WHERE user_id = 'user_a'"))
+            conn.commit()
+        self.assertEqual(self._lots('user_a'), [(100, 0), (50, 40)])
+
+        self.assertEqual(self.collector.process_expired_points(), 1)  # user_d만 만료 잔액 보유
+        with self.engine.connect() as conn:
+            balances = dict(conn.execute(text("SELECT user_id, balance FROM user_points")).fetchall())
+        self.assertEqual(balances['user_d'], 0)
+        self.assertEqual(self._lots('user_d'), [(40, 0), (60, 0)])
+
+        with self.engine.connect() as conn:
+            record_point_lot(conn, 'user_c', 30)
+            conn.commit()
+        mismatches = self.collector.check_point_lot_consistency()
+        self.assertEqual(mismatches, [{'user_id': 'user_c', 'balance': 0, 'lot_remaining': 30}])
+        self.assertEqual(self._lots('user_c'), [(80, 0)])  # 이력 기준으로 다시 생성
+
+    def test_consistency_check_rebuilds_only_drifted_users(self):
+        """lot을 소진하지 않은 차감(구매 등)으로 어긋난 유저의 lot만 이력으로 다시 생성"""
+        with self.engine.connect() as conn:
+            # user_b: 이력은 남기고 lot은 소진하지 않은 구매
+            conn.execute(text("""
+                INSERT INTO point_transactions (user_id, amount, transaction_type, created_at)
+                VALUES ('user_b', -20, 'purchase', '2019-04-01')
+            """))
+            conn.execute(text("UPDATE user_points SET balance = balance - 20 WHERE user_id = 'user_b'"))
+            # user_a: 이력 없이 잔액만 차감 → 초과분은 오래된 lot부터 소진
+            conn.execute(text("UPDATE user_points SET balance = balance - 30 WHERE user_id = 'user_a'"))
+            conn.commit()
+            untouched = conn.execute(text("SELECT lot_id FROM point_lots WHERE user_id = 'user_d' ORDER BY lot_id")).fetchall()
+
+        mismatches = self.collector.check_point_lot_consistency()
+        self.assertEqual(sorted(m['user_id'] for m in mismatches), ['user_a', 'user_b'])
+        self.assertEqual(self._lots('user_a'), [(100, 40), (50, 50)])
+        self.assertEqual(self._lots('user_b'), [(100, 0), (100, 30)])
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT lot_id FROM point_lots WHERE user_id = 'user_d' ORDER BY lot_id")).fetchall(),
+                             untouched)
+        self.assertEqual(self.collector.check_point_lot_consistency(), [])
+
+    def test_ledger_sweep_never_expires_below_zero(self):
+        """만료 lot 잔액이 현재 잔액보다 커도 잔액까지만 소멸"""
+        with self.engine.connect() as conn:
+            conn.execute(text("UPDATE user_points SET balance = 30 WHERE user_id = 'user_d'"))
+            self.assertEqual(expire_point_lots(conn, datetime(2026, 1, 1)), [('user_a', 70), ('user_d', 30)])
+            balance = conn.execute(text("SELECT balance FROM user_points WHERE user_id = 'user_d'")).scalar()
+        self.assertEqual(balance, 0)
+
+class TestHeapScheduler(unittest.TestCase):
+    def test_next_fire_time_frequencies(self):
+        """daily/weekly/monthly/말일 다음 실행 시각 계산"""
+        now = datetime(2024, 1, 31, 10, 0)  # 수요일
+        self.assertEqual(next_fire_time('daily', now, '09:00'), datetime(2024, 2, 1, 9, 0))
+        self.assertEqual(next_fire_time('daily', now, '11:30'), datetime(2024, 1, 31, 11, 30))
+        self.assertEqual(next_fire_time('weekly', now, '09:00', weekday='wed'), datetime(2024, 2, 7, 9, 0))
+        self.assertEqual(next_fire_time('weekly', now, '09:00', weekday='fri'), datetime(2024, 2, 2, 9, 0))
+        # 31일 설정은 2월에 말일(29일)로 보정
+        self.assertEqual(next_fire_time('monthly', now, '09:00', day='31'), datetime(2024, 2, 29, 9, 0))
+        self.assertEqual(next_fire_time('monthly', now, '12:00', day='31'), datetime(2024, 1, 31, 12, 0))
+        self.assertEqual(next_fire_time('monthly', datetime(2024, 12, 31, 23, 0), '09:00', is_last_day=True),
+                         datetime(2025, 1, 31, 9, 0))
+
+    def test_bad_rule_is_skipped(self):
+        """잘못된 수집 시각 설정으로 다음 실행 시각 계산이 실패해도 다른 작업은 계속 스케줄"""
+        now = datetime(2024, 1, 31, 10, 0)
+        configs = {'COLLECTION_TIME_BAD': '25:99'}
+        bad = ScheduledJob("collect:BAD", lambda: None,
+                           lambda t: next_fire_time('daily', t, configs['COLLECTION_TIME_BAD']))
+        scheduler = HeapScheduler(job_loader=lambda: [bad, ScheduledJob.every("tick", lambda: None, 60)],
+                                  version_loader=lambda: '1')
+        self.addCleanup(scheduler._executor.shutdown)
+        self.assertTrue(scheduler.refresh(now=now))
+        self.assertEqual(list(scheduler.next_runs()), ["tick"])
+        self.assertEqual(scheduler.run_pending(now=now + timedelta(minutes=1)), ["tick"])
+
+    def test_run_pending_and_version_rebuild(self):
+        """실행 시각 순으로 작업을 제출하고, 설정 버전이 바뀔 때만 설정 기반 작업을 재구성"""
+        ran, loads = [], []
+        version = {'v': '1'}
+
+        def loader():
+            loads.append(version['v'])
+            return [ScheduledJob('collect:A', lambda: ran.append('A'), lambda now: now + timedelta(hours=1))]
+
+        start = datetime(2024, 1, 1, 0, 0)
+        scheduler = HeapScheduler(job_loader=loader, version_loader=lambda: version['v'], max_workers=1)
+        scheduler.add(ScheduledJob.every('tick', lambda: ran.append('tick'), 60), now=start)
+        self.assertTrue(scheduler.refresh(now=start))
+        self.assertFalse(scheduler.refresh(now=start))
+        self.assertEqual(loads, ['1'])
+
+        self.assertEqual(scheduler.seconds_until_next(now=start), 60)
+        self.assertEqual(scheduler.run_pending(now=start + timedelta(seconds=30)), [])
+        self.assertEqual(scheduler.run_pending(now=start + timedelta(hours=1)), ['tick', 'collect:A'])
+        scheduler._executor.shutdown(wait=True)
+        self.assertEqual(sorted(ran), ['A', 'tick'])
+        self.assertEqual(scheduler.next_runs()['collect:A'], start + timedelta(hours=2))
+
+        version['v'] = '2'
+        self.assertTrue(scheduler.refresh(now=start))
+        self.assertEqual(loads, ['1', '2'])
+        self.assertEqual(sorted(scheduler.next_runs()), ['collect:A', 'tick'])
+
+    def test_leader_election_file_lock_failover(self):
+        """파일 잠금 리더 선출: 한 번에 하나만 리더, 해제 시 다른 프로세스가 인계"""
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+            conn.commit()
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir, True)
+        lock_file = os.path.join(lock_dir, 'scheduler.lock')
+        first, second = LeaderElector(engine, lock_file), LeaderElector(engine, lock_file)
+
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertTrue(first.heartbeat())
+        with engine.connect() as conn:
+            info = json.loads(conn.execute(text("SELECT config_value FROM service_config WHERE config_key = 'SCHEDULER_LEADER'")).scalar())
+        self.assertEqual((info['pid'], info['backend']), (os.getpid(), 'file'))
+
+        first.release()
+        self.assertFalse(first.heartbeat())
+        self.assertTrue(second.acquire())
+        second.release()
+
+class TestCollectionJobQueue(unittest.TestCase):
+    def setUp(self):
+        db_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, db_dir, True)
+        # 워커 스레드와 공유해야 하므로 파일 기반 SQLite 사용
+        self.engine = create_engine(f"sqlite:///{os.path.join(db_dir, 'jobs.db')}")
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                CREATE TABLE collection_jobs (
+                    job_id TEXT PRIMARY KEY, source_key TEXT, triggered_by TEXT DEFAULT 'manual',
+                    status TEXT DEFAULT 'queued', error_message TEXT, created_at DATETIME,
+                    started_at DATETIME, finished_at DATETIME, duration_ms INTEGER, worker_id TEXT,
+                    active_key TEXT UNIQUE
+                )
+            """))
+            conn.commit()
+        self.queue = CollectionJobQueue(self.engine, max_workers=2)
+        self.addCleanup(self.queue.shutdown)
+
+    def _wait(self, job_id, timeout=5):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.queue.get(job_id)
+            if job['status'] not in ('queued', 'running'):
+                return job
+            time.sleep(0.02)
+        self.fail(f"job {job_id} did not finish")
+
+    def test_submit_returns_immediately_and_coalesces(self):
+        """등록 즉시 반환, 진행 중인 소스의 중복 트리거는 기존 작업으로 병합"""
+        release = threading.Event()
+        calls = []
+        job_id, created = self.queue.submit('FSS_LOAN', lambda: (calls.append(1), release.wait(5)))
+        self.assertTrue(created)
+        self.assertEqual(self.queue.submit('FSS_LOAN', lambda: calls.append(2)), (job_id, False))
+
+        release.set()
+        job = self._wait(job_id)
+        self.assertEqual(job['status'], 'done')
+        self.assertIsNotNone(job['duration_ms'])
+        self.assertEqual(calls, [1])
+
+        # 완료 후에는 새 작업으로 등록
+        next_id, created = self.queue.submit('FSS_LOAN', lambda: None)
+        self.assertTrue(created)
+        self.assertNotEqual(next_id, job_id)
+        self._wait(next_id)
+
+    def test_two_queues_share_one_active_job(self):
+        """다른 프로세스의 큐(인스턴스 2개)가 동시에 같은 소스를 등록해도 DB가 작업 하나만 받아들임"""
+        other = CollectionJobQueue(self.engine, max_workers=2)
+        self.addCleanup(other.shutdown)
+        release = threading.Event()
+        calls = []
+        barrier = threading.Barrier(4)
+        results = []
+
+        def trigger(queue):
+            barrier.wait()
+            results.append(queue.submit('FSS_LOAN', lambda: (calls.append(1), release.wait(5))))
+
+        threads = [threading.Thread(target=trigger, args=(q,)) for q in (self.queue, other, self.queue, other)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sum(created for _, created in results), 1)
+        self.assertEqual(len({job_id for job_id, _ in results}), 1)
+        release.set()
+        job = self._wait(results[0][0])
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(calls, [1])
+        with self.engine.connect() as conn:
+            self.assertIsNone(conn.execute(text("SELECT active_key FROM collection_jobs")).scalar())
+
+    def test_stale_active_job_is_released(self):
+        """stale_after가 지난 진행 중 작업은 failed로 정리되고 새 작업이 등록됨"""
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO collection_jobs (job_id, source_key, status, created_at, worker_id, active_key)
+                VALUES ('old', 'ECOS', 'running', :created, 'other-host:1', 'ECOS')
+            """), {'created': datetime.now() - timedelta(hours=2)})
+            conn.commit()
+
+        job_id, created = self.queue.submit('ECOS', lambda: None)
+        self.assertTrue(created)
+        self._wait(job_id)
+        self.assertEqual(self.queue.get('old')['status'], 'failed')
+
+    def test_failed_job_records_error(self):
+        def boom():
+            raise RuntimeError("upstream down")
+        job_id, _ = self.queue.submit('ECOS', boom)
+        job = self._wait(job_id)
+        self.assertEqual((job['status'], job['error_message']), ('failed', 'upstream down'))
+
+    def test_collector_failure_result_marks_job_failed(self):
+        """수집기가 예외 없이 (False, 에러)를 반환해도 작업은 failed"""
+        from admin_flask import run_collection_source
+        collector = MagicMock()
+        collector.collect_custom_source.return_value = (False, "HTTP 500")
+        job_id, _ = self.queue.submit('CUSTOM', lambda: run_collection_source(collector, 'custom', 'CUSTOM', 'http://x'))
+        self.assertEqual(self._wait(job_id)['error_message'], "HTTP 500")
+
+        collector.collect_fss_loan_products.return_value = (True, None)
+        job_id, _ = self.queue.submit('FSS', lambda: run_collection_source(collector, 'loan', 'FSS', None))
+        self.assertEqual(self._wait(job_id)['status'], 'done')
+
+    def test_recover_orphaned_jobs_on_startup(self):
+        """같은 호스트의 종료된 프로세스/실행 프로세스 기록이 없는 작업만 failed로 정리"""
+        proc = subprocess.Popen([sys.executable, '-c', 'pass'])
+        proc.wait()
+        host = self.queue.worker_id.rsplit(':', 1)[0]
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO collection_jobs (job_id, source_key, status, created_at, worker_id) VALUES
+                ('dead', 'A', 'running', :now, :dead), ('legacy', 'B', 'queued', :now, NULL),
+                ('alive', 'C', 'running', :now, :alive), ('remote', 'D', 'running', :now, 'other-host:1')
+            """), {'now': datetime.now(), 'dead': f"{host}:{proc.pid}", 'alive': f"{host}:{os.getppid()}"})
+            conn.commit()
+
+        self.assertEqual(self.queue.recover_orphaned_jobs(), 2)
+        statuses = {job_id: self.queue.get(job_id)['status'] for job_id in ('dead', 'legacy', 'alive', 'remote')}
+        self.assertEqual(statuses, {'dead': 'failed', 'legacy': 'failed', 'alive': 'running', 'remote': 'running'})
+        job_id, created = self.queue.submit('A', lambda: None)
+        self.assertTrue(created)
+        self._wait(job_id)
+
+class TestLogRetention(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.now = datetime(2026, 3, 15, 9, 0)
+        with self.engine.connect() as conn:
+            conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+            conn.execute(text("INSERT INTO service_config VALUES ('LOG_RETENTION_DAYS', '30')"))
+            conn.execute(text("""
+                CREATE TABLE collection_log_daily (
+                    target_source TEXT, day DATE, status TEXT, run_count INTEGER, row_count INTEGER,
+                    first_run DATETIME, last_run DATETIME, PRIMARY KEY (target_source, day, status)
+                )
+            """))
+            conn.commit()
+        # 1월 초부터 하루 2회(성공 10건 + 실패) 실행 로그
+        logs = []
+        for i in range(75):
+            day = datetime(2026, 1, 1, 6, 0) + timedelta(days=i)
+            logs.append({'target_source': 'FSS_LOAN_API', 'status': 'SUCCESS', 'row_count': 10,
+                         'error_message': None, 'level': 'INFO', 'executed_at': day})
+            logs.append({'target_source': 'FSS_LOAN_API', 'status': 'FAIL', 'row_count': 0,
+                         'error_message': 'timeout', 'level': 'ERROR', 'executed_at': day + timedelta(hours=1)})
+        pd.DataFrame(logs).to_sql('collection_logs', self.engine, index=False)
+
+    def test_rollup_and_archive_keep_totals(self):
+        """롤업 후 보존 기간이 지난 로그를 월별로 옮겨도 누적 집계는 같아야 함"""
+        with self.engine.connect() as conn:
+            before = log_totals_by_source(conn)['FSS_LOAN_API']
+
+        result = compact_collection_logs(self.engine, now=self.now)
+        self.assertEqual(result['rolled_up_days'], 73)  # 1/1 ~ 3/14 (오늘 제외)
+        self.assertEqual(result['archived'], 2 * 43)    # 2/13 이전 (1월 31일 + 2월 12일)
+
+        with self.engine.connect() as conn:
+            after = log_totals_by_source(conn)['FSS_LOAN_API']
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM collection_logs_archive_202601")).scalar(), 62)
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM collection_logs_archive_202602")).scalar(), 24)
+            self.assertEqual(conn.execute(text("SELECT MIN(executed_at) FROM collection_logs")).scalar()[:10], '2026-02-13')
+            daily = conn.execute(text("""
+                SELECT run_count, row_count FROM collection_log_daily WHERE day = '2026-01-05' AND status = 'SUCCESS'
+            """)).fetchone()
+        self.assertEqual(tuple(daily), (1, 10))
+        self.assertEqual(after, before)
+        self.assertEqual(after['run_count'], 150)
+        self.assertEqual(after['row_count'], 750)
+
+        # 다시 실행해도 이미 처리한 일자는 건너뜀
+        self.assertEqual(compact_collection_logs(self.engine, now=self.now), {'rolled_up_days': 0, 'archived': 0})
+
+
+class TestErrorSignatures(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                CREATE TABLE error_signatures (
+                    signature TEXT PRIMARY KEY, target_source TEXT, summary TEXT, error_text TEXT,
+                    occurrences INTEGER, first_seen DATETIME, last_seen DATETIME
+                )
+            """))
+            conn.commit()
+        self.collector = DataCollector(engine=self.engine)
+
+    @staticmethod
+    def traceback_text(line, addr, message, app_dir='app'):
+        return (f'Traceback (most recent call last):\n  File "/srv/{app_dir}/collector.py", line {line}, in fetch\n'
+                f'    raise ConnectionError(...)\nConnectionError: <Conn object at {addr}> {message}')
+
+    def test_repeated_failures_share_one_signature(self):
+        """경로·주소·시각·요청 id만 다른 같은 실패는 지문 1개로 합치고 로그에는 요약만 남겨야 함"""
+        for i in range(3):
+            message = f"at 2024-05-0{i + 1} 10:00:0{i} request_id='req-{9000 + i}'"
+            self.collector._log_status("FSS_LOAN_API", "FAIL", 0,
+                                       self.traceback_text(120, hex(0x7f00 + i), message, f"app{i}"), level='ERROR')
+        self.collector._log_status("FSS_LOAN_API", "FAIL", 0, "ValueError: bad payload", level='ERROR')
+
+        with self.engine.connect() as conn:
+            sigs = conn.execute(text("SELECT summary, occurrences, error_text FROM error_signatures ORDER BY occurrences DESC")).fetchall()
+        self.assertEqual([row[1] for row in sigs], [3, 1])
+        self.assertTrue(sigs[0][0].startswith('ConnectionError:'))
+        self.assertIn('Traceback', sigs[0][2])
+
+        logs = pd.read_sql("SELECT error_message, error_signature FROM collection_logs", self.engine)
+        self.assertEqual(logs['error_signature'].nunique(), 2)
+        self.assertFalse(logs['error_message'].str.contains('Traceback').any())
+
+    def test_failure_site_and_status_code_kept(self):
+        """실패 줄 번호나 HTTP 상태 코드가 다르면 다른 지문이어야 함"""
+        line_a = self.traceback_text(120, '0x7f00', 'HTTPError: 500 Server Error')
+        line_b = self.traceback_text(245, '0x7f00', 'HTTPError: 500 Server Error')
+        status_404 = self.traceback_text(120, '0x7f00', 'HTTPError: 404 Client Error')
+        sigs = {error_signature('SRC', t) for t in (line_a, line_b, status_404)}
+        self.assertEqual(len(sigs), 3)
+
+
+class TestDashboardStats(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        self.now = datetime(2026, 3, 15, 12, 0)
+        with self.engine.connect() as conn:
+            conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+            conn.execute(text("INSERT INTO service_config VALUES ('WEIGHT_INCOME', '0.6'), ('COLLECTOR_ECONOMIC_ENABLED', '0')"))
+            conn.execute(text("CREATE TABLE table_counters (table_name TEXT PRIMARY KEY, row_count INTEGER, updated_at DATETIME, reconciled_at DATETIME)"))
+            conn.execute(text("INSERT INTO table_counters (table_name, row_count) VALUES ('raw_loan_products', 2), ('raw_economic_indicators', 0)"))
+            conn.execute(text("CREATE TABLE notifications (notification_id INTEGER PRIMARY KEY, is_read INTEGER)"))
+            conn.execute(text("INSERT INTO notifications (is_read) VALUES (0), (0), (1)"))
+            conn.execute(text("""
+                CREATE TABLE collection_log_daily (
+                    target_source TEXT, day DATE, status TEXT, run_count INTEGER, row_count INTEGER,
+                    first_run DATETIME, last_run DATETIME
+                )
+            """))
+            conn.commit()
+        pd.DataFrame([
+            {'target_source': 'FSS_LOAN_API', 'status': 'SUCCESS', 'row_count': 10, 'executed_at': datetime(2026, 3, 14, 23, 0)},
+            {'target_source': 'FSS_LOAN_API', 'status': 'SUCCESS', 'row_count': 10, 'executed_at': datetime(2026, 3, 15, 1, 0)},
+            {'target_source': 'FSS_LOAN_API', 'status': 'FAIL', 'row_count': 0, 'executed_at': datetime(2026, 3, 15, 2, 0)},
+        ]).to_sql('collection_logs', self.engine, index=False)
+        # 3/14까지 롤업 완료 (3/14 23:00 원본 로그 포함 5건)
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO collection_log_daily
+                SELECT 'FSS_LOAN_API', '2026-03-14', 'SUCCESS', 5, 50, MIN(executed_at), MAX(executed_at)
+                FROM collection_logs WHERE executed_at < '2026-03-15'
+            """))
+            conn.commit()
+
+    def test_single_query_stats_with_missing_table(self):
+        """한 테이블이 아직 없어도 나머지 통계는 채워야 함 (로그 수 = 현재 collection_logs 행 수)"""
+        with self.engine.connect() as conn:
+            stats = load_dashboard_stats(conn, now=self.now)
+            self.assertEqual(stats['unread_notifications'], 2)
+            conn.execute(text("DROP TABLE notifications"))
+            conn.commit()
+            stats = load_dashboard_stats(conn, now=self.now)
+        self.assertEqual((stats['loan_count'], stats['economy_count'], stats['income_count']), (2, 0, 0))
+        self.assertEqual(stats['unread_notifications'], 0)
+        self.assertEqual(stats['log_count'], 3)  # 카운터가 없으면 COUNT(*) 후 카운터 생성
+        self.assertEqual(stats['log_stats_24h'], {'SUCCESS': 2, 'FAIL': 1})
+        self.assertEqual(stats['recent_errors'], 1)
+        self.assertEqual(stats['WEIGHT_INCOME'], 0.6)
+        self.assertEqual(stats['COLLECTOR_ECONOMIC_ENABLED'], '0')
+
+        with self.engine.connect() as conn:
+            self.assertEqual(read_counters(conn, ['collection_logs']), {'collection_logs': 3})
+            conn.execute(text("UPDATE table_counters SET row_count = 40 WHERE table_name = 'collection_logs'"))
+            conn.commit()
+            self.assertEqual(load_dashboard_stats(conn, now=self.now)['log_count'], 40)
+
+    def test_provider_caches_until_ttl_or_invalidate(self):
+        """TTL 안에서는 다시 조회하지 않고, 무효화하면 다음 요청에서 다시 조회해야 함"""
+        provider = DashboardStatsProvider(self.engine, ttl=60)
+        with patch('dashboard_stats.load_dashboard_stats', wraps=load_dashboard_stats) as loader:
+            threads = [threading.Thread(target=provider.get) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            self.assertEqual(loader.call_count, 1)
+            provider.invalidate()
+            self.assertEqual(provider.get()['loan_count'], 2)
+            self.assertEqual(loader.call_count, 2)
+
+
+class TestTableCounters(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.connect() as conn:
+            conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+            conn.execute(text("CREATE TABLE table_counters (table_name TEXT PRIMARY KEY, row_count INTEGER, updated_at DATETIME, reconciled_at DATETIME)"))
+            conn.execute(text("CREATE TABLE users (user_id TEXT PRIMARY KEY)"))
+            conn.execute(text("INSERT INTO users VALUES ('u1'), ('u2')"))
+            conn.execute(text("CREATE TABLE raw_income_stats (age_group TEXT, income_decile INTEGER, avg_income INTEGER)"))
+            conn.execute(text("""
+                CREATE TABLE raw_economic_indicators (
+                    indicator_type TEXT, region TEXT, indicator_value REAL, reference_date TEXT
+                )
+            """))
+            conn.commit()
+        self.collector = DataCollector(engine=self.engine)
+
+    def test_collectors_maintain_counters_and_reconcile_fixes_drift(self):
+        """적재/로그 기록은 같은 트랜잭션에서 카운터를 갱신하고, 외부 변경 오차는 재계산으로 보정해야 함"""
+        self.collector.collect_kosis_income_stats()
+        self.collector.collect_economic_indicators()
+        with self.engine.connect() as conn:
+            counters = read_counters(conn)
+            self.assertEqual(counters['raw_income_stats'], 4)
+            self.assertEqual(counters['raw_economic_indicators'], 3)
+            self.assertEqual(table_count(conn, 'collection_logs'), 2)
+            # 카운터 대상이 아닌 테이블(다른 앱이 직접 쓰는 users)은 항상 COUNT(*)
+            conn.execute(text("INSERT INTO users VALUES ('u3')"))
+            conn.commit()
+            self.assertEqual(table_count(conn, 'users'), 3)
+            self.assertNotIn('users', read_counters(conn))
+            conn.execute(text("DELETE FROM raw_income_stats WHERE age_group = '20대'"))  # 수동 SQL
+            conn.commit()
+            self.assertEqual(table_count(conn, 'raw_income_stats'), 4)
+
+        drift = self.collector.reconcile_table_counters()
+        self.assertEqual(drift, {'raw_income_stats': (4, 3)})
+        with self.engine.connect() as conn:
+            self.assertEqual(table_count(conn, 'raw_income_stats'), 3)
+            # collection_logs 카운터는 재계산 이후 로그 기록(드리프트 경고 1건)까지 반영
+            self.assertEqual(table_count(conn, 'collection_logs'),
+                             conn.execute(text("SELECT COUNT(*) FROM collection_logs")).scalar())
+
+
+class TestRecentLogsBySource(unittest.TestCase):
+    def test_latest_logs_per_source_in_one_query(self):
+        """소스마다 최신 limit건만, dict로 반환 (로그가 없는 소스는 빈 리스트)"""
+        from admin_flask import get_recent_logs_by_source
+        engine = create_engine("sqlite://")
+        base = datetime(2026, 3, 15, 12, 0)
+        pd.DataFrame([
+            {'target_source': source, 'status': 'FAIL' if i == 1 else 'SUCCESS', 'row_count': i,
+             'executed_at': base + timedelta(minutes=i)}
+            for source in ('FSS_LOAN_API', 'KOSIS_INCOME_API') for i in range(4)
+        ]).to_sql('collection_logs', engine, index=False)
+
+        logs = get_recent_logs_by_source(engine, ['FSS_LOAN_API', 'KOSIS_INCOME_API', 'ECONOMIC_INDICATORS'], limit=2)
+        self.assertEqual([log['row_count'] for log in logs['FSS_LOAN_API']], [3, 2])
+        self.assertEqual([log['row_count'] for log in logs['KOSIS_INCOME_API']], [3, 2])
+        self.assertEqual(logs['ECONOMIC_INDICATORS'], [])
+        self.assertIsInstance(logs['FSS_LOAN_API'][0], dict)
+        self.assertNotIn('rn', logs['FSS_LOAN_API'][0])
+
+        failed = get_recent_logs_by_source(engine, ['FSS_LOAN_API'], limit=5, sort_by='row_count', order='asc', status_filter='FAIL')
+        self.assertEqual([log['row_count'] for log in failed['FSS_LOAN_API']], [1])
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_token_bucket_paces_requests_per_host(self):
+        """버스트 이후 요청은 초당 한도에 맞춰 대기하고, 대기 시간이 통계에 집계되어야 함"""
+        limiter = RateLimiter(lambda: (0, 1, {'127.0.0.1': {'rps': 20, 'burst': 2}}))
+        client = HttpClient(rate_limiter=limiter)
+        with StubServer() as server:
+            started = time.perf_counter()
+            for _ in range(6):
+                client.get(server.url('/ok'))
+            elapsed = time.perf_counter() - started
+            client.get(f"http://localhost:{server.httpd.server_address[1]}/ok")  # 한도 미설정 호스트
+            stats = client.stats()
+        client.close()
+
+        host = server.url('').rstrip('/')
+        self.assertGreaterEqual(elapsed, 0.18)  # 2개는 즉시, 나머지 4개는 0.05초 간격
+        self.assertGreaterEqual(stats[host]['throttled'], 1)
+        self.assertEqual(stats[host]['rate_limit'], 20)
+        self.assertGreater(stats[host]['wait_total'], 0)
+        other = [st for h, st in stats.items() if 'localhost' in h][0]
+        self.assertEqual(other['throttled'], 0)
+
+    def test_limits_shared_across_threads(self):
+        """여러 스레드가 같은 호스트 버킷을 공유해야 함"""
+        limiter = RateLimiter(lambda: (10, 1, {}))
+        threads = [threading.Thread(target=limiter.acquire, args=('http://api.example.com',)) for _ in range(4)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.28)
+        self.assertEqual(limiter.stats()['http://api.example.com']['throttled'], 3)
+
+class TestRetryAndCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.collector = DataCollector(engine=MagicMock())
+        self.config = {'RETRY_MAX_ATTEMPTS': '3', 'RETRY_BASE_DELAY_MS': '1', 'RETRY_MAX_DELAY_MS': '5',
+                       'CIRCUIT_FAILURE_THRESHOLD': '2', 'CIRCUIT_RESET_SEC': '0', 'RATE_LIMIT_DEFAULT_RPS': '0'}
+        self.collector._get_config = lambda key, default=None: self.config.get(key, default)
+
+    def _get(self, url):
+        return self.collector._fetch_with_retry(lambda: self.collector.http.get(url), source='SRC_API')
+
+    def test_retries_only_retryable_errors(self):
+        """5xx는 재시도하고 4xx는 한 번만 호출"""
+        with StubServer() as server:
+            self.assertEqual(self._get(server.url('/error')).status_code, 500)
+            self.assertEqual(self._get(server.url('/missing')).status_code, 404)
+            hits = list(server.httpd.hits)
+        self.assertEqual(hits.count('/error'), 3)
+        self.assertEqual(hits.count('/missing'), 1)
+
+    def test_circuit_opens_then_half_open_probe_closes(self):
+        """연속 실패 시 회로가 열려 즉시 실패하고, 재설정 시간 후 시험 호출 성공 시 닫혀야 함"""
+        self.config['CIRCUIT_RESET_SEC'] = '60'
+        with StubServer() as server:
+            self._get(server.url('/error'))
+            self._get(server.url('/error'))
+            self.assertEqual(self.collector.get_circuit_states()['SRC_API']['state'], 'open')
+
+            hits_before = len(server.httpd.hits)
+            with self.assertRaises(CircuitOpenError):
+                self._get(server.url('/ok'))
+            self.assertEqual(len(server.httpd.hits), hits_before)
+
+            breaker = self.collector._get_breaker('SRC_API')
+            breaker.opened_at -= 60
+            self.assertEqual(self._get(server.url('/ok')).status_code, 200)
+        self.assertEqual(self.collector.get_circuit_states()['SRC_API']['state'], 'closed')
+
+    def test_non_http_errors_do_not_reset_circuit(self):
+        """4xx 응답만 정상으로 보고, 파싱 오류 등은 장애로 집계해야 함"""
+        def bad_json():
+            raise ValueError("Expecting value: line 1 column 1")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.collector._fetch_with_retry(bad_json, source='SRC_API')
+        self.assertEqual(self.collector.get_circuit_states()['SRC_API']['state'], 'open')
+
+        breaker = self.collector._get_breaker('SRC_API')
+        breaker.opened_at -= 60
+        not_found = requests.Response()
+        not_found.status_code = 404
+
+        def raise_404():
+            raise requests.HTTPError("404 Client Error", response=not_found)
+
+        with self.assertRaises(requests.HTTPError):
+            self.collector._fetch_with_retry(raise_404, source='SRC_API')
+        self.assertEqual(self.collector.get_circuit_states()['SRC_API']['state'], 'closed')
+
+class TestPhaseTimer(unittest.TestCase):
+    def test_nested_phases_are_exclusive(self):
+        """중첩 단계 시간은 바깥 단계에서 빼고 기록 (단계별 합 ≤ 전체)"""
+        timer = PhaseTimer()
+        with timer.phase('db_write'):
+            time.sleep(0.02)
+            with timer.phase('fetch'):
+                time.sleep(0.05)
+        ms = timer.phase_ms()
+        self.assertGreaterEqual(ms['fetch'], 45)
+        self.assertLess(ms['db_write'], 45)
+        self.assertLessEqual(sum(ms.values()), timer.elapsed_ms())
+
+    def test_collection_logs_duration_and_phases(self):
+        """수집 1회의 전체 소요 시간과 단계별 시간이 같은 run_id로 기록되어야 함"""
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+            conn.execute(text("CREATE TABLE raw_income_stats (age_group TEXT, income_decile INTEGER, avg_income INTEGER)"))
+            conn.commit()
+        DataCollector(engine=engine).collect_kosis_income_stats()
+
+        log = pd.read_sql("SELECT * FROM collection_logs", engine).iloc[-1]
+        phases = pd.read_sql("SELECT * FROM collection_log_phases", engine)
+        self.assertEqual(log['status'], 'SUCCESS (MOCK)')
+        self.assertEqual(set(phases['phase']), {'db_write'})
+        self.assertEqual(set(phases['run_id']), {log['run_id']})
+        self.assertLessEqual(phases['duration_ms'].sum(), log['duration_ms'])
+
+    def test_timing_summary_flags_regression(self):
+        """소스별 p50/p95·처리량을 계산하고 최근 p95가 크게 늘면 regressed로 표시해야 함"""
+        now = datetime(2026, 3, 31, 12, 0)
+        rows = [('FSS_LOAN_API', now - timedelta(days=20 - i), 1000, 1000) for i in range(5)]
+        rows += [('FSS_LOAN_API', now - timedelta(days=3 - i), 1000, 4000) for i in range(3)]
+        rows += [('KOSIS_INCOME_API', now - timedelta(days=10 - i), 500, 250) for i in range(4)]
+        df = pd.DataFrame(rows, columns=['target_source', 'executed_at', 'row_count', 'duration_ms'])
+
+        summary = DataCollector.summarize_collection_timings(df, recent_days=7, now=now)
+        self.assertTrue(summary['FSS_LOAN_API']['regressed'])
+        self.assertEqual(summary['FSS_LOAN_API']['p50_ms'], 1000)
+        self.assertEqual(summary['FSS_LOAN_API']['prev_p95_ms'], 1000)
+        self.assertEqual(summary['FSS_LOAN_API']['recent_p95_ms'], 4000)
+        self.assertFalse(summary['KOSIS_INCOME_API']['regressed'])
+        self.assertEqual(summary['KOSIS_INCOME_API']['rows_per_sec'], 2000.0)
+
+        trend = DataCollector.collection_timing_trend(df)
+        self.assertEqual(len(trend), 12)
+        self.assertEqual(trend['p95_ms'].max(), 4000)
+
+class TestFssPagedPipeline(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.connect() as conn:
+            conn.execute(text("CREATE TABLE service_config (config_key TEXT PRIMARY KEY, config_value TEXT)"))
+            conn.execute(text("""
+                CREATE TABLE raw_loan_products (
+                    bank_name TEXT, product_name TEXT, loan_rate_min REAL, loan_rate_max REAL,
+                    loan_limit INTEGER, is_visible INTEGER DEFAULT 1
+                )
+            """))
+            conn.execute(text("INSERT INTO raw_loan_products VALUES ('은행1', '상품1', 1, 2, 0, 0)"))
+            for key, val in [('API_KEY_FSS', 'KEY'), ('COLLECTOR_FSS_LIVE_MODE', '1'),
+                             ('FSS_CHUNK_SIZE', '25'), ('FSS_PAGE_WORKERS', '3')]:
+                conn.execute(text("INSERT INTO service_config VALUES (:k, :v)"), {'k': key, 'v': val})
+            conn.commit()
+        self.collector = DataCollector(engine=self.engine)
+
+    def test_all_pages_streamed_in_fixed_chunks(self):
+        """전체 페이지를 동시 조회하고 고정 크기 청크로 적재해야 함"""
+        chunk_sizes = []
+        original_to_sql = pd.DataFrame.to_sql
+
+        def spy_to_sql(df, name, *args, **kwargs):
+            if name == 'raw_loan_products':
+                chunk_sizes.append(len(df))
+            return original_to_sql(df, name, *args, **kwargs)
+
+        with StubServer(FinlifeStubHandler) as server:
+            server.httpd.page_size = 10
+            server.httpd.total_products = 95
+            self.collector.FSS_LOAN_API_URL = server.url('/finlifeapi/creditLoanProductsSearch.json')
+            with patch.object(pd.DataFrame, 'to_sql', spy_to_sql):
+                self.collector.collect_fss_loan_products()
+
+        self.assertEqual(sorted(server.httpd.hits), list(range(1, 11)))
+        self.assertLessEqual(server.httpd.max_active, 3)
+        self.assertEqual(chunk_sizes, [25, 25, 25, 20])
+
+        df = pd.read_sql("SELECT * FROM raw_loan_products ORDER BY product_name", self.engine)
+        self.assertEqual(len(df), 95)
+        row = df[df['product_name'] == '상품1'].iloc[0]
+        self.assertAlmostEqual(row['loan_rate_min'], 3.001)
+        self.assertAlmostEqual(row['loan_rate_max'], 9.5)
+        # 기존 상품의 노출 설정은 보존
+        self.assertEqual(row['is_visible'], 0)
+        self.assertEqual(df[df['product_name'] == '상품2'].iloc[0]['is_visible'], 1)
+
+        logs = pd.read_sql("SELECT * FROM collection_logs", self.engine)
+        self.assertEqual(logs.iloc[-1]['status'], 'SUCCESS')
+        self.assertEqual(logs.iloc[-1]['row_count'], 95)
+        # 페이지 수신/변환/적재 시간이 각각의 단계로 기록
+        phases = pd.read_sql("SELECT phase, run_id FROM collection_log_phases", self.engine)
+        self.assertEqual(set(phases['phase']), {'fetch', 'parse', 'db_write'})
+        self.assertEqual(set(phases['run_id']), {logs.iloc[-1]['run_id']})
+
+
+    def test_first_page_failure_keeps_existing_rows(self):
+        """첫 페이지 조회 실패 시 기존 데이터는 유지되어야 함"""
+        with self.engine.connect() as conn:
+            conn.execute(text("INSERT INTO service_config VALUES ('RETRY_MAX_ATTEMPTS', '1')"))
+            conn.commit()
+        with StubServer() as server:
+            self.collector.FSS_LOAN_API_URL = server.url('/error')
+            self.collector.collect_fss_loan_products()
+
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT COUNT(*) FROM raw_loan_products")).scalar(), 1)
+        logs = pd.read_sql("SELECT * FROM collection_logs", self.engine)
+        self.assertEqual(logs.iloc[-1]['status'], 'FAIL')
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file